@@ -1,15 +1,33 @@
+import asyncio
+import logging
 from fastapi import FastAPI
-from app.api.routers import download_router, chromadb_router, chromaindexer_router, chromaagent_router
+from app.api.routers import download_router, chromadb_router, chromaindexer_router, chromaagent_router, jobs_router
+from app.core.agents.agent_registry import agent_registry
+from app.core.agents.sessions import aclose_session_saver
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
 
 app.include_router(download_router.router)
 app.include_router(chromadb_router.router)
 app.include_router(chromaindexer_router.router)
 app.include_router(chromaagent_router.router)
+app.include_router(jobs_router.router)
+
+@app.on_event("startup")
+async def warm_up_agents():
+    """Construct the default agents so the first requests skip construction"""
+    ready = await asyncio.to_thread(agent_registry.warm_up)
+    logger.info(f"Agent registry warmed up with {ready} agents")
+
+@app.on_event("shutdown")
+async def close_sessions():
+    """Close the session checkpointer connection opened by the agent requests"""
+    await aclose_session_saver()
 
 @app.get("/")
 def root():
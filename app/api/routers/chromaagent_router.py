@@ -1,10 +1,14 @@
 from fastapi import APIRouter, HTTPException, Body, Query
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import StreamingResponse
-from app.core.agents.langgraph.simple_agent.agent import LangSimpleRAG
-from app.core.agents.langgraph.complex_agent.agent import LangComplexRAG
+from app.core.agents.agent_registry import agent_registry
+from app.core.agents.llm_cache import get_llm_cache
+from app.core.agents.sessions import delete_session
+from app.core.agents.langgraph.complex_agent.pre_router import get_routing_log
 from app.core.config.schemas import AgentConfig
 from app.core.config.default_config import DEFAULT_AGENT_CONFIG
-from typing import Optional
+from typing import Literal, Optional
+import asyncio
 import json
 import logging
 
@@ -18,7 +22,7 @@ router = APIRouter(prefix="/agent", tags=["Agents"])
     description="""
     Sends a question to the simple RAG agent.
     
-    - Can return a single response or stream updates
+    - Can return a single response, or stream node updates or the tokens of the answer
     - Can be configured with custom agent parameters
     - Returns retrieved documents and generated answer
     """,
@@ -31,6 +35,16 @@ async def simple_rag_agent(
         default=False, 
         description="Whether to stream the response or return a single answer"
     ),
+    stream_mode: Literal["updates", "tokens"] = Body(
+        embed=True,
+        default="updates",
+        description="updates streams the state update of each node, tokens streams the answer token by token with node progress"
+    ),
+    session_id: Optional[str] = Body(
+        embed=True,
+        default=None,
+        description="Session of the question. Follow-up questions of a session continue its checkpointed state and reuse its relevant documents."
+    ),
     config: Optional[AgentConfig] = Body(
         #default=None,
         description="Optional agent configuration. If not provided, uses default settings.",
@@ -54,17 +68,21 @@ async def simple_rag_agent(
 ):
     """Query the simple RAG agent with optional streaming and configuration"""
     try:
-        # Initialize agent
-        agent = LangSimpleRAG(config)
+        # Reuse the agent of this configuration, constructed on first use off the event loop
+        agent = await asyncio.to_thread(agent_registry.get, "simple", config)
         
         if stream:
-            def event_generator():
+            async def event_generator():
                 try:
-                    for output in agent.stream(question):
+                    outputs = (
+                        agent.astream_tokens(question, session_id) if stream_mode == "tokens"
+                        else agent.astream(question, session_id)
+                    )
+                    async for output in outputs:
                         if isinstance(output, dict) and "error" in output:
                             yield f"data: {json.dumps({'error': output['error']})}\n\n"
                             break
-                        yield f"data: {json.dumps(output)}\n\n"
+                        yield f"data: {json.dumps(jsonable_encoder(output))}\n\n"
                 except Exception as e:
                     logger.error(f"Error in stream generation: {str(e)}")
                     yield f"data: {json.dumps({'error': str(e)})}\n\n"
@@ -74,7 +92,7 @@ async def simple_rag_agent(
                 media_type="text/event-stream"
             )
         else:
-            result = agent.run(question)
+            result = await agent.arun(question, session_id)
             if isinstance(result, str) and result.startswith("Error:"):
                 raise HTTPException(status_code=500, detail=result)
             return {"answer": result}
@@ -89,7 +107,7 @@ async def simple_rag_agent(
     description="""
     Sends a question to the complex RAG agent.
     
-    - Can return a single response or stream updates
+    - Can return a single response, or stream node updates or the tokens of the answer
     - Can be configured with custom agent parameters
     - Supports multiple retrieval strategies and self-correction
     - Returns retrieved documents, feedback, and generated answer
@@ -103,6 +121,16 @@ async def complex_rag_agent(
         default=False, 
         description="Whether to stream the response or return a single answer"
     ),
+    stream_mode: Literal["updates", "tokens"] = Body(
+        embed=True,
+        default="updates",
+        description="updates streams the state update of each node, tokens streams the answer token by token with node progress"
+    ),
+    session_id: Optional[str] = Body(
+        embed=True,
+        default=None,
+        description="Session of the question. Follow-up questions of a session continue its checkpointed state and reuse its relevant documents."
+    ),
     config: Optional[AgentConfig] = Body(
         #default=None,
         description="Optional agent configuration. If not provided, uses default settings.",
@@ -129,17 +157,21 @@ async def complex_rag_agent(
 ):
     """Query the complex RAG agent with optional streaming and configuration"""
     try:
-        # Initialize agent
-        agent = LangComplexRAG(config)
+        # Reuse the agent of this configuration, constructed on first use off the event loop
+        agent = await asyncio.to_thread(agent_registry.get, "complex", config)
         
         if stream:
-            def event_generator():
+            async def event_generator():
                 try:
-                    for output in agent.stream(question):
+                    outputs = (
+                        agent.astream_tokens(question, session_id) if stream_mode == "tokens"
+                        else agent.astream(question, session_id)
+                    )
+                    async for output in outputs:
                         if isinstance(output, dict) and "error" in output:
                             yield f"data: {json.dumps({'error': output['error']})}\n\n"
                             break
-                        yield f"data: {json.dumps(output)}\n\n"
+                        yield f"data: {json.dumps(jsonable_encoder(output))}\n\n"
                 except Exception as e:
                     logger.error(f"Error in stream generation: {str(e)}")
                     yield f"data: {json.dumps({'error': str(e)})}\n\n"
@@ -149,11 +181,64 @@ async def complex_rag_agent(
                 media_type="text/event-stream"
             )
         else:
-            result = agent.run(question)
+            result = await agent.arun(question, session_id)
             if isinstance(result, str) and result.startswith("Error:"):
                 raise HTTPException(status_code=500, detail=result)
             return {"answer": result}
             
     except Exception as e:
         logger.error(f"Error in complex RAG agent: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/registry", summary="Get agent registry statistics")
+async def get_agent_registry_stats():
+    """Number of cached agents with the hits, misses and evictions of the agent registry"""
+    return agent_registry.stats()
+
+@router.get("/llm-cache", summary="Get LLM cache statistics")
+async def get_llm_cache_stats():
+    """Entries, hits, misses and hit rate of the LLM response cache"""
+    try:
+        return get_llm_cache().stats()
+    except Exception as e:
+        logger.error(f"Error getting LLM cache statistics: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/llm-cache", summary="Clear the LLM cache")
+async def clear_llm_cache():
+    """Delete every cached LLM response"""
+    try:
+        get_llm_cache().clear()
+        return {"message": "LLM cache cleared successfully"}
+    except Exception as e:
+        logger.error(f"Error clearing LLM cache: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/pre-router", summary="Get pre-router accuracy statistics")
+async def get_pre_router_stats():
+    """Local routing decisions of the complex agent and their agreement with the LLM router, per route and source"""
+    try:
+        return get_routing_log().stats()
+    except Exception as e:
+        logger.error(f"Error getting pre-router statistics: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/pre-router", summary="Clear the pre-router decision log")
+async def clear_pre_router_log():
+    """Delete every logged routing decision, e.g. after changing the thresholds"""
+    try:
+        get_routing_log().clear()
+        return {"message": "Pre-router decision log cleared successfully"}
+    except Exception as e:
+        logger.error(f"Error clearing pre-router decision log: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/sessions/{session_id}", summary="Delete an agent session")
+async def delete_agent_session(session_id: str):
+    """Delete the checkpointed state of a session for every agent and collection"""
+    try:
+        deleted = await asyncio.to_thread(delete_session, session_id)
+        return {"message": f"Session {session_id} deleted successfully", "checkpoints": deleted}
+    except Exception as e:
+        logger.error(f"Error deleting session: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -2,7 +2,11 @@ from fastapi import APIRouter, HTTPException, Body
 from typing import Optional
 from app.core.config.schemas import DatabaseConfig
 from app.core.config.default_config import AVAILABLE_EMBEDDINGS, DEFAULT_DATABASE
+from app.core.agents.agent_registry import agent_registry
 from app.core.indexers.chroma_indexer import chroma_db
+from app.core.indexers.document_registry import DocumentRegistry
+from app.core.indexers.manifest import IngestionManifest
+from app.core.processors.near_duplicates import NearDuplicateIndex
 import logging
 
 logger = logging.getLogger(__name__)
@@ -42,6 +46,8 @@ async def create_database(
             config.parameters["persist_directory"] = DEFAULT_DATABASE.parameters["persist_directory"]
             # Reconfigure the global instance
             chroma_db.reconfigure(config)
+            # Cached agents hold vectorstores bound to the previous embedding function
+            agent_registry.invalidate()
         
         return {"message": "Database configured successfully", "config": config or DEFAULT_DATABASE}
     except Exception as e:
@@ -73,6 +79,10 @@ async def delete_collection(collection_name: str):
     """Delete a collection by name."""
     try:
         chroma_db.delete_collection(collection_name)
+        IngestionManifest(collection_name).clear()
+        NearDuplicateIndex(collection_name).clear()
+        DocumentRegistry(collection_name).clear()
+        agent_registry.invalidate(collection_name)
         return {"message": f"Collection '{collection_name}' deleted successfully"}
     except Exception as e:
         logger.error(f"Error deleting collection: {str(e)}")
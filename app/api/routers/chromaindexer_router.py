@@ -1,12 +1,17 @@
 from fastapi import APIRouter, HTTPException, Body, File, UploadFile, Query
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from app.core.config.schemas import RetrieverConfig
+from app.core.chunkers.chunker_factory import resolve_chunk_size
 from app.core.indexers.chroma_indexer import ChromaIndexer
+from app.core.indexers.manifest import IngestionManifest
+from app.core.processors.near_duplicates import NearDuplicateIndex
 from app.core.pipes.simple_index_pipeline import SimpleIndexChromaPipeline
+from app.core.pipes.ingestion_estimator import resolve_assumptions
+from app.api.uploads import ingest_uploads, upload_filename
 from langchain_core.documents import Document
+import asyncio
 import tempfile
-import os
 import logging
 
 logger = logging.getLogger(__name__)
@@ -113,30 +118,85 @@ async def count_documents(collection_name: str):
         logger.error(f"Error counting documents: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/{collection_name}/sources", summary="List source documents of collection")
+async def list_source_documents(collection_name: str):
+    """List the files indexed into a collection, with their doc_id, path, hash, title and page count."""
+    try:
+        config = RetrieverConfig(collection_name=collection_name)
+        indexer = ChromaIndexer(config)
+        return {"sources": indexer.documents.list_documents()}
+    except Exception as e:
+        logger.error(f"Error listing source documents: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/{collection_name}/sources/{doc_id}", summary="Delete a source document")
+async def delete_source_document(collection_name: str, doc_id: str):
+    """Delete every chunk of an indexed file by its doc_id."""
+    try:
+        config = RetrieverConfig(collection_name=collection_name)
+        indexer = ChromaIndexer(config)
+        source = indexer.documents.get(doc_id)
+        if source is None:
+            raise HTTPException(status_code=404, detail=f"Source document '{doc_id}' not found")
+        chunk_ids = indexer.delete_source_document(doc_id)
+        # Forget the file so that the next folder run indexes it again
+        IngestionManifest(collection_name).remove(source["path"])
+        NearDuplicateIndex(collection_name).remove(chunk_ids)
+        return {"message": f"{len(chunk_ids)} chunks of '{source['path']}' deleted from collection '{collection_name}'"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error deleting source document: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/{collection_name}/process_pdfs", summary="Process and index PDF files")
 async def process_pdfs(
     collection_name: str,
     files: List[UploadFile] = File(..., description="PDF files to process"),
-    chunk_size: int = Query(
-        default=10000,
+    chunk_size: Optional[int] = Query(
+        default=None,
         gt=0,
-        description="Size of document chunks. Larger values mean longer but fewer chunks"
+        description=(
+            "Size of document chunks. Larger values mean longer but fewer chunks. "
+            "Defaults to 10000 characters, or 800 tokens with chunker=token"
+        )
     ),
     chunk_overlap: int = Query(
         default=200,
         ge=0,
         lt=10000,
         description="Number of characters to overlap between chunks. Helps maintain context between chunks"
+    ),
+    chunker: Literal["simple", "token", "semantic"] = Query(
+        default="simple",
+        description=(
+            "Chunker to use. 'simple' measures chunk size and overlap in characters, 'token' in tokens. "
+            "'semantic' cuts where the topic shifts between sentences, capped at chunk size characters"
+        )
+    ),
+    parallel: bool = Query(
+        default=False,
+        description="Parse and chunk PDFs in a process pool sized to the available cores"
+    ),
+    deduplicate: bool = Query(
+        default=False,
+        description="Skip chunks that are near duplicates of chunks already in the collection"
     )
 ):
     """
     Process PDF files and add their content to the collection.
     
     - Supports multiple PDF files
+    - Uploads are written to disk in fixed-size blocks and each file is indexed
+      as soon as it is saved, while the next one is still being written
     - Customize chunk size and overlap for text splitting
+    - Chunk by characters, by tokens (chunker=token) or by topic (chunker=semantic).
+      Token chunks can't exceed the input limit of the embedding model
     - Automatically processes and indexes all content
+    - Optionally parses PDFs in parallel worker processes
+    - Optionally skips near-duplicate chunks (deduplicate=true), counted in the report
     
-    Example chunk sizes:
+    Example chunk sizes (characters; 500 to 1000 tokens with chunker=token):
     - 10000: Good for general purpose use
     - 4000: Better for precise retrievals
     - 2000: Best for very specific queries
@@ -146,28 +206,34 @@ async def process_pdfs(
     - 500: More context preservation
     - 1000: Maximum context preservation
     """
+    try:
+        chunk_size = resolve_chunk_size(chunker, chunk_size, chunk_overlap)
+        for file in files:
+            upload_filename(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         pipeline = SimpleIndexChromaPipeline(
             collection_name=collection_name,
             chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
+            chunk_overlap=chunk_overlap,
+            chunker=chunker,
+            parallel=parallel,
+            deduplicate=deduplicate
         )
-        processed_docs = []
         
         with tempfile.TemporaryDirectory() as temp_dir:
-            for file in files:
-                temp_file_path = os.path.join(temp_dir, file.filename)
-                with open(temp_file_path, "wb") as buffer:
-                    buffer.write(await file.read())
-                processed_docs.extend(pipeline.process_pdf(temp_file_path))
+            summary = await ingest_uploads(pipeline, files, temp_dir)
         
         return {
-            "message": f"{len(processed_docs)} documents processed and added to collection '{collection_name}'",
+            "message": f"{summary['chunks']} documents processed and added to collection '{collection_name}'",
             "processed_files": [file.filename for file in files],
             "chunking_config": {
                 "chunk_size": chunk_size,
-                "chunk_overlap": chunk_overlap
-            }
+                "chunk_overlap": chunk_overlap,
+                "chunker": chunker
+            },
+            "report": summary
         }
     except Exception as e:
         logger.error(f"Error processing PDFs: {str(e)}")
@@ -177,26 +243,69 @@ async def process_pdfs(
 async def process_folder(
     collection_name: str,
     folder_path: str = Body(..., embed=True, description="Path to folder containing PDF files"),
-    chunk_size: int = Query(
-        default=10000,
+    chunk_size: Optional[int] = Query(
+        default=None,
         gt=0,
-        description="Size of document chunks. Larger values mean longer but fewer chunks"
+        description=(
+            "Size of document chunks. Larger values mean longer but fewer chunks. "
+            "Defaults to 10000 characters, or 800 tokens with chunker=token"
+        )
     ),
     chunk_overlap: int = Query(
         default=200,
         ge=0,
         lt=10000,
         description="Number of characters to overlap between chunks. Helps maintain context between chunks"
+    ),
+    chunker: Literal["simple", "token", "semantic"] = Query(
+        default="simple",
+        description=(
+            "Chunker to use. 'simple' measures chunk size and overlap in characters, 'token' in tokens. "
+            "'semantic' cuts where the topic shifts between sentences, capped at chunk size characters"
+        )
+    ),
+    parallel: bool = Query(
+        default=False,
+        description="Parse and chunk PDFs in a process pool sized to the available cores"
+    ),
+    deduplicate: bool = Query(
+        default=False,
+        description="Skip chunks that are near duplicates of chunks already in the collection"
+    ),
+    incremental: bool = Query(
+        default=True,
+        description="Skip files unchanged since the last run. If false, every file is re-indexed"
+    ),
+    dry_run: bool = Query(
+        default=False,
+        description="Only parse and chunk the files and report the projected chunks, tokens, cost, time and index size"
+    ),
+    estimate_assumptions: Optional[Dict[str, float]] = Body(
+        default=None,
+        description=(
+            "Dry run only: measured values replacing the assumed ones of the projection, e.g. "
+            "{\"embedding_tokens_per_second\": 150000}. The estimate lists the values still assumed"
+        )
     )
 ):
     """
     Process all PDF files in a folder and add their content to the collection.
     
-    - Processes all PDFs in the specified folder
+    - Processes all PDFs in the specified folder as a stream, with flat memory use
+    - Returns a summary of the run instead of the indexed chunks
+    - Incremental: unchanged files are skipped, modified files are re-indexed and
+      chunks of files removed from the folder are deleted
     - Customize chunk size and overlap for text splitting
+    - Chunk by characters, by tokens (chunker=token) or by topic (chunker=semantic).
+      Token chunks can't exceed the input limit of the embedding model
     - Automatically processes and indexes all content
+    - Optionally parses PDFs in parallel worker processes
+    - Optionally skips near-duplicate chunks (deduplicate=true), counted in the report
+    - dry_run=true embeds and writes nothing: it returns the chunk count, embedding
+      tokens, estimated embedding cost, ingestion time and index size instead. Time and
+      size rest on assumed rates, replaced by measured ones with estimate_assumptions
     
-    Example chunk sizes:
+    Example chunk sizes (characters; 500 to 1000 tokens with chunker=token):
     - 10000: Good for general purpose use
     - 4000: Better for precise retrievals
     - 2000: Best for very specific queries
@@ -206,21 +315,53 @@ async def process_folder(
     - 500: More context preservation
     - 1000: Maximum context preservation
     """
+    try:
+        chunk_size = resolve_chunk_size(chunker, chunk_size, chunk_overlap)
+        resolve_assumptions(estimate_assumptions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         pipeline = SimpleIndexChromaPipeline(
             collection_name=collection_name,
             chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
+            chunk_overlap=chunk_overlap,
+            chunker=chunker,
+            parallel=parallel,
+            deduplicate=deduplicate
         )
-        processed_docs = pipeline.process_folder(folder_path)
+        if dry_run:
+            # Walking, hashing and parsing the folder runs in a worker thread, off the event loop
+            estimate = await asyncio.to_thread(
+                pipeline.estimate_folder,
+                folder_path,
+                incremental=incremental,
+                assumptions=estimate_assumptions
+            )
+            return {
+                "message": (
+                    f"Indexing {estimate['files']} files would add {estimate['chunks']} documents "
+                    f"to collection '{collection_name}'"
+                ),
+                "folder_path": folder_path,
+                "chunking_config": {
+                    "chunk_size": chunk_size,
+                    "chunk_overlap": chunk_overlap,
+                    "chunker": chunker
+                },
+                "estimate": estimate
+            }
+        
+        summary = await asyncio.to_thread(pipeline.process_folder, folder_path, incremental=incremental)
         
         return {
-            "message": f"{len(processed_docs)} documents processed and added to collection '{collection_name}'",
+            "message": f"{summary['chunks']} documents processed and added to collection '{collection_name}'",
             "folder_path": folder_path,
             "chunking_config": {
                 "chunk_size": chunk_size,
-                "chunk_overlap": chunk_overlap
-            }
+                "chunk_overlap": chunk_overlap,
+                "chunker": chunker
+            },
+            "report": summary
         }
     except Exception as e:
         logger.error(f"Error processing folder: {str(e)}")
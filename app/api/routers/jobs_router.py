@@ -0,0 +1,175 @@
+from fastapi import APIRouter, HTTPException, Body, File, UploadFile, Query
+from typing import List, Literal, Optional
+from app.core.jobs.job_manager import job_manager
+from app.api.uploads import save_upload, upload_filename
+import tempfile
+import shutil
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/jobs", tags=["Ingestion Jobs"])
+
+@router.post("/{collection_name}/process_pdfs", summary="Submit a background job indexing PDF files")
+async def submit_process_pdfs(
+    collection_name: str,
+    files: List[UploadFile] = File(..., description="PDF files to process"),
+    chunk_size: Optional[int] = Query(
+        default=None,
+        gt=0,
+        description=(
+            "Size of document chunks. Larger values mean longer but fewer chunks. "
+            "Defaults to 10000 characters, or 800 tokens with chunker=token"
+        )
+    ),
+    chunk_overlap: int = Query(
+        default=200,
+        ge=0,
+        lt=10000,
+        description="Number of characters to overlap between chunks. Helps maintain context between chunks"
+    ),
+    chunker: Literal["simple", "token", "semantic"] = Query(
+        default="simple",
+        description=(
+            "Chunker to use. 'simple' measures chunk size and overlap in characters, 'token' in tokens. "
+            "'semantic' cuts where the topic shifts between sentences, capped at chunk size characters"
+        )
+    ),
+    parallel: bool = Query(
+        default=False,
+        description="Parse and chunk PDFs in a process pool sized to the available cores"
+    ),
+    deduplicate: bool = Query(
+        default=False,
+        description="Skip chunks that are near duplicates of chunks already in the collection"
+    )
+):
+    """
+    Save the uploaded PDF files and index them in a background job.
+
+    - Returns immediately with a job id
+    - Follow progress with GET /jobs/{job_id}
+    """
+    try:
+        for file in files:
+            upload_filename(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    upload_dir = tempfile.mkdtemp(prefix="ingestion-job-")
+    try:
+        file_paths = []
+        for file in files:
+            file_path, _ = await save_upload(file, upload_dir)
+            file_paths.append(file_path)
+
+        job_id = job_manager.submit_files(
+            collection_name,
+            file_paths,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            chunker=chunker,
+            parallel=parallel,
+            deduplicate=deduplicate,
+            cleanup_dir=upload_dir
+        )
+        return {"job_id": job_id, "status": "queued"}
+    except ValueError as e:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        logger.error(f"Error submitting PDF job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/{collection_name}/process_folder", summary="Submit a background job indexing a folder of PDFs")
+async def submit_process_folder(
+    collection_name: str,
+    folder_path: str = Body(..., embed=True, description="Path to folder containing PDF files"),
+    chunk_size: Optional[int] = Query(
+        default=None,
+        gt=0,
+        description=(
+            "Size of document chunks. Larger values mean longer but fewer chunks. "
+            "Defaults to 10000 characters, or 800 tokens with chunker=token"
+        )
+    ),
+    chunk_overlap: int = Query(
+        default=200,
+        ge=0,
+        lt=10000,
+        description="Number of characters to overlap between chunks. Helps maintain context between chunks"
+    ),
+    chunker: Literal["simple", "token", "semantic"] = Query(
+        default="simple",
+        description=(
+            "Chunker to use. 'simple' measures chunk size and overlap in characters, 'token' in tokens. "
+            "'semantic' cuts where the topic shifts between sentences, capped at chunk size characters"
+        )
+    ),
+    parallel: bool = Query(
+        default=False,
+        description="Parse and chunk PDFs in a process pool sized to the available cores"
+    ),
+    deduplicate: bool = Query(
+        default=False,
+        description="Skip chunks that are near duplicates of chunks already in the collection"
+    ),
+    incremental: bool = Query(
+        default=True,
+        description="Skip files unchanged since the last run. If false, every file is re-indexed"
+    )
+):
+    """
+    Index a folder of PDFs in a background job.
+
+    - Returns immediately with a job id
+    - Follow progress with GET /jobs/{job_id}
+    """
+    try:
+        job_id = job_manager.submit_folder(
+            collection_name,
+            folder_path,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            chunker=chunker,
+            parallel=parallel,
+            deduplicate=deduplicate,
+            incremental=incremental
+        )
+        return {"job_id": job_id, "status": "queued"}
+    except (NotADirectoryError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error submitting folder job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("", summary="List ingestion jobs")
+async def list_jobs(
+    collection_name: Optional[str] = Query(default=None, description="Only list jobs of this collection"),
+    limit: int = Query(default=50, gt=0, le=500, description="Maximum number of jobs to return")
+):
+    """List the most recent ingestion jobs, newest first."""
+    return {"jobs": job_manager.list_jobs(limit=limit, collection_name=collection_name)}
+
+@router.get("/{job_id}", summary="Get the status of an ingestion job")
+async def get_job(job_id: str):
+    """
+    Get the status of an ingestion job.
+
+    - Per-file progress: processed_files out of total_files, current_file
+    - Throughput in files/s and pages/s, and ETA in seconds while running
+    - Failed files with their errors
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+@router.post("/{job_id}/cancel", summary="Cancel an ingestion job")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job. Files already being processed are finished first."""
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    if not job_manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' already finished")
+    return {"message": f"Cancellation of job '{job_id}' requested"}
@@ -0,0 +1,106 @@
+import asyncio
+import hashlib
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Tuple
+from fastapi import UploadFile
+from app.core.indexers.manifest import FileFingerprint
+from app.core.pipes.simple_index_pipeline import SimpleIndexChromaPipeline, StreamRun
+import logging
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+
+def upload_filename(file: UploadFile) -> str:
+    """Name an uploaded file is saved under: the basename of its filename
+
+    Raises:
+        ValueError: If the filename is empty, only a path, or not a PDF
+    """
+    filename = os.path.basename(file.filename or "")
+    if not filename:
+        raise ValueError(f"Uploaded file has no filename: {file.filename!r}")
+    if not filename.lower().endswith(".pdf"):
+        raise ValueError(f"Uploaded file is not a PDF: {filename}")
+    return filename
+
+async def save_upload(file: UploadFile, directory: str) -> Tuple[str, FileFingerprint]:
+    """Write an uploaded file to directory in fixed-size blocks, hashing it on the way.
+
+    Only one block is held in memory at a time, whatever the size of the upload.
+    Disk writes run in a thread so the event loop keeps serving other requests.
+
+    Args:
+        file: Uploaded file
+        directory: Directory the file is written to, under the basename of its filename
+
+    Returns:
+        Tuple of (path of the written file, its fingerprint)
+
+    Raises:
+        ValueError: If the filename is empty, only a path, or not a PDF
+    """
+    file_path = os.path.join(directory, upload_filename(file))
+    digest = hashlib.sha256()
+    with open(file_path, "wb") as buffer:
+        while True:
+            block = await file.read(UPLOAD_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+            await asyncio.to_thread(buffer.write, block)
+    stat = os.stat(file_path)
+    return file_path, FileFingerprint(stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+
+async def ingest_uploads(
+    pipeline: SimpleIndexChromaPipeline,
+    files: List[UploadFile],
+    directory: str
+) -> Dict[str, Any]:
+    """Save uploaded files to directory while the pipeline ingests the ones already saved.
+
+    The streaming pipeline runs in a worker thread and reads file paths from a
+    queue, so each file is parsed as soon as it lands on disk instead of after
+    the whole upload was written. The hash computed while saving is handed to
+    the pipeline, which looks the file up in the page cache without reading it
+    again.
+
+    Args:
+        pipeline: Pipeline the files are indexed with
+        files: Uploaded files
+        directory: Directory the files are written to, must outlive the call
+
+    Returns:
+        Summary of the ingestion run
+
+    Raises:
+        Exception: If saving a file or the ingestion failed
+    """
+    landed: "queue.Queue" = queue.Queue()
+    cancel_event = threading.Event()
+    run = StreamRun(cancel_event=cancel_event)
+
+    def source(_):
+        while True:
+            file_path = landed.get()
+            if file_path is None:
+                return
+            yield file_path
+
+    ingestion = asyncio.ensure_future(asyncio.to_thread(pipeline.process_stream, source, run))
+    try:
+        for file in files:
+            file_path, fingerprint = await save_upload(file, directory)
+            run.fingerprints[file_path] = fingerprint
+            landed.put(file_path)
+    except BaseException as e:
+        logger.error(f"Error saving uploaded files: {str(e)}")
+        # Wind the run down and wait for it, directory is removed once we return
+        cancel_event.set()
+        landed.put(None)
+        await asyncio.gather(ingestion, return_exceptions=True)
+        raise
+    landed.put(None)
+    return await ingestion
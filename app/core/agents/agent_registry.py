@@ -0,0 +1,169 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+from app.core.agents.langgraph.simple_agent.agent import LangSimpleRAG
+from app.core.agents.langgraph.complex_agent.agent import LangComplexRAG
+from app.core.config.schemas import AgentConfig
+from app.core.config.default_config import (
+    AGENT_REGISTRY_MAX_SIZE,
+    AGENT_WARM_UP_CONFIGS,
+    DEFAULT_AGENT_CONFIG,
+    get_context_budget
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+AGENT_TYPES = {
+    "simple": LangSimpleRAG,
+    "complex": LangComplexRAG
+}
+
+def agent_config_key(agent_type: str, config: AgentConfig) -> str:
+    """Canonical hash of an agent type and configuration, independent of key order
+
+    The context budget is hashed as resolved by the agent, so a configuration
+    leaving it unset shares the agent of one giving the model's default budget.
+    """
+    dumped = config.model_dump(mode="json")
+    dumped["llm"]["context_budget"] = get_context_budget(config.llm)
+    canonical = json.dumps(
+        {"agent_type": agent_type, "config": dumped},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class AgentRegistry:
+    """Process-wide cache of constructed agents, keyed by a hash of their configuration.
+
+    An agent holds its LLM client, ChromaIndexer, chains and compiled graph,
+    none of which depend on the question, so requests with the same
+    configuration share one agent. The least recently used agent is evicted
+    once max_size agents are cached.
+    """
+
+    def __init__(self, max_size: int = AGENT_REGISTRY_MAX_SIZE):
+        self.max_size = max_size
+        self._agents: "OrderedDict[str, Tuple[str, AgentConfig, Any]]" = OrderedDict()
+        self._building: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, agent_type: str, config: Optional[Union[AgentConfig, Dict[str, Any]]] = None):
+        """Get the agent of a type and configuration, constructing it on first use
+
+        Args:
+            agent_type: One of AGENT_TYPES
+            config: Agent configuration, as an AgentConfig or a dict. Uses the default if None.
+
+        Returns:
+            The shared agent instance
+
+        Raises:
+            ValueError: If the agent type is unknown
+            Exception: If the agent cannot be constructed
+        """
+        if agent_type not in AGENT_TYPES:
+            raise ValueError(f"Unknown agent type: {agent_type}. Available: {list(AGENT_TYPES)}")
+        if config is None:
+            config = DEFAULT_AGENT_CONFIG
+        elif isinstance(config, dict):
+            config = AgentConfig.model_validate(config)
+        key = agent_config_key(agent_type, config)
+
+        agent = self._lookup(key)
+        if agent is not None:
+            return agent
+
+        with self._lock:
+            build_lock = self._building.setdefault(key, threading.Lock())
+        # Concurrent requests for the same new configuration wait for a single construction
+        with build_lock:
+            agent = self._lookup(key, count=False)
+            if agent is not None:
+                return agent
+            try:
+                agent = AGENT_TYPES[agent_type](config)
+            except Exception as e:
+                logger.error(f"Error constructing {agent_type} agent: {str(e)}")
+                with self._lock:
+                    self._building.pop(key, None)
+                raise
+            # Stored before its build lock is dropped, so a request arriving in between finds the agent
+            with self._lock:
+                self._agents[key] = (agent_type, config, agent)
+                self._building.pop(key, None)
+                while len(self._agents) > self.max_size:
+                    self._agents.popitem(last=False)
+                    self.evictions += 1
+            logger.info(f"Constructed {agent_type} agent for collection '{config.retriever.collection_name}'")
+            return agent
+
+    def warm_up(self, configs: Optional[Iterable[Tuple[str, AgentConfig]]] = None) -> int:
+        """Construct agents ahead of their first request
+
+        Args:
+            configs: (agent type, configuration) pairs. Uses AGENT_WARM_UP_CONFIGS if None.
+
+        Returns:
+            int: Number of agents ready in the registry
+        """
+        ready = 0
+        for agent_type, config in (AGENT_WARM_UP_CONFIGS if configs is None else configs):
+            try:
+                self.get(agent_type, config)
+                ready += 1
+            except Exception as e:
+                # A failed warm-up only means the first request pays for construction
+                logger.error(f"Error warming up {agent_type} agent: {str(e)}")
+        return ready
+
+    def invalidate(self, collection_name: Optional[str] = None) -> int:
+        """Drop cached agents, e.g. after their collection was deleted or the database reconfigured
+
+        Args:
+            collection_name: Only drop agents retrieving from this collection. Drops every agent if None.
+
+        Returns:
+            int: Number of agents dropped
+        """
+        with self._lock:
+            keys = [
+                key for key, (_, config, _) in self._agents.items()
+                if collection_name is None or config.retriever.collection_name == collection_name
+            ]
+            for key in keys:
+                del self._agents[key]
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size, hits, misses and evictions"""
+        with self._lock:
+            return {
+                "size": len(self._agents),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _lookup(self, key: str, count: bool = True):
+        with self._lock:
+            entry = self._agents.get(key)
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+            self._agents.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[2]
+
+# Global instance shared by the API routes
+agent_registry = AgentRegistry()
@@ -1,12 +1,43 @@
 from typing import Optional, List, Dict, Any
 from langchain_openai import ChatOpenAI
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, START, END
 from app.core.indexers.chroma_indexer import ChromaIndexer
 from app.core.config.schemas import AgentConfig
-from app.core.config.default_config import DEFAULT_AGENT_CONFIG
+from app.core.config.default_config import (
+    DEFAULT_AGENT_CONFIG,
+    PRE_ROUTER_AUDIT_RATE,
+    PRE_ROUTER_MIN_MARGIN,
+    PRE_ROUTER_MIN_SIMILARITY,
+    get_context_budget
+)
+from app.core.agents.langgraph.context_packer import ContextPacker
+from app.core.agents.langgraph.node_steps import Call, call, invoke, step_node
+from app.core.agents.langgraph.token_stream import astream_answer
+from app.core.agents.langgraph.session_documents import arerank, remember, rerank
+from app.core.agents.sessions import SessionPipelines, session_thread_id
+from app.core.indexers.embedding_cache import cached_embeddings
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableConfig
 from .state import GraphState
 from .tools import web_search_tool
+from .grading import (
+    grade_documents,
+    agrade_documents,
+    extract_knowledge,
+    aextract_knowledge,
+    grade_hallucination,
+    agrade_hallucination
+)
+from .grade_memo import GradeMemo, prompt_version
+from .pre_router import PreRouter, RouteDecision, get_routing_log
+from app.core.agents.langgraph.document_records import (
+    DocumentRecord,
+    merge_records,
+    record_from_chunk,
+    record_from_web_result
+)
+from app.core.agents.llm_cache import get_llm_cache
 import logging
 from dotenv import load_dotenv
 
@@ -14,6 +45,25 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Chains of the agent, the ones listed in agent_parameters.cached_chains use the LLM cache
+CHAINS = (
+    "question_router",
+    "db_query_rewriter",
+    "websearch_query_rewriter",
+    "retrieval_grader",
+    "knowledge_extractor",
+    "rag_chain",
+    "hallucination_grader",
+    "answer_grader",
+    "query_feedback_chain",
+    "generation_feedback_chain",
+    "give_up_chain",
+    "simple_question_chain"
+)
+
+# Nodes whose LLM output is the answer, streamed token by token by astream_tokens
+ANSWER_NODES = ("generator_node", "simple_question_node", "give_up_node")
+
 class LangComplexRAG:
     """LangChain Graph-based Complex RAG Agent with multiple feedback loops"""
     
@@ -24,9 +74,18 @@ class LangComplexRAG:
         # Get agent-specific parameters with defaults
         self.MAX_RETRIEVALS = self.config.agent_parameters.get("max_retrievals", 3)
         self.MAX_GENERATIONS = self.config.agent_parameters.get("max_generations", 3)
+        # Grader calls in flight, and number of relevant documents after which grading stops (None grades all)
+        self.GRADING_CONCURRENCY = self.config.agent_parameters.get("grading_concurrency", 8)
+        self.RELEVANT_DOCUMENTS_TARGET = self.config.agent_parameters.get("relevant_documents_target")
+        # Chunks retrieved with at least this relevance score are kept without grading (None grades all)
+        self.RELEVANCE_SCORE_THRESHOLD = self.config.agent_parameters.get("relevance_score_threshold")
+        # Grader outcomes are memoized per run, and shared across runs for grade_memo_ttl seconds when set
+        grade_memo_ttl = self.config.agent_parameters.get("grade_memo_ttl")
+        self.grade_memo = GradeMemo(ttl=grade_memo_ttl) if grade_memo_ttl else None
         
         logger.info(f"Initializing LangComplexRAG with max_retrievals={self.MAX_RETRIEVALS}, "
-                   f"max_generations={self.MAX_GENERATIONS}")
+                   f"max_generations={self.MAX_GENERATIONS}, grading_concurrency={self.GRADING_CONCURRENCY}, "
+                   f"relevant_documents_target={self.RELEVANT_DOCUMENTS_TARGET}")
         
         # Initialize all components
         self._initialize_components()
@@ -34,29 +93,122 @@ class LangComplexRAG:
         self._initialize_chains()
         self._initialize_nodes()
         self.pipeline = self._build_pipeline()
+        # Same graph checkpointing the state of sessions, used by runs given a session_id
+        self.session_pipelines = SessionPipelines(self._build_pipeline)
     
-    def run(self, question: str) -> str:
-        """Run the agent synchronously"""
+    def run(self, question: str, session_id: Optional[str] = None) -> str:
+        """Run the agent synchronously, continuing the earlier turns of the session if given"""
         try:
-            recursion_limit = self.config.agent_parameters.get("recursion_limit", 50)
-            inputs = ({"question": question}, {"recursion_limit": recursion_limit})
-            result = self.pipeline.invoke(inputs)
+            memo = self._grade_memo()
+            saved_before = memo.saved_calls
+            pipeline = self.session_pipelines.get() if session_id else self.pipeline
+            result = pipeline.invoke(self._turn_inputs(question), self._run_config(memo, session_id))
+            self._log_saved_calls(memo, saved_before)
             return result["generation"]
         except Exception as e:
             logger.error(f"Error running agent: {str(e)}")
             raise
 
-    def stream(self, question: str):
-        """Stream the agent's response"""
+    def stream(self, question: str, session_id: Optional[str] = None):
+        """Stream the agent's response, continuing the earlier turns of the session if given"""
         try:
-            recursion_limit = self.config.agent_parameters.get("recursion_limit", 50)
-            inputs = ({"question": question}, {"recursion_limit": recursion_limit})
-            for output in self.pipeline.stream(inputs, stream_mode='updates'):
+            memo = self._grade_memo()
+            saved_before = memo.saved_calls
+            pipeline = self.session_pipelines.get() if session_id else self.pipeline
+            for output in pipeline.stream(
+                self._turn_inputs(question), self._run_config(memo, session_id), stream_mode='updates'
+            ):
                 yield output
+            self._log_saved_calls(memo, saved_before)
         except Exception as e:
             logger.error(f"Error streaming response: {str(e)}")
             raise
-        
+
+    async def arun(self, question: str, session_id: Optional[str] = None) -> str:
+        """Run the agent asynchronously, awaiting every LLM, retriever and web search call"""
+        try:
+            memo = self._grade_memo()
+            saved_before = memo.saved_calls
+            pipeline = await self.session_pipelines.aget() if session_id else self.pipeline
+            result = await pipeline.ainvoke(self._turn_inputs(question), self._run_config(memo, session_id))
+            self._log_saved_calls(memo, saved_before)
+            return result["generation"]
+        except Exception as e:
+            logger.error(f"Error running agent: {str(e)}")
+            raise
+
+    async def astream(self, question: str, session_id: Optional[str] = None):
+        """Stream the agent's response asynchronously"""
+        try:
+            memo = self._grade_memo()
+            saved_before = memo.saved_calls
+            pipeline = await self.session_pipelines.aget() if session_id else self.pipeline
+            async for output in pipeline.astream(
+                self._turn_inputs(question), self._run_config(memo, session_id), stream_mode='updates'
+            ):
+                yield output
+            self._log_saved_calls(memo, saved_before)
+        except Exception as e:
+            logger.error(f"Error streaming response: {str(e)}")
+            raise
+
+    async def astream_tokens(self, question: str, session_id: Optional[str] = None):
+        """Stream the tokens of the answer as they are generated, with node progress.
+        A generation rejected by the graders is followed by a new answer_start event."""
+        try:
+            memo = self._grade_memo()
+            saved_before = memo.saved_calls
+            pipeline = await self.session_pipelines.aget() if session_id else self.pipeline
+            async for event in astream_answer(
+                pipeline, self._turn_inputs(question), ANSWER_NODES, self._run_config(memo, session_id)
+            ):
+                yield event
+            self._log_saved_calls(memo, saved_before)
+        except Exception as e:
+            logger.error(f"Error streaming tokens: {str(e)}")
+            raise
+
+    def _grade_memo(self) -> GradeMemo:
+        """Memo of grader outcomes for a run: the shared one if grade_memo_ttl is set, a new one otherwise"""
+        return self.grade_memo or GradeMemo()
+
+    def _run_config(self, memo: Optional[GradeMemo] = None, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Graph run configuration, carrying the grade memo of the run to the nodes and the checkpointer thread of the session"""
+        configurable = {"grade_memo": memo}
+        if session_id:
+            configurable["thread_id"] = session_thread_id("complex", self.config.retriever.collection_name, session_id)
+        return {
+            "recursion_limit": self.config.agent_parameters.get("recursion_limit", 50),
+            "configurable": configurable
+        }
+
+    @staticmethod
+    def _turn_inputs(question: str) -> Dict[str, Any]:
+        """Graph inputs of a question, resetting the state of a session's previous turn but its documents"""
+        return {name: value for name, value in GraphState(question=question) if name != "session_documents"}
+
+    def _llm(self, chain: str):
+        """LLM of a chain, behind the LLM cache if the chain is listed in cached_chains"""
+        return self.cached_llm_engine if chain in self.cached_chains else self.llm_engine
+
+    def _local_route(self, question: str, decision: RouteDecision) -> Optional[str]:
+        """Route decided by the pre-router, or None when the LLM router must be called to decide or audit it"""
+        if decision.route is None or self.pre_router.should_audit():
+            return None
+        get_routing_log().record(question, decision)
+        logger.info(f"Pre-router routed the question to {decision.route} ({decision.source})")
+        return decision.route
+
+    @staticmethod
+    def _log_llm_route(question: str, decision: RouteDecision, llm_route: str):
+        get_routing_log().record(question, decision, llm_route)
+        if decision.route is not None and decision.route != llm_route:
+            logger.info(f"Pre-router chose {decision.route}, LLM router chose {llm_route}")
+
+    @staticmethod
+    def _log_saved_calls(memo: GradeMemo, saved_before: int):
+        logger.info(f"Grade memo saved {memo.saved_calls - saved_before} LLM calls in this run")
+
     def _initialize_components(self):
         """Initialize base components: LLM and Retriever"""
         try:
@@ -66,9 +218,37 @@ class LangComplexRAG:
                 **self.config.llm.parameters
             )
             
+            # Same LLM behind the LLM cache, answering the chains listed in cached_chains
+            cached_chains = set(self.config.agent_parameters.get("cached_chains", []))
+            unknown_chains = cached_chains - set(CHAINS)
+            if unknown_chains:
+                raise ValueError(f"Unknown chains in cached_chains: {sorted(unknown_chains)}. Available: {list(CHAINS)}")
+            self.cached_chains = cached_chains
+            self.cached_llm_engine = ChatOpenAI(
+                model=self.config.llm.name,
+                cache=get_llm_cache(),
+                **self.config.llm.parameters
+            ) if cached_chains else self.llm_engine
+            
+            # Packs the retrieved documents of a generation within the token budget of the model
+            self.context_packer = ContextPacker(
+                budget=get_context_budget(self.config.llm),
+                model=self.config.llm.name
+            )
+            
             # Initialize Retriever
             self.indexer = ChromaIndexer(self.config.retriever)
-            self.retriever = self.indexer.as_retriever()
+            # Embeds session documents not stored in the collection when re-ranking them
+            self.session_embeddings = cached_embeddings(self.indexer.vectorstore.embeddings)
+            
+            # Local first stage of the question router, the LLM router decides the questions it is unsure of
+            parameters = self.config.agent_parameters
+            self.pre_router = PreRouter(
+                self.indexer,
+                min_similarity=parameters.get("pre_router_min_similarity", PRE_ROUTER_MIN_SIMILARITY),
+                min_margin=parameters.get("pre_router_min_margin", PRE_ROUTER_MIN_MARGIN),
+                audit_rate=parameters.get("pre_router_audit_rate", PRE_ROUTER_AUDIT_RATE)
+            ) if parameters.get("pre_router") else None
             
             logger.info("Components initialized successfully")
         except Exception as e:
@@ -117,20 +297,27 @@ class LangComplexRAG:
             )
             
             # Basic chains
-            self.rag_chain = rag_prompt | self.llm_engine | StrOutputParser()
-            self.db_query_rewriter = db_query_rewrite_prompt | self.llm_engine | StrOutputParser()
-            self.query_feedback_chain = query_feedback_prompt | self.llm_engine | StrOutputParser()
-            self.generation_feedback_chain = generation_feedback_prompt | self.llm_engine | StrOutputParser()
-            self.give_up_chain = give_up_prompt | self.llm_engine | StrOutputParser()
-            self.knowledge_extractor = knowledge_extraction_prompt | self.llm_engine | StrOutputParser()
-            self.websearch_query_rewriter = websearch_query_rewrite_prompt | self.llm_engine | StrOutputParser()
-            self.simple_question_chain = simple_question_prompt | self.llm_engine | StrOutputParser()
+            self.rag_chain = rag_prompt | self._llm("rag_chain") | StrOutputParser()
+            self.db_query_rewriter = db_query_rewrite_prompt | self._llm("db_query_rewriter") | StrOutputParser()
+            self.query_feedback_chain = query_feedback_prompt | self._llm("query_feedback_chain") | StrOutputParser()
+            self.generation_feedback_chain = generation_feedback_prompt | self._llm("generation_feedback_chain") | StrOutputParser()
+            self.give_up_chain = give_up_prompt | self._llm("give_up_chain") | StrOutputParser()
+            self.knowledge_extractor = knowledge_extraction_prompt | self._llm("knowledge_extractor") | StrOutputParser()
+            self.websearch_query_rewriter = websearch_query_rewrite_prompt | self._llm("websearch_query_rewriter") | StrOutputParser()
+            self.simple_question_chain = simple_question_prompt | self._llm("simple_question_chain") | StrOutputParser()
             
             # Structured output chains
-            self.hallucination_grader = hallucination_prompt | self.llm_engine.with_structured_output(self.parsers["hallucination"])
-            self.answer_grader = answer_prompt | self.llm_engine.with_structured_output(self.parsers["answer"])
-            self.retrieval_grader = grade_doc_prompt | self.llm_engine.with_structured_output(self.parsers["documents"])
-            self.question_router = router_prompt | self.llm_engine.with_structured_output(self.parsers["route"])
+            self.hallucination_grader = hallucination_prompt | self._llm("hallucination_grader").with_structured_output(self.parsers["hallucination"])
+            self.answer_grader = answer_prompt | self._llm("answer_grader").with_structured_output(self.parsers["answer"])
+            self.retrieval_grader = grade_doc_prompt | self._llm("retrieval_grader").with_structured_output(self.parsers["documents"])
+            self.question_router = router_prompt | self._llm("question_router").with_structured_output(self.parsers["route"])
+
+            # Versions keying the grade memo, a change of prompt or model invalidates memoized outcomes
+            self.grader_versions = {
+                "retrieval_grader": prompt_version(grade_doc_prompt, self.config.llm),
+                "knowledge_extractor": prompt_version(knowledge_extraction_prompt, self.config.llm),
+                "hallucination_grader": prompt_version(hallucination_prompt, self.config.llm)
+            }
             
             logger.info("Chains initialized successfully")
         except Exception as e:
@@ -138,20 +325,48 @@ class LangComplexRAG:
             raise
     
     def _initialize_nodes(self):
-        """Initialize all nodes with exact same logic as original"""
+        """Initialize all nodes with exact same logic as original
+        
+        Nodes calling LLMs, the retriever or web search are written once as
+        steps yielding those calls, and run them blocking under invoke and
+        stream and awaited under ainvoke and astream (see step_node).
+        """
         try:
+            def run_memo(config: RunnableConfig) -> Optional[GradeMemo]:
+                return (config or {}).get("configurable", {}).get("grade_memo")
+
+            def grading(documents: List[DocumentRecord], question: str, config: RunnableConfig) -> Call:
+                # grade the documents concurrently and keep the ones graded as relevant,
+                # stopping early once we have enough of them
+                return call(
+                    grade_documents,
+                    agrade_documents,
+                    self.retrieval_grader,
+                    question,
+                    documents,
+                    concurrency=self.GRADING_CONCURRENCY,
+                    target=self.RELEVANT_DOCUMENTS_TARGET,
+                    memo=run_memo(config),
+                    version=self.grader_versions["retrieval_grader"],
+                    score_threshold=self.RELEVANCE_SCORE_THRESHOLD
+                )
+
             def retriever_node(state: GraphState):
-                new_documents = self.retriever.invoke(state.rewritten_question)
-                new_documents = [d.page_content for d in new_documents]
-                state.documents.extend(new_documents)
+                results = yield call(
+                    self.indexer.retrieve, self.indexer.aretrieve, state.rewritten_question, exclude_ids=state.seen_ids
+                )
+                # we keep compact records of the new chunks, and remember their ids
+                # so the next retrievals only ask for chunks not seen yet
+                new_records = [record_from_chunk(doc, score) for doc, score in results]
                 return {
-                    "documents": state.documents, 
+                    "documents": merge_records(state.documents, new_records),
+                    "seen_ids": state.seen_ids + [record.id for record in new_records],
                     "retrieval_num": state.retrieval_num + 1
                 }
 
             def generation_node(state: GraphState):
-                generation = self.rag_chain.invoke({
-                    "context": "\n\n".join(state.documents), 
+                generation = yield invoke(self.rag_chain, {
+                    "context": self.context_packer.pack(state.documents), 
                     "question": state.question, 
                     "feedback": "\n".join(state.generation_feedbacks)
                 })
@@ -161,20 +376,26 @@ class LangComplexRAG:
                 }
 
             def db_query_rewriting_node(state: GraphState):
-                rewritten_question = self.db_query_rewriter.invoke({
+                rewritten_question = yield invoke(self.db_query_rewriter, {
                     "question": state.question,
                     "feedback": "\n".join(state.query_feedbacks)
                 })
                 return {"rewritten_question": rewritten_question, "search_mode": "vectorstore"} 
 
-            def answer_evaluation_node(state: GraphState):
-                # assess hallucination
-                hallucination_grade = self.hallucination_grader.invoke(
-                    {"documents": state.documents, "generation": state.generation}
+            def answer_evaluation_node(state: GraphState, config: RunnableConfig):
+                # assess hallucination against the context the generation was given
+                hallucination_score = yield call(
+                    grade_hallucination,
+                    agrade_hallucination,
+                    self.hallucination_grader,
+                    self.context_packer.pack(state.documents),
+                    state.generation,
+                    memo=run_memo(config),
+                    version=self.grader_versions["hallucination_grader"]
                 )
-                if hallucination_grade.binary_score == "yes":
+                if hallucination_score == "yes":
                     # if no hallucination, assess relevance
-                    answer_grade = self.answer_grader.invoke({
+                    answer_grade = yield invoke(self.answer_grader, {
                         "question": state.question, 
                         "generation": state.generation
                     })
@@ -193,9 +414,9 @@ class LangComplexRAG:
                     return "hallucination" 
                 
             def generation_feedback_node(state: GraphState):
-                feedback = self.generation_feedback_chain.invoke({
+                feedback = yield invoke(self.generation_feedback_chain, {
                     "question": state.question,
-                    "documents": "\n\n".join(state.documents),
+                    "documents": self.context_packer.pack(state.documents),
                     "generation": state.generation
                 })
 
@@ -206,10 +427,10 @@ class LangComplexRAG:
                 return {"generation_feedbacks": state.generation_feedbacks}
 
             def query_feedback_node(state: GraphState):
-                feedback = self.query_feedback_chain.invoke({
+                feedback = yield invoke(self.query_feedback_chain, {
                     "question": state.question,
                     "rewritten_question": state.rewritten_question,
-                    "documents": "\n\n".join(state.documents),
+                    "documents": self.context_packer.pack(state.documents),
                     "generation": state.generation
                 })
 
@@ -220,22 +441,28 @@ class LangComplexRAG:
                 return {"query_feedbacks": state.query_feedbacks}
 
             def give_up_node(state: GraphState):
-                response = self.give_up_chain.invoke(state.question)
+                response = yield invoke(self.give_up_chain, state.question)
                 return {"generation": response}
 
-            def filter_relevant_documents_node(state: GraphState):
-                # first, we grade every documents
-                grades = self.retrieval_grader.batch([
-                    {"question": state.question, "document": doc} 
-                    for doc in state.documents
-                ])
-                # Then we keep only the documents that were graded as relevant
-                filtered_docs = [
-                    doc for grade, doc 
-                    in zip(grades, state.documents) 
-                    if grade.binary_score == 'yes'
-                ]
+            def session_documents_node(state: GraphState, config: RunnableConfig):
+                # Documents found relevant in earlier turns of a session are re-ranked and graded
+                # against the new question, the relevant ones skip routing and retrieval
+                if not state.session_documents:
+                    # Candidates graded irrelevant are not retrieved again in this turn
+                    return {"seen_ids": []}
+                ranked = yield call(
+                    rerank, arerank, self.indexer, self.session_embeddings, state.question, state.session_documents
+                )
+                candidates = ranked[:self.config.retriever.k]
+                relevant = yield grading(candidates, state.question, config)
+                update = {"seen_ids": [doc.id for doc in candidates]}
+                if relevant:
+                    logger.info(f"Reusing {len(relevant)} relevant documents of the session")
+                    update.update({"documents": relevant, "search_mode": "vectorstore"})
+                return update
 
+            def filter_relevant_documents_node(state: GraphState, config: RunnableConfig):
+                filtered_docs = yield grading(state.documents, state.question, config)
                 # If we didn't get any relevant document, let's capture that 
                 # as a feedback for the next retrieval iteration
                 if not filtered_docs:
@@ -246,28 +473,43 @@ class LangComplexRAG:
 
                 return {
                     "documents": filtered_docs, 
-                    "query_feedbacks": state.query_feedbacks
+                    "query_feedbacks": state.query_feedbacks,
+                    "session_documents": remember(state.session_documents, filtered_docs)
                 }
 
-            def knowledge_extractor_node(state: GraphState):
-                filtered_docs = self.knowledge_extractor.batch([
-                    {"question": state.question, "document": doc} 
-                    for doc in state.documents
-                ])
-                # we keep only the non empty documents
-                filtered_docs = [doc for doc in filtered_docs if doc]
+            def knowledge_extractor_node(state: GraphState, config: RunnableConfig):
+                filtered_docs = yield call(
+                    extract_knowledge,
+                    aextract_knowledge,
+                    self.knowledge_extractor,
+                    state.question,
+                    state.documents,
+                    memo=run_memo(config),
+                    version=self.grader_versions["knowledge_extractor"]
+                )
                 return {"documents": filtered_docs}
 
             def router_node(state: GraphState):
-                route_query = self.question_router.invoke(state.question)
-                return route_query.route
+                if self.pre_router is None:
+                    return (yield invoke(self.question_router, state.question)).route
+                decision = yield call(self.pre_router.route, self.pre_router.aroute, state.question)
+                route = self._local_route(state.question, decision)
+                if route is None:
+                    route = (yield invoke(self.question_router, state.question)).route
+                    self._log_llm_route(state.question, decision, route)
+                return route
+
+            def session_route_node(state: GraphState):
+                if state.documents:
+                    return "knowledge_extraction"
+                return (yield from router_node(state))
 
             def simple_question_node(state: GraphState):
-                answer = self.simple_question_chain.invoke(state.question)
+                answer = yield invoke(self.simple_question_chain, state.question)
                 return {"generation": answer, "search_mode": "QA_LM"}
 
             def websearch_query_rewriting_node(state: GraphState):
-                rewritten_question = self.websearch_query_rewriter.invoke({
+                rewritten_question = yield invoke(self.websearch_query_rewriter, {
                     "question": state.question, 
                     "feedback": "\n".join(state.query_feedbacks)
                 })
@@ -281,20 +523,11 @@ class LangComplexRAG:
 
             def web_search_node(state: GraphState):
                 try:
-                    new_docs = web_search_tool.invoke(
-                        {"query": state.rewritten_question}
-                    )
-                    
-                    if isinstance(new_docs, str):
-                        web_results = [new_docs]
-                    elif isinstance(new_docs, list):
-                        web_results = [d.get("content", str(d)) if isinstance(d, dict) else str(d) for d in new_docs]
-                    else:
-                        web_results = [str(new_docs)]
-                    
-                    state.documents.extend(web_results)
+                    new_docs = yield invoke(web_search_tool, {"query": state.rewritten_question})
+                    if not isinstance(new_docs, list):
+                        new_docs = [new_docs]
                     return {
-                        "documents": state.documents, 
+                        "documents": merge_records(state.documents, [record_from_web_result(d) for d in new_docs]),
                         "retrieval_num": state.retrieval_num + 1
                     }
                 except Exception as e:
@@ -310,7 +543,7 @@ class LangComplexRAG:
                 if state.documents:
                     # we have relevant documents
                     return "knowledge_extraction"
-                elif state.search_mode == 'vectorsearch' and state.retrieval_num > self.MAX_RETRIEVALS:
+                elif state.search_mode == 'vectorstore' and state.retrieval_num > self.MAX_RETRIEVALS:
                     # we don't have relevant documents
                     # and we reached the maximum number of retrievals
                     return "max_db_search"
@@ -324,20 +557,21 @@ class LangComplexRAG:
                     return state.search_mode
 
             self.nodes = {
-                "retriever_node": retriever_node,
-                "generation_node": generation_node,
-                "db_query_rewriting_node": db_query_rewriting_node,
-                "generation_feedback": generation_feedback_node,
-                "generation_feedback_node": query_feedback_node,
-                "give_up_node": give_up_node,
-                "filter_relevant_documents_node": filter_relevant_documents_node,
-                "knowledge_extractor_node": knowledge_extractor_node,
-                "simple_question_node": simple_question_node,
-                "websearch_query_rewriting_node": websearch_query_rewriting_node,
-                "web_search_node": web_search_node,
-                "router_node": router_node,
+                "retriever_node": step_node(retriever_node),
+                "generation_node": step_node(generation_node),
+                "db_query_rewriting_node": step_node(db_query_rewriting_node),
+                "generation_feedback": step_node(generation_feedback_node),
+                "generation_feedback_node": step_node(query_feedback_node),
+                "give_up_node": step_node(give_up_node),
+                "filter_relevant_documents_node": step_node(filter_relevant_documents_node),
+                "knowledge_extractor_node": step_node(knowledge_extractor_node),
+                "simple_question_node": step_node(simple_question_node),
+                "websearch_query_rewriting_node": step_node(websearch_query_rewriting_node),
+                "web_search_node": step_node(web_search_node),
+                "session_documents_node": step_node(session_documents_node),
+                "session_route_node": step_node(session_route_node),
                 "search_mode_node": search_mode_node,
-                "answer_evaluation_node": answer_evaluation_node,
+                "answer_evaluation_node": step_node(answer_evaluation_node),
                 "relevant_documents_validation_node": relevant_documents_validation_node
             }
             
@@ -346,8 +580,8 @@ class LangComplexRAG:
             logger.error(f"Error initializing nodes: {str(e)}")
             raise
     
-    def _build_pipeline(self) -> StateGraph:
-        """Build the LangGraph pipeline"""
+    def _build_pipeline(self, checkpointer: Optional[BaseCheckpointSaver] = None) -> StateGraph:
+        """Build the LangGraph pipeline, checkpointing its state with checkpointer if given"""
         try:
             # Create graph
             graph = StateGraph(GraphState)
@@ -364,12 +598,15 @@ class LangComplexRAG:
             graph.add_node('give_up_node', self.nodes['give_up_node'])
             graph.add_node('filter_docs_node', self.nodes['filter_relevant_documents_node'])
             graph.add_node('extract_knowledge_node', self.nodes['knowledge_extractor_node'])
+            graph.add_node('session_documents_node', self.nodes['session_documents_node'])
 
-            # Add conditional edges from START
+            # Reuse the relevant documents of the session, or route the question
+            graph.add_edge(START, 'session_documents_node')
             graph.add_conditional_edges(
-                START,
-                self.nodes['router_node'],
+                'session_documents_node',
+                self.nodes['session_route_node'],
                 {
+                    "knowledge_extraction": 'extract_knowledge_node',
                     "vectorstore": 'db_query_rewrite_node',
                     "websearch": 'websearch_query_rewriting_node',
                     "QA_LM": 'simple_question_node'
@@ -422,7 +659,7 @@ class LangComplexRAG:
             )
 
             logger.info("Pipeline built successfully")
-            return graph.compile()
+            return graph.compile(checkpointer=checkpointer)
 
         except Exception as e:
             logger.error(f"Error building pipeline: {str(e)}")
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from langchain_core.load import dumpd
+from langchain_core.prompts import BasePromptTemplate
+from app.core.config.schemas import LLMConfig
+from app.core.config.default_config import GRADE_MEMO_MAX_SIZE
+
+# Returned by GradeMemo.get when nothing is memoized, outcomes themselves may be falsy
+MISSING = object()
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def prompt_version(prompt: BasePromptTemplate, llm: LLMConfig) -> str:
+    """Version of a grader: its prompt together with the model and parameters answering it"""
+    serialized = json.dumps(
+        {"prompt": dumpd(prompt), "llm": llm.model_dump(mode="json")},
+        sort_keys=True,
+        default=str
+    )
+    return text_hash(serialized)[:16]
+
+class GradeMemo:
+    """Memo of grader outcomes, keyed by (question hash, document hash, grader prompt version).
+
+    A run of the complex agent grades the same documents again on every
+    retrieval loop. Outcomes are looked up here before calling the LLM. A
+    memo lives for one run, or is shared across runs when given a ttl, in
+    which case entries expire after ttl seconds and the least recently used
+    ones are evicted beyond max_size.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_size: int = GRADE_MEMO_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def get(self, grader: str, version: str, question: str, document: str) -> Any:
+        """Get a memoized outcome, or MISSING
+
+        Args:
+            grader: Name of the grader, used to report saved calls
+            version: prompt_version of the grader
+            question: Question (or generation) the grader was asked about
+            document: Document (or context) that was graded
+        """
+        key = (version, text_hash(question), text_hash(document))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses[grader] = self.misses.get(grader, 0) + 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits[grader] = self.hits.get(grader, 0) + 1
+            return entry[1]
+
+    def put(self, version: str, question: str, document: str, outcome: Any):
+        """Memoize the outcome of a grader call"""
+        key = (version, text_hash(question), text_hash(document))
+        with self._lock:
+            self._entries[key] = (time.time(), outcome)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    @property
+    def saved_calls(self) -> int:
+        """Number of LLM calls answered from the memo"""
+        with self._lock:
+            return sum(self.hits.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Entries, and saved and made calls per grader"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "saved_calls": dict(self.hits),
+                "llm_calls": dict(self.misses)
+            }
@@ -0,0 +1,225 @@
+import asyncio
+from concurrent.futures import as_completed
+from typing import List, Optional, Tuple
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from app.core.agents.langgraph.document_records import DocumentRecord
+from .grade_memo import GradeMemo, MISSING
+import logging
+
+logger = logging.getLogger(__name__)
+
+def known_grades(
+    memo: Optional[GradeMemo],
+    version: str,
+    question: str,
+    documents: List[DocumentRecord],
+    score_threshold: Optional[float] = None
+) -> Tuple[List[int], List[int]]:
+    """Split documents into the indexes of ones known to be relevant and those still to grade
+
+    A document is known to be relevant if its retrieval score reaches
+    score_threshold, or if the memo holds a relevant grade for it. Documents
+    the memo holds as irrelevant are in neither list.
+    """
+    relevant, pending = [], []
+    for index, doc in enumerate(documents):
+        if score_threshold is not None and doc.score is not None and doc.score >= score_threshold:
+            relevant.append(index)
+            continue
+        score = memo.get("retrieval_grader", version, question, doc.id) if memo is not None else MISSING
+        if score is MISSING:
+            pending.append(index)
+        elif score == "yes":
+            relevant.append(index)
+    return relevant, pending
+
+def grade_documents(
+    grader: Runnable,
+    question: str,
+    documents: List[DocumentRecord],
+    concurrency: int = 8,
+    target: Optional[int] = None,
+    memo: Optional[GradeMemo] = None,
+    version: str = "",
+    score_threshold: Optional[float] = None
+) -> List[DocumentRecord]:
+    """Grade documents concurrently, stopping once enough are relevant
+
+    Args:
+        grader: Chain returning a GradeDocuments for a question and a document
+        question: The user question
+        documents: Documents to grade
+        concurrency: Maximum number of grader calls in flight
+        target: Stop once this many documents are graded relevant. Grades every document if None.
+        memo: Memo of grades by document id, documents already graded for the question are not sent again
+        version: prompt_version of the grader, keying the memo
+        score_threshold: Documents retrieved with at least this score are relevant without grading
+
+    Returns:
+        List[DocumentRecord]: The documents graded relevant, in their original order
+    """
+    relevant, pending = known_grades(memo, version, question, documents, score_threshold)
+    graded = 0
+    if pending and not (target and len(relevant) >= target):
+        executor = ContextThreadPoolExecutor(max_workers=max(1, concurrency))
+        try:
+            futures = {
+                executor.submit(grader.invoke, {"question": question, "document": documents[index].text}): index
+                for index in pending
+            }
+            for future in as_completed(futures):
+                graded += 1
+                index = futures[future]
+                score = future.result().binary_score
+                if memo is not None:
+                    memo.put(version, question, documents[index].id, score)
+                if score == "yes":
+                    relevant.append(index)
+                    if target and len(relevant) >= target:
+                        break
+        finally:
+            # Grades not started yet are skipped, those in flight are left to finish and ignored
+            executor.shutdown(wait=False, cancel_futures=True)
+    logger.info(f"Graded {graded} of {len(documents)} documents, {len(relevant)} relevant")
+    return [documents[index] for index in sorted(relevant)]
+
+async def agrade_documents(
+    grader: Runnable,
+    question: str,
+    documents: List[DocumentRecord],
+    concurrency: int = 8,
+    target: Optional[int] = None,
+    memo: Optional[GradeMemo] = None,
+    version: str = "",
+    score_threshold: Optional[float] = None
+) -> List[DocumentRecord]:
+    """Grade documents concurrently, stopping once enough are relevant
+
+    Same as grade_documents, with grader calls awaited on the event loop and
+    the remaining ones cancelled when the target is reached.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def grade(index: int):
+        async with semaphore:
+            result = await grader.ainvoke({"question": question, "document": documents[index].text})
+        if memo is not None:
+            memo.put(version, question, documents[index].id, result.binary_score)
+        return index, result.binary_score == "yes"
+
+    relevant, pending = known_grades(memo, version, question, documents, score_threshold)
+    graded = 0
+    if pending and not (target and len(relevant) >= target):
+        tasks = [asyncio.create_task(grade(index)) for index in pending]
+        try:
+            for next_grade in asyncio.as_completed(tasks):
+                index, is_relevant = await next_grade
+                graded += 1
+                if is_relevant:
+                    relevant.append(index)
+                    if target and len(relevant) >= target:
+                        break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    logger.info(f"Graded {graded} of {len(documents)} documents, {len(relevant)} relevant")
+    return [documents[index] for index in sorted(relevant)]
+
+def extracted_records(documents: List[DocumentRecord], extractions: List[str]) -> List[DocumentRecord]:
+    """Records holding the extracted knowledge in place of the text, empty extractions dropped"""
+    return [
+        doc.model_copy(update={"text": extraction})
+        for doc, extraction in zip(documents, extractions)
+        if extraction
+    ]
+
+def extract_knowledge(
+    extractor: Runnable,
+    question: str,
+    documents: List[DocumentRecord],
+    memo: Optional[GradeMemo] = None,
+    version: str = ""
+) -> List[DocumentRecord]:
+    """Extract the knowledge relevant to the question from each document, reusing memoized extractions
+
+    Returns:
+        List[DocumentRecord]: The documents with their extracted knowledge, without the ones that had none
+    """
+    extractions = [
+        memo.get("knowledge_extractor", version, question, doc.id) if memo is not None else MISSING
+        for doc in documents
+    ]
+    pending = [index for index, extraction in enumerate(extractions) if extraction is MISSING]
+    if pending:
+        results = extractor.batch([{"question": question, "document": documents[index].text} for index in pending])
+        for index, result in zip(pending, results):
+            extractions[index] = result
+            if memo is not None:
+                memo.put(version, question, documents[index].id, result)
+    return extracted_records(documents, extractions)
+
+async def aextract_knowledge(
+    extractor: Runnable,
+    question: str,
+    documents: List[DocumentRecord],
+    memo: Optional[GradeMemo] = None,
+    version: str = ""
+) -> List[DocumentRecord]:
+    """Async version of extract_knowledge"""
+    extractions = [
+        memo.get("knowledge_extractor", version, question, doc.id) if memo is not None else MISSING
+        for doc in documents
+    ]
+    pending = [index for index, extraction in enumerate(extractions) if extraction is MISSING]
+    if pending:
+        results = await extractor.abatch(
+            [{"question": question, "document": documents[index].text} for index in pending]
+        )
+        for index, result in zip(pending, results):
+            extractions[index] = result
+            if memo is not None:
+                memo.put(version, question, documents[index].id, result)
+    return extracted_records(documents, extractions)
+
+def grade_hallucination(
+    grader: Runnable,
+    context: str,
+    generation: str,
+    memo: Optional[GradeMemo] = None,
+    version: str = ""
+) -> str:
+    """Grade whether a generation is grounded in its context, reusing a memoized grade
+
+    Args:
+        grader: Chain returning a GradeHallucinations for documents and a generation
+        context: The context the generation was given, as packed by the ContextPacker
+        generation: The generated answer
+        memo: Memo of grades by generation and context
+        version: prompt_version of the grader, keying the memo
+
+    Returns:
+        str: The binary score, 'yes' if the generation is grounded
+    """
+    score = memo.get("hallucination_grader", version, generation, context) if memo is not None else MISSING
+    if score is MISSING:
+        score = grader.invoke({"documents": context, "generation": generation}).binary_score
+        if memo is not None:
+            memo.put(version, generation, context, score)
+    return score
+
+async def agrade_hallucination(
+    grader: Runnable,
+    context: str,
+    generation: str,
+    memo: Optional[GradeMemo] = None,
+    version: str = ""
+) -> str:
+    """Async version of grade_hallucination"""
+    score = memo.get("hallucination_grader", version, generation, context) if memo is not None else MISSING
+    if score is MISSING:
+        score = (await grader.ainvoke({"documents": context, "generation": generation})).binary_score
+        if memo is not None:
+            memo.put(version, generation, context, score)
+    return score
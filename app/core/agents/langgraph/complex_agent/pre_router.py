@@ -0,0 +1,250 @@
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import numpy as np
+from pydantic import BaseModel, Field
+from langchain_core.runnables.config import run_in_executor
+from app.core.indexers.chroma_indexer import ChromaIndexer
+from app.core.indexers.embedding_cache import cached_embeddings
+from app.core.config.default_config import (
+    PRE_ROUTER_AUDIT_RATE,
+    PRE_ROUTER_DB_PATH,
+    PRE_ROUTER_EXEMPLARS,
+    PRE_ROUTER_LOG_MAX_ENTRIES,
+    PRE_ROUTER_MIN_MARGIN,
+    PRE_ROUTER_MIN_SIMILARITY
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Questions matching these are routed without embedding them. Only unambiguous phrasings are
+# listed: a word such as "today's", "forecast" or a year also appears in questions about the
+# documents, and is left to the exemplars or the LLM router. Web search needs a recency word
+# together with the live quantity asked for
+LEXICAL_RULES = [
+    ("websearch", re.compile(
+        r"\b(weather|forecast)\s+(today|tonight|tomorrow|this (week|weekend)|right now)\b"
+        r"|\b(breaking|latest|today'?s) news\b"
+        r"|\b(current|latest|live|today'?s) (stock|share) prices?\b"
+        r"|\b(current|latest|live|today'?s) exchange rates?\b",
+        re.IGNORECASE
+    )),
+    ("QA_LM", re.compile(
+        r"^\s*(hi|hello|hey|thanks|thank you|good (morning|afternoon|evening))\b[\s\w,]{0,20}[!.?]*\s*$",
+        re.IGNORECASE
+    )),
+    ("QA_LM", re.compile(r"^\s*(what is|compute|calculate)?\s*[\d\s.]+([-+*/^%x][\d\s.()]+)+[=?\s]*$", re.IGNORECASE))
+]
+
+# Chunks of the collection compared to the question for the vectorstore route
+NEAREST_CHUNKS = 3
+
+class RouteDecision(BaseModel):
+    """Outcome of the pre-router for a question"""
+    route: Optional[str] = Field(default=None, description="Route decided locally, None when the LLM router must decide")
+    guess: Optional[str] = Field(default=None, description="Best local route, decided or not")
+    source: str = Field(..., description="rule, embedding, or fallback when the decision is left to the LLM")
+    score: Optional[float] = Field(default=None, description="Similarity of the best route")
+    margin: Optional[float] = Field(default=None, description="Lead of the best route over the runner-up")
+
+def unit_rows(vectors: List[List[float]]) -> np.ndarray:
+    matrix = np.array(vectors, dtype=np.float32).reshape(len(vectors), -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+class PreRouter:
+    """Local first stage of the question router of the complex agent.
+
+    Questions matching a lexical rule are routed directly. Otherwise the
+    question embedding is compared with labeled exemplars of each route and,
+    for the vectorstore route, with the nearest chunks of the collection. The
+    best route is taken when its similarity reaches min_similarity and leads
+    the runner-up by min_margin; the LLM router decides the other questions.
+    """
+
+    def __init__(
+        self,
+        indexer: ChromaIndexer,
+        exemplars: Optional[Dict[str, List[str]]] = None,
+        min_similarity: float = PRE_ROUTER_MIN_SIMILARITY,
+        min_margin: float = PRE_ROUTER_MIN_MARGIN,
+        audit_rate: float = PRE_ROUTER_AUDIT_RATE
+    ):
+        self.indexer = indexer
+        self.embeddings = indexer.vectorstore.embeddings
+        self.exemplars = exemplars or PRE_ROUTER_EXEMPLARS
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.audit_rate = audit_rate
+        self._exemplar_vectors: Optional[Dict[str, np.ndarray]] = None
+        self._lock = threading.Lock()
+
+    def route(self, question: str) -> RouteDecision:
+        """Route a question locally, or leave it to the LLM router (route None)"""
+        try:
+            decision = self._rule_decision(question)
+            if decision is None:
+                decision = self._embedding_decision(self.embeddings.embed_query(question))
+            return decision
+        except Exception as e:
+            logger.error(f"Error pre-routing question: {str(e)}")
+            return RouteDecision(source="fallback")
+
+    async def aroute(self, question: str) -> RouteDecision:
+        """Async version of route"""
+        try:
+            decision = self._rule_decision(question)
+            if decision is None:
+                embedding = await self.embeddings.aembed_query(question)
+                decision = await run_in_executor(None, self._embedding_decision, embedding)
+            return decision
+        except Exception as e:
+            logger.error(f"Error pre-routing question: {str(e)}")
+            return RouteDecision(source="fallback")
+
+    def should_audit(self) -> bool:
+        """Whether a local decision is also sent to the LLM router to measure accuracy"""
+        return random.random() < self.audit_rate
+
+    @staticmethod
+    def _rule_decision(question: str) -> Optional[RouteDecision]:
+        for route, pattern in LEXICAL_RULES:
+            if pattern.search(question):
+                return RouteDecision(route=route, guess=route, source="rule", score=1.0)
+        return None
+
+    def _embedding_decision(self, embedding: List[float]) -> RouteDecision:
+        query = unit_rows([embedding])[0]
+        scores = {
+            route: float(np.max(vectors @ query)) if len(vectors) else 0.0
+            for route, vectors in self._exemplar_matrix().items()
+        }
+        nearest = self.indexer.nearest_embeddings(embedding, NEAREST_CHUNKS)
+        if nearest:
+            scores["vectorstore"] = max(scores.get("vectorstore", 0.0), float(np.max(unit_rows(nearest) @ query)))
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        guess, score = ranked[0]
+        margin = score - ranked[1][1] if len(ranked) > 1 else score
+        confident = score >= self.min_similarity and margin >= self.min_margin
+        return RouteDecision(
+            route=guess if confident else None,
+            guess=guess,
+            source="embedding" if confident else "fallback",
+            score=round(score, 4),
+            margin=round(margin, 4)
+        )
+
+    def _exemplar_matrix(self) -> Dict[str, np.ndarray]:
+        """Unit vectors of the exemplars of each route, embedded on first use through the embedding cache"""
+        with self._lock:
+            if self._exemplar_vectors is None:
+                embeddings = cached_embeddings(self.embeddings)
+                self._exemplar_vectors = {
+                    route: unit_rows(embeddings.embed_documents(questions)) if questions else np.zeros((0, 0))
+                    for route, questions in self.exemplars.items()
+                }
+            return self._exemplar_vectors
+
+class RoutingLog:
+    """Log of pre-router decisions in a local SQLite database, with their agreement with the LLM router.
+
+    Every question routed by an agent with the pre-router enabled is logged
+    with its local route (the best guess for fallbacks), similarity and
+    margin, and the LLM route when the LLM router was called. The agreement
+    rate per route and source is the accuracy used to tune the thresholds.
+    """
+
+    # Old decisions are dropped once every TRIM_INTERVAL writes
+    TRIM_INTERVAL = 100
+
+    def __init__(self, db_path: str = PRE_ROUTER_DB_PATH, max_entries: int = PRE_ROUTER_LOG_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._writes = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS route_decisions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                question_hash TEXT NOT NULL,
+                source TEXT NOT NULL,
+                local_route TEXT,
+                score REAL,
+                margin REAL,
+                llm_route TEXT
+            )
+            """
+        )
+        self._conn.commit()
+
+    def record(self, question: str, decision: RouteDecision, llm_route: Optional[str] = None):
+        """Log a decision, with the route of the LLM router if it was called"""
+        question_hash = hashlib.sha256(question.encode("utf-8")).hexdigest()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO route_decisions (created_at, question_hash, source, local_route, score, margin, llm_route) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), question_hash, decision.source, decision.guess, decision.score, decision.margin, llm_route)
+            )
+            self._writes += 1
+            if self._writes % self.TRIM_INTERVAL == 0:
+                self._conn.execute(
+                    "DELETE FROM route_decisions WHERE id IN "
+                    "(SELECT id FROM route_decisions ORDER BY id DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Decisions, LLM checks and accuracy against the LLM router per local route and source"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT local_route, source, COUNT(*), COUNT(llm_route), SUM(llm_route = local_route) "
+                "FROM route_decisions GROUP BY local_route, source"
+            ).fetchall()
+        routes: Dict[str, Dict[str, Any]] = {}
+        llm_calls_saved = 0
+        for local_route, source, decisions, checked, agreed in rows:
+            agreed = agreed or 0
+            routes.setdefault(local_route or "none", {})[source] = {
+                "decisions": decisions,
+                "checked_by_llm": checked,
+                "agreed": agreed,
+                "accuracy": round(agreed / checked, 3) if checked else None
+            }
+            if source != "fallback":
+                llm_calls_saved += decisions - checked
+        return {
+            "decisions": sum(row[2] for row in rows),
+            "llm_calls_saved": llm_calls_saved,
+            "routes": routes
+        }
+
+    def clear(self):
+        """Delete every logged decision"""
+        with self._lock:
+            self._conn.execute("DELETE FROM route_decisions")
+            self._conn.commit()
+
+_routing_log: Optional[RoutingLog] = None
+_routing_log_lock = threading.Lock()
+
+def get_routing_log() -> RoutingLog:
+    """Process-wide log of pre-router decisions, opened on first use"""
+    global _routing_log
+    with _routing_log_lock:
+        if _routing_log is None:
+            _routing_log = RoutingLog()
+        return _routing_log
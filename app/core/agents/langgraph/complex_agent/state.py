@@ -1,14 +1,19 @@
 from pydantic import BaseModel
 from typing import List, Literal, Optional
+from app.core.agents.langgraph.document_records import DocumentRecord
 
 class GraphState(BaseModel):
 
     question: Optional[str] = None
     generation: Optional[str] = None
-    documents: List[str] = []
+    documents: List[DocumentRecord] = []
+    # Ids of every chunk retrieved so far, later retrievals only ask for unseen chunks
+    seen_ids: List[str] = []
     rewritten_question: Optional[str] = None
     query_feedbacks: List[str] = []
     generation_feedbacks: List[str] = []
     generation_num: int = 0
     retrieval_num: int = 0
-    search_mode: Literal["vectorstore", "websearch", "QA_LM"] = "QA_LM"
\ No newline at end of file
+    search_mode: Literal["vectorstore", "websearch", "QA_LM"] = "QA_LM"
+    # Documents graded relevant in earlier turns of a session, reused before any new retrieval
+    session_documents: List[DocumentRecord] = []
@@ -0,0 +1,136 @@
+from functools import lru_cache
+from typing import List, Optional
+import tiktoken
+from app.core.chunkers.token_chunker import DEFAULT_ENCODING, get_encoding
+from app.core.agents.langgraph.document_records import DocumentRecord
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Shortest overlap between two chunks for them to be merged, in characters
+MIN_OVERLAP_CHARS = 20
+
+def encoding_name(model: str) -> str:
+    """Name of the tiktoken encoding of an OpenAI model, cl100k_base for unknown models"""
+    try:
+        return tiktoken.encoding_name_for_model(model)
+    except KeyError:
+        return DEFAULT_ENCODING
+
+def overlap_length(first: str, second: str) -> int:
+    """Length of the longest suffix of first that is a prefix of second, 0 if shorter than MIN_OVERLAP_CHARS"""
+    probe = second[:MIN_OVERLAP_CHARS]
+    if len(probe) < MIN_OVERLAP_CHARS:
+        return 0
+    start = max(0, len(first) - len(second))
+    position = first.find(probe, start)
+    while position != -1:
+        if second.startswith(first[position:]):
+            return len(first) - position
+        position = first.find(probe, position + 1)
+    return 0
+
+def join_overlapping(first: str, second: str) -> Optional[str]:
+    """Join two chunks of a page if one continues the other or contains it, None otherwise"""
+    if second in first:
+        return first
+    if first in second:
+        return second
+    if overlap := overlap_length(first, second):
+        return first + second[overlap:]
+    if overlap := overlap_length(second, first):
+        return second + first[overlap:]
+    return None
+
+class ContextPacker:
+    """Pack retrieved documents into a generation context within a token budget.
+
+    Documents are ordered by relevance score, chunks of the same page whose
+    text overlaps (the chunk_overlap of the splitter) are merged back into one
+    passage, and passages are added most relevant first while they fit in the
+    budget. A passage larger than the whole budget is truncated to it when
+    nothing else was packed yet.
+    """
+
+    def __init__(self, budget: Optional[int] = None, model: str = "gpt-4o-mini", separator: str = "\n\n"):
+        self.budget = budget
+        self.separator = separator
+        self.encoding_name = encoding_name(model)
+        self._count_tokens = lru_cache(maxsize=4096)(self._encode_length)
+
+    @property
+    def encoding(self) -> tiktoken.Encoding:
+        # Loaded on first use, so constructing an agent needs no tokenizer download
+        return get_encoding(self.encoding_name)
+
+    def count_tokens(self, text: str) -> int:
+        return self._count_tokens(text)
+
+    def pack(self, documents: List[DocumentRecord]) -> str:
+        """Build the context of a generation from the documents
+
+        Args:
+            documents: Documents in the graph state
+
+        Returns:
+            str: The packed passages joined by the separator
+        """
+        passages = self._merge(self._by_relevance(documents))
+        if self.budget is None:
+            return self.separator.join(passages)
+
+        packed, used = [], 0
+        separator_tokens = self.count_tokens(self.separator)
+        for passage in passages:
+            tokens = self.count_tokens(passage) + (separator_tokens if packed else 0)
+            if used + tokens <= self.budget:
+                packed.append(passage)
+                used += tokens
+            elif not packed:
+                packed.append(self._truncate(passage, self.budget))
+                used = self.budget
+        if len(packed) < len(passages):
+            logger.info(f"Packed {len(packed)} of {len(passages)} passages in {used} of {self.budget} context tokens")
+        return self.separator.join(packed)
+
+    @staticmethod
+    def _by_relevance(documents: List[DocumentRecord]) -> List[DocumentRecord]:
+        """Documents by decreasing score, unscored ones after in their original order"""
+        order = sorted(
+            range(len(documents)),
+            key=lambda i: (documents[i].score is None, -(documents[i].score or 0.0), i)
+        )
+        return [documents[i] for i in order]
+
+    @staticmethod
+    def _merge(documents: List[DocumentRecord]) -> List[str]:
+        """Texts of the documents with overlapping chunks of the same page merged, in the order given"""
+        passages: List[str] = []
+        pages: List[Optional[tuple]] = []
+        for doc in documents:
+            page = None
+            if doc.origin == "vectorstore" and doc.metadata.get("doc_id") is not None:
+                page = (doc.metadata["doc_id"], doc.metadata.get("page_number"))
+            passages.append(doc.text)
+            pages.append(page)
+            if page is None:
+                continue
+            # Join the new chunk with the passages of its page it overlaps, which may bridge two of them
+            index = len(passages) - 1
+            for other in range(index - 1, -1, -1):
+                if pages[other] != page:
+                    continue
+                joined = join_overlapping(passages[other], passages[index])
+                if joined is None:
+                    continue
+                passages[other] = joined
+                del passages[index], pages[index]
+                index = other
+        return passages
+
+    def _truncate(self, text: str, budget: int) -> str:
+        tokens = self.encoding.encode(text, disallowed_special=())
+        return self.encoding.decode(tokens[:budget])
+
+    def _encode_length(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
@@ -0,0 +1,48 @@
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional
+from langchain_core.documents import Document
+from pydantic import BaseModel, Field
+
+# Chunk metadata kept on a record, enough to cite the source
+RECORD_METADATA_KEYS = ("doc_id", "source_file", "title", "page_number", "url")
+
+class DocumentRecord(BaseModel):
+    """Compact record of a retrieved chunk or web result carried in the graph state"""
+    id: str = Field(..., description="Chunk id in the collection, or a hash of the content of a web result")
+    text: str = Field(..., description="Text of the chunk, or the knowledge extracted from it")
+    score: Optional[float] = Field(default=None, description="Relevance score of the retrieval, higher is better")
+    origin: str = Field(default="vectorstore", description="Where the record came from: vectorstore or websearch")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Source metadata")
+
+def record_from_chunk(doc: Document, score: Optional[float] = None) -> DocumentRecord:
+    """Record of a chunk returned by ChromaIndexer.retrieve"""
+    return DocumentRecord(
+        id=doc.id or content_id(doc.page_content),
+        text=doc.page_content,
+        score=score,
+        origin="vectorstore",
+        metadata={key: doc.metadata[key] for key in RECORD_METADATA_KEYS if key in doc.metadata}
+    )
+
+def record_from_web_result(result: Any) -> DocumentRecord:
+    """Record of a web search result, a dict with content and url or any other value"""
+    if isinstance(result, dict):
+        text = result.get("content", str(result))
+        metadata = {"url": result["url"]} if result.get("url") else {}
+    else:
+        text = str(result)
+        metadata = {}
+    return DocumentRecord(id=content_id(text), text=text, origin="websearch", metadata=metadata)
+
+def content_id(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def merge_records(records: List[DocumentRecord], new_records: Iterable[DocumentRecord]) -> List[DocumentRecord]:
+    """Append the new records whose id is not in records yet"""
+    ids = {record.id for record in records}
+    merged = list(records)
+    for record in new_records:
+        if record.id not in ids:
+            ids.add(record.id)
+            merged.append(record)
+    return merged
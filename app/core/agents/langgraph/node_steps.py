@@ -0,0 +1,66 @@
+from typing import Any, Awaitable, Callable, Dict, Generator, NamedTuple, Tuple
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langchain_core.runnables.utils import accepts_config
+
+class Call(NamedTuple):
+    """A blocking call of a node, with its sync and async implementations"""
+    func: Callable[..., Any]
+    afunc: Callable[..., Awaitable[Any]]
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = {}
+
+def call(func: Callable[..., Any], afunc: Callable[..., Awaitable[Any]], *args, **kwargs) -> Call:
+    """Call of func, or of afunc in async runs, with the same arguments"""
+    return Call(func, afunc, args, kwargs)
+
+def invoke(runnable: Runnable, input: Any) -> Call:
+    """Call invoking a runnable, e.g. a chain"""
+    return Call(runnable.invoke, runnable.ainvoke, (input,))
+
+# A node written as a generator: it yields a Call for each LLM, retriever or web
+# search call, is sent back its result, and returns the update of the node
+Steps = Callable[..., Generator[Call, Any, Any]]
+
+def step_node(steps: Steps) -> RunnableLambda:
+    """Graph node running the steps of a node in sync and async runs.
+
+    The Calls yielded by steps run directly under invoke and stream, and are
+    awaited under ainvoke and astream, so the logic of a node is written once
+    and an async run never blocks the event loop. An exception raised by a
+    Call is thrown back into steps. steps gets the run configuration as its
+    config argument if it has one.
+    """
+    pass_config = accepts_config(steps)
+
+    def start(state, config: RunnableConfig):
+        return steps(state, config=config) if pass_config else steps(state)
+
+    def node(state, config: RunnableConfig):
+        running = start(state, config)
+        try:
+            step = next(running)
+            while True:
+                try:
+                    result = step.func(*step.args, **step.kwargs)
+                except Exception as e:
+                    step = running.throw(e)
+                else:
+                    step = running.send(result)
+        except StopIteration as stop:
+            return stop.value
+
+    async def anode(state, config: RunnableConfig):
+        running = start(state, config)
+        try:
+            step = next(running)
+            while True:
+                try:
+                    result = await step.afunc(*step.args, **step.kwargs)
+                except Exception as e:
+                    step = running.throw(e)
+                else:
+                    step = running.send(result)
+        except StopIteration as stop:
+            return stop.value
+
+    return RunnableLambda(node, afunc=anode, name=steps.__name__)
@@ -0,0 +1,62 @@
+from typing import Iterable, List
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables.config import run_in_executor
+from app.core.indexers.chroma_indexer import ChromaIndexer
+from app.core.agents.langgraph.document_records import DocumentRecord, merge_records
+from app.core.config.default_config import SESSION_MAX_DOCUMENTS
+
+def rerank(
+    indexer: ChromaIndexer,
+    embeddings: Embeddings,
+    question: str,
+    documents: List[DocumentRecord]
+) -> List[DocumentRecord]:
+    """Score documents of a session against a new question, most relevant first
+
+    Chunks are scored with their embeddings stored in the collection, other
+    documents (web results, chunks since deleted) are embedded through
+    embeddings, ideally backed by the embedding cache. Scores are on the
+    scale of ChromaIndexer.retrieve, so reused and newly retrieved documents
+    can be ranked together.
+
+    Args:
+        indexer: Indexer of the collection of the session
+        embeddings: Embedding model of the collection
+        question: The new question
+        documents: Documents kept by the session
+
+    Returns:
+        List[DocumentRecord]: Copies of the documents with their relevance score to the question
+    """
+    if not documents:
+        return []
+    stored = indexer.chunk_embeddings([doc.id for doc in documents if doc.origin == "vectorstore"])
+    missing = [doc for doc in documents if doc.id not in stored]
+    if missing:
+        stored.update(zip(
+            [doc.id for doc in missing],
+            embeddings.embed_documents([doc.text for doc in missing])
+        ))
+    scores = indexer.relevance_scores(
+        embeddings.embed_query(question),
+        [stored[doc.id] for doc in documents]
+    )
+    scored = [doc.model_copy(update={"score": score}) for doc, score in zip(documents, scores)]
+    return sorted(scored, key=lambda doc: doc.score, reverse=True)
+
+async def arerank(
+    indexer: ChromaIndexer,
+    embeddings: Embeddings,
+    question: str,
+    documents: List[DocumentRecord]
+) -> List[DocumentRecord]:
+    """Async version of rerank, run in a worker thread"""
+    return await run_in_executor(None, rerank, indexer, embeddings, question, documents)
+
+def remember(
+    documents: List[DocumentRecord],
+    new_documents: Iterable[DocumentRecord],
+    max_documents: int = SESSION_MAX_DOCUMENTS
+) -> List[DocumentRecord]:
+    """Documents of a session with the new ones first, keeping the max_documents most recent"""
+    return merge_records(merge_records([], new_documents), documents)[:max_documents]
@@ -1,10 +1,19 @@
-from typing import Optional
+from typing import Any, Dict, Optional
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, START, END
 from langchain_core.output_parsers import StrOutputParser
 from langchain_openai import ChatOpenAI
 from app.core.indexers.chroma_indexer import ChromaIndexer
 from app.core.config.schemas import AgentConfig, RetrieverConfig
-from app.core.config.default_config import DEFAULT_AGENT_CONFIG
+from app.core.config.default_config import DEFAULT_AGENT_CONFIG, get_context_budget
+from app.core.agents.langgraph.context_packer import ContextPacker
+from app.core.agents.langgraph.node_steps import call, invoke, step_node
+from app.core.agents.llm_cache import get_llm_cache
+from app.core.agents.langgraph.document_records import merge_records, record_from_chunk
+from app.core.agents.langgraph.token_stream import astream_answer
+from app.core.agents.langgraph.session_documents import arerank, remember, rerank
+from app.core.agents.sessions import SessionPipelines, session_thread_id
+from app.core.indexers.embedding_cache import cached_embeddings
 from .prompts import rag_prompt
 from .state import GraphState
 import logging
@@ -23,12 +32,15 @@ class LangSimpleRAG:
         self._initialize_chains()
         self._initialize_nodes()
         self.pipeline = self._build_pipeline()
+        # Same graph checkpointing the state of sessions, used by runs given a session_id
+        self.session_pipelines = SessionPipelines(self._build_pipeline)
         
-    def run(self, question: str) -> str:
+    def run(self, question: str, session_id: Optional[str] = None) -> str:
         """Run the agent synchronously
         
         Args:
             question: The question to answer
+            session_id: Session the question belongs to, continuing its earlier turns
             
         Returns:
             str: Generated answer
@@ -37,18 +49,19 @@ class LangSimpleRAG:
             Exception: If any error occurs during execution
         """
         try:
-            inputs = {"question": question}
-            result = self.pipeline.invoke(inputs)
+            pipeline = self.session_pipelines.get() if session_id else self.pipeline
+            result = pipeline.invoke(self._turn_inputs(question), self._run_config(session_id))
             return result["generation"]
         except Exception as e:
             logger.error(f"Error running agent: {str(e)}")
             raise
 
-    def stream(self, question: str):
+    def stream(self, question: str, session_id: Optional[str] = None):
         """Stream the agent's response
         
         Args:
             question: The question to answer
+            session_id: Session the question belongs to, continuing its earlier turns
             
         Yields:
             dict: Stream of updates from the pipeline
@@ -57,13 +70,94 @@ class LangSimpleRAG:
             Exception: If any error occurs during execution
         """
         try:
-            inputs = {"question": question}
-            for output in self.pipeline.stream(inputs, stream_mode='updates'):
+            pipeline = self.session_pipelines.get() if session_id else self.pipeline
+            for output in pipeline.stream(
+                self._turn_inputs(question), self._run_config(session_id), stream_mode='updates'
+            ):
                 yield output
         except Exception as e:
             logger.error(f"Error streaming response: {str(e)}")
             raise
     
+    async def arun(self, question: str, session_id: Optional[str] = None) -> str:
+        """Run the agent asynchronously, awaiting the retriever and LLM calls
+        
+        Args:
+            question: The question to answer
+            session_id: Session the question belongs to, continuing its earlier turns
+            
+        Returns:
+            str: Generated answer
+            
+        Raises:
+            Exception: If any error occurs during execution
+        """
+        try:
+            pipeline = await self.session_pipelines.aget() if session_id else self.pipeline
+            result = await pipeline.ainvoke(self._turn_inputs(question), self._run_config(session_id))
+            return result["generation"]
+        except Exception as e:
+            logger.error(f"Error running agent: {str(e)}")
+            raise
+
+    async def astream(self, question: str, session_id: Optional[str] = None):
+        """Stream the agent's response asynchronously
+        
+        Args:
+            question: The question to answer
+            session_id: Session the question belongs to, continuing its earlier turns
+            
+        Yields:
+            dict: Stream of updates from the pipeline
+            
+        Raises:
+            Exception: If any error occurs during execution
+        """
+        try:
+            pipeline = await self.session_pipelines.aget() if session_id else self.pipeline
+            async for output in pipeline.astream(
+                self._turn_inputs(question), self._run_config(session_id), stream_mode='updates'
+            ):
+                yield output
+        except Exception as e:
+            logger.error(f"Error streaming response: {str(e)}")
+            raise
+
+    async def astream_tokens(self, question: str, session_id: Optional[str] = None):
+        """Stream the tokens of the answer as they are generated, with node progress
+        
+        Args:
+            question: The question to answer
+            session_id: Session the question belongs to, continuing its earlier turns
+            
+        Yields:
+            dict: node, answer_start, token and end events, see astream_answer
+            
+        Raises:
+            Exception: If any error occurs during execution
+        """
+        try:
+            pipeline = await self.session_pipelines.aget() if session_id else self.pipeline
+            async for event in astream_answer(
+                pipeline, self._turn_inputs(question), ["generator_node"], self._run_config(session_id)
+            ):
+                yield event
+        except Exception as e:
+            logger.error(f"Error streaming tokens: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _turn_inputs(question: str) -> Dict[str, Any]:
+        """Graph inputs of a question, resetting the state of a session's previous turn but its documents"""
+        return {name: value for name, value in GraphState(question=question) if name != "session_documents"}
+    
+    def _run_config(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Graph run configuration, with the checkpointer thread of the session if any"""
+        if not session_id:
+            return {}
+        thread_id = session_thread_id("simple", self.config.retriever.collection_name, session_id)
+        return {"configurable": {"thread_id": thread_id}}
+    
     def _initialize_components(self):
         """Initialize base components: LLM and Retriever"""
         try:
@@ -73,9 +167,27 @@ class LangSimpleRAG:
                 **self.config.llm.parameters
             )
             
+            # The rag_chain answers from the LLM cache if listed in cached_chains
+            cached_chains = set(self.config.agent_parameters.get("cached_chains", []))
+            if cached_chains - {"rag_chain"}:
+                raise ValueError(f"Unknown chains in cached_chains: {sorted(cached_chains - {'rag_chain'})}. Available: ['rag_chain']")
+            if cached_chains:
+                self.llm = ChatOpenAI(
+                    model=self.config.llm.name,
+                    cache=get_llm_cache(),
+                    **self.config.llm.parameters
+                )
+            
+            # Packs the retrieved documents of a generation within the token budget of the model
+            self.context_packer = ContextPacker(
+                budget=get_context_budget(self.config.llm),
+                model=self.config.llm.name
+            )
+            
             # Initialize Retriever with config
             self.indexer = ChromaIndexer(self.config.retriever)
-            self.retriever = self.indexer.as_retriever()
+            # Embeds session documents not stored in the collection when re-ranking them
+            self.session_embeddings = cached_embeddings(self.indexer.vectorstore.embeddings)
             
             logger.info("Components initialized successfully")
         except Exception as e:
@@ -96,32 +208,41 @@ class LangSimpleRAG:
     def _initialize_nodes(self):
         """Initialize graph nodes"""
         try:
-            # Retrieval node function
+            # Retrieval node function, its calls are awaited in async runs (see step_node)
             def retriever_node(state: GraphState):
-                new_documents = self.retriever.invoke(state.question)
-                new_documents = [d.page_content for d in new_documents]
-                state.documents.extend(new_documents)
-                return {"documents": state.documents}
+                session_ids = [doc.id for doc in state.session_documents]
+                results = yield call(self.indexer.retrieve, self.indexer.aretrieve, state.question, exclude_ids=session_ids)
+                reranked = yield call(
+                    rerank, arerank, self.indexer, self.session_embeddings, state.question, state.session_documents
+                )
+                # The k best of the new chunks and the documents of earlier turns of the session
+                new_records = [record_from_chunk(doc, score) for doc, score in results]
+                candidates = sorted(new_records + reranked, key=lambda doc: doc.score or 0.0, reverse=True)
+                documents = merge_records(state.documents, candidates[:self.config.retriever.k])
+                return {
+                    "documents": documents,
+                    "session_documents": remember(state.session_documents, documents)
+                }
             
             # Generation node function
             def generation_node(state: GraphState):
-                generation = self.rag_chain.invoke({
-                    "context": "\n\n".join(state.documents), 
+                generation = yield invoke(self.rag_chain, {
+                    "context": self.context_packer.pack(state.documents), 
                     "question": state.question, 
                 })
                 return {"generation": generation}
             
             # Store nodes for pipeline building
-            self.retriever_node = retriever_node
-            self.generation_node = generation_node
+            self.retriever_node = step_node(retriever_node)
+            self.generation_node = step_node(generation_node)
             
             logger.info("Nodes initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing nodes: {str(e)}")
             raise
     
-    def _build_pipeline(self) -> StateGraph:
-        """Build the LangGraph pipeline"""
+    def _build_pipeline(self, checkpointer: Optional[BaseCheckpointSaver] = None) -> StateGraph:
+        """Build the LangGraph pipeline, checkpointing its state with checkpointer if given"""
         try:
             # Create graph
             graph = StateGraph(GraphState)
@@ -136,7 +257,7 @@ class LangSimpleRAG:
             graph.add_edge('generator_node', END)
             
             logger.info("Pipeline built successfully")
-            return graph.compile()
+            return graph.compile(checkpointer=checkpointer)
             
         except Exception as e:
             logger.error(f"Error building pipeline: {str(e)}")
@@ -1,8 +1,11 @@
 from typing import List, Optional
 from pydantic import BaseModel
+from app.core.agents.langgraph.document_records import DocumentRecord
 
 class GraphState(BaseModel):
     #Graph Parameterss
     question: Optional[str] = None
     generation: Optional[str] = None
-    documents: List[str] = []
+    documents: List[DocumentRecord] = []
+    # Documents of earlier turns of a session, re-ranked against each follow-up question
+    session_documents: List[DocumentRecord] = []
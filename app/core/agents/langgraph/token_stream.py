@@ -0,0 +1,79 @@
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+from langchain_core.runnables import Runnable, RunnableConfig
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def astream_answer(
+    pipeline: Runnable,
+    inputs: Dict[str, Any],
+    answer_nodes: Iterable[str],
+    config: Optional[RunnableConfig] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream the tokens of the answer of a graph run as they are generated, with node progress
+
+    Tokens are forwarded from the LLM calls of the answer nodes only, so the
+    graders and rewriters of the other nodes stay silent. A node answering
+    from the LLM cache produces no tokens and its answer is sent as a single
+    token when the node ends.
+
+    Args:
+        pipeline: Compiled graph of the agent
+        inputs: Graph inputs
+        answer_nodes: Nodes whose LLM output is the answer, e.g. generator_node
+        config: Graph run configuration
+
+    Yields:
+        dict: Events, each with an "event" key:
+            - node: a node finished, with its name and the seconds since the start
+            - answer_start: an answer node started, with its attempt number. Tokens
+              of a previous attempt are discarded by the client.
+            - token: a piece of the answer, the first one carrying the time to first token
+            - end: the final answer, with the time to first token and total seconds
+    """
+    answer_nodes = set(answer_nodes)
+    start = time.perf_counter()
+    ttft = None
+    attempts = 0
+    attempt_streamed = False
+    answer = None
+
+    def elapsed() -> float:
+        return round(time.perf_counter() - start, 3)
+
+    def token_event(content: str) -> Dict[str, Any]:
+        nonlocal ttft
+        event = {"event": "token", "content": content}
+        if ttft is None:
+            ttft = elapsed()
+            event["ttft"] = ttft
+            logger.info(f"Time to first token: {ttft}s")
+        return event
+
+    async for event in pipeline.astream_events(inputs, config, version="v2"):
+        kind = event["event"]
+        node = event.get("metadata", {}).get("langgraph_node")
+        # Events of a node itself, not of the chains it runs, have the graph run as only parent
+        is_node = node is not None and node != "__start__" and len(event.get("parent_ids", ())) == 1
+
+        if kind == "on_chat_model_stream" and node in answer_nodes:
+            content = event["data"]["chunk"].content
+            if content:
+                attempt_streamed = True
+                yield token_event(content)
+        elif kind == "on_chain_start" and is_node and node in answer_nodes:
+            attempts += 1
+            attempt_streamed = False
+            yield {"event": "answer_start", "node": node, "attempt": attempts}
+        elif kind == "on_chain_end" and is_node:
+            output = event["data"].get("output")
+            if node in answer_nodes and isinstance(output, dict) and output.get("generation") is not None:
+                answer = output["generation"]
+                if not attempt_streamed:
+                    yield token_event(answer)
+            yield {"event": "node", "node": node, "elapsed": elapsed()}
+
+    total = elapsed()
+    logger.info(f"Streamed answer in {total}s, time to first token {ttft}s")
+    yield {"event": "end", "answer": answer, "ttft": ttft, "elapsed": total}
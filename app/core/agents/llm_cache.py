@@ -0,0 +1,144 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from typing import Any, Dict, Optional
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.load import dumps, loads
+from app.core.config.default_config import LLM_CACHE_DB_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SQLiteLLMCache(BaseCache):
+    """Exact-match cache of LLM responses in a local SQLite database.
+
+    Entries are keyed by the hash of the LangChain llm_string, which holds
+    the model, its parameters and any bound tools or output schema, and of
+    the rendered prompt. Entries expire after ttl seconds, and the least
+    recently used ones are evicted beyond max_entries.
+    """
+
+    # Eviction runs once every EVICTION_INTERVAL writes
+    EVICTION_INTERVAL = 100
+
+    def __init__(
+        self,
+        db_path: str = LLM_CACHE_DB_PATH,
+        ttl: Optional[float] = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES
+    ):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Get the cached generations of a prompt and model, or None"""
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", LangChainBetaWarning)
+                return loads(row[0])
+        except Exception as e:
+            # An entry written by an incompatible LangChain version is treated as a miss
+            logger.error(f"Error reading LLM cache entry: {str(e)}")
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE):
+        """Cache the generations of a prompt and model"""
+        key = self._key(prompt, llm_string)
+        value = dumps(list(return_val))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_used, hits) VALUES (?, ?, ?, ?, 0)",
+                (key, value, now, now)
+            )
+            self._writes += 1
+            if self._writes % self.EVICTION_INTERVAL == 0:
+                self._evict(now)
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any):
+        """Delete every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Entries, hits, misses and hit rate since the process started"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None
+            }
+
+    def _evict(self, now: float):
+        """Drop expired entries, then the least recently used beyond max_entries. Called with the lock held."""
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN "
+            "(SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+_llm_cache: Optional[SQLiteLLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache() -> SQLiteLLMCache:
+    """Process-wide LLM cache shared by the agents, opened on first use"""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = SQLiteLLMCache()
+        return _llm_cache
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Optional
+import aiosqlite
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from app.core.config.default_config import SESSIONS_DB_PATH
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AsyncSessionSaver(AsyncSqliteSaver):
+    """AsyncSqliteSaver versioning channels like SqliteSaver, so sessions can be continued by either"""
+
+    get_next_version = SqliteSaver.get_next_version
+
+_session_saver: Optional[SqliteSaver] = None
+_async_session_saver: Optional[AsyncSessionSaver] = None
+_session_saver_lock = threading.Lock()
+
+def _ensure_directory(db_path: str):
+    directory = os.path.dirname(db_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+def get_session_saver() -> SqliteSaver:
+    """Process-wide checkpointer of agent sessions for synchronous runs, opened on first use"""
+    global _session_saver
+    with _session_saver_lock:
+        if _session_saver is None:
+            _ensure_directory(SESSIONS_DB_PATH)
+            _session_saver = SqliteSaver(sqlite3.connect(SESSIONS_DB_PATH, check_same_thread=False, timeout=30))
+        return _session_saver
+
+async def aget_session_saver() -> AsyncSessionSaver:
+    """Checkpointer of agent sessions for asynchronous runs, opened on first use in the running event loop
+
+    Both checkpointers write the same database, so a session can be continued by either kind of run.
+    """
+    global _async_session_saver
+    loop = asyncio.get_running_loop()
+    with _session_saver_lock:
+        if _async_session_saver is None or _async_session_saver.loop is not loop:
+            _ensure_directory(SESSIONS_DB_PATH)
+            connection = aiosqlite.connect(SESSIONS_DB_PATH, timeout=30)
+            # The connection runs in its own thread, which must not keep the process alive
+            connection.daemon = True
+            _async_session_saver = AsyncSessionSaver(connection)
+        return _async_session_saver
+
+async def aclose_session_saver():
+    """Close the connection of the asynchronous session checkpointer, if opened"""
+    global _async_session_saver
+    with _session_saver_lock:
+        saver, _async_session_saver = _async_session_saver, None
+    if saver is not None and saver.conn.is_alive():
+        await saver.conn.close()
+
+def session_thread_id(agent_type: str, collection_name: str, session_id: str) -> str:
+    """Checkpointer thread of a session: the state of an agent type over a collection"""
+    return f"{agent_type}:{collection_name}:{session_id}"
+
+def delete_session(session_id: str) -> int:
+    """Delete the checkpoints of a session for every agent type and collection
+
+    Returns:
+        int: Number of deleted checkpoints
+    """
+    suffix = f":{session_id}"
+    # Threads ending with the session id, matched literally
+    condition = "substr(thread_id, -?) = ?"
+    with get_session_saver().cursor() as cursor:
+        deleted = cursor.execute(f"DELETE FROM checkpoints WHERE {condition}", (len(suffix), suffix)).rowcount
+        cursor.execute(f"DELETE FROM writes WHERE {condition}", (len(suffix), suffix))
+    logger.info(f"Deleted {deleted} checkpoints of session {session_id}")
+    return deleted
+
+class SessionPipelines:
+    """Graph of an agent compiled with the session checkpointers, on first use of each
+
+    Runs without a session use the agent's graph compiled without a
+    checkpointer, so they store nothing.
+    """
+
+    def __init__(self, build: Callable[[Optional[BaseCheckpointSaver]], Any]):
+        self._build = build
+        self._pipeline = None
+        self._async_pipeline = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Graph checkpointing sessions in synchronous runs"""
+        with self._lock:
+            if self._pipeline is None:
+                self._pipeline = self._build(get_session_saver())
+            return self._pipeline
+
+    async def aget(self):
+        """Graph checkpointing sessions in asynchronous runs"""
+        saver = await aget_session_saver()
+        with self._lock:
+            if self._async_pipeline is None or self._async_pipeline.checkpointer is not saver:
+                self._async_pipeline = self._build(saver)
+            return self._async_pipeline
@@ -0,0 +1,64 @@
+from typing import Optional, Union
+from langchain_core.embeddings import Embeddings
+from app.core.chunkers.simple_chunker import SimpleChunker
+from app.core.chunkers.token_chunker import TokenChunker
+from app.core.chunkers.semantic_chunker import SemanticChunker
+from app.core.config.schemas import EmbeddingConfig
+from app.core.config.default_config import AVAILABLE_CHUNKERS, DEFAULT_CHUNK_SIZES, DEFAULT_EMBEDDING
+from app.core.indexers.embedding_cache import cached_embeddings, create_embeddings
+
+Chunker = Union[SimpleChunker, TokenChunker, SemanticChunker]
+
+def resolve_chunk_size(
+    chunker: str = "simple",
+    chunk_size: Optional[int] = None,
+    chunk_overlap: int = 0,
+    embedding: EmbeddingConfig = DEFAULT_EMBEDDING
+) -> int:
+    """Chunk size of a chunker, its default one from DEFAULT_CHUNK_SIZES if not given
+
+    Raises:
+        ValueError: If the chunker is not available, the overlap is not smaller than
+            the chunk size, or token chunks would exceed the input limit of the embedding model
+    """
+    if chunker not in DEFAULT_CHUNK_SIZES:
+        raise ValueError(f"Chunker {chunker} not found in available chunkers: {AVAILABLE_CHUNKERS}")
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZES[chunker]
+    if chunker == "token" and embedding.max_input_tokens and chunk_size > embedding.max_input_tokens:
+        raise ValueError(
+            f"Chunk size ({chunk_size} tokens) exceeds the input limit of {embedding.name} "
+            f"({embedding.max_input_tokens} tokens)"
+        )
+    if chunk_overlap >= chunk_size:
+        raise ValueError(f"Chunk overlap ({chunk_overlap}) must be smaller than the chunk size ({chunk_size})")
+    return chunk_size
+
+def create_chunker(
+    chunker: str = "simple",
+    chunk_size: Optional[int] = None,
+    chunk_overlap: int = 200,
+    embeddings: Optional[Embeddings] = None
+) -> Chunker:
+    """Create a chunker by name
+
+    Args:
+        chunk_size: Size of the chunks in the unit of the chunker. Defaults to the
+            chunker's size in DEFAULT_CHUNK_SIZES.
+        embeddings: Embedding model of the semantic chunker, wrapped in the embedding cache.
+            Defaults to the default embedding model.
+
+    Raises:
+        ValueError: If the chunker is not available, or its chunk size is invalid
+    """
+    chunk_size = resolve_chunk_size(chunker, chunk_size, chunk_overlap)
+    if chunker == "simple":
+        return SimpleChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    if chunker == "token":
+        return TokenChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    if chunker == "semantic":
+        return SemanticChunker(
+            cached_embeddings(embeddings or create_embeddings()),
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap
+        )
+    raise ValueError(f"Chunker {chunker} not found in available chunkers: {AVAILABLE_CHUNKERS}")
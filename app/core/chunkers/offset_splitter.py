@@ -0,0 +1,121 @@
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+Span = Tuple[int, int]
+
+class OffsetTextSplitter:
+    """Recursive character splitting done on offsets into the original text.
+
+    Produces the same chunks as langchain's RecursiveCharacterTextSplitter
+    with its defaults (separators kept at the start of each piece, surrounding
+    whitespace stripped, length measured with len). Separators are located
+    with str.find on the original string and pieces are carried as (start, end)
+    offsets, so no intermediate strings are split off or re-joined: each chunk
+    is sliced out of the text exactly once.
+    """
+
+    def __init__(self, chunk_size: int = 4000, chunk_overlap: int = 200, separators: Optional[List[str]] = None):
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size "
+                f"({chunk_size}), should be smaller."
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators or DEFAULT_SEPARATORS
+
+    def split_text(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+    def split_spans(self, text: str) -> List[Span]:
+        """Return the (start, end) offsets of each chunk of text"""
+        spans: List[Span] = []
+        self._split(text, 0, len(text), self.separators, spans)
+        return spans
+
+    def _split(self, text: str, start: int, end: int, separators: List[str], spans: List[Span]):
+        """Split text[start:end] on the first separator it contains, recursing into oversized pieces"""
+        separator = separators[-1]
+        next_separators: List[str] = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                next_separators = separators[i + 1:]
+                break
+
+        if separator == "" and self.chunk_size > 1:
+            self._merge_characters(text, start, end, spans)
+            return
+
+        # Consecutive pieces shorter than chunk_size, waiting to be merged
+        good: List[Span] = []
+        for piece in self._pieces(text, start, end, separator):
+            if piece[1] - piece[0] < self.chunk_size:
+                good.append(piece)
+                continue
+            if good:
+                self._merge(text, good, spans)
+                good = []
+            if next_separators:
+                self._split(text, piece[0], piece[1], next_separators, spans)
+            else:
+                spans.append(piece)
+        if good:
+            self._merge(text, good, spans)
+
+    @staticmethod
+    def _pieces(text: str, start: int, end: int, separator: str) -> Iterator[Span]:
+        """Yield the non-empty pieces of text[start:end], each starting with its separator"""
+        if not separator:
+            for i in range(start, end):
+                yield i, i + 1
+            return
+        previous = start
+        position = text.find(separator, start, end)
+        while position != -1:
+            if position > previous:
+                yield previous, position
+            previous = position
+            position = text.find(separator, position + len(separator), end)
+        if end > previous:
+            yield previous, end
+
+    def _merge(self, text: str, pieces: List[Span], spans: List[Span]):
+        """Merge consecutive pieces into chunks of at most chunk_size with chunk_overlap carried over"""
+        current: deque = deque()
+        total = 0
+        for piece_start, piece_end in pieces:
+            length = piece_end - piece_start
+            if total + length > self.chunk_size and current:
+                self._emit(text, current[0][0], current[-1][1], spans)
+                while total > self.chunk_overlap or (total + length > self.chunk_size and total > 0):
+                    dropped_start, dropped_end = current.popleft()
+                    total -= dropped_end - dropped_start
+            current.append((piece_start, piece_end))
+            total += length
+        if current:
+            self._emit(text, current[0][0], current[-1][1], spans)
+
+    def _merge_characters(self, text: str, start: int, end: int, spans: List[Span]):
+        """Same result as _merge on single-character pieces: windows of chunk_size sharing the overlap"""
+        step = self.chunk_size - min(self.chunk_overlap, self.chunk_size - 1)
+        while end - start > self.chunk_size:
+            self._emit(text, start, start + self.chunk_size, spans)
+            start += step
+        if end > start:
+            self._emit(text, start, end, spans)
+
+    @staticmethod
+    def _emit(text: str, start: int, end: int, spans: List[Span]):
+        """Record text[start:end] with surrounding whitespace stripped, unless nothing is left"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            spans.append((start, end))
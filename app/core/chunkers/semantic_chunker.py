@@ -0,0 +1,110 @@
+import re
+from typing import List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from app.core.chunkers.offset_splitter import OffsetTextSplitter
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.?!])\s+")
+
+class SemanticChunker:
+    """Split text into topic-coherent chunks.
+
+    Each page is split into sentences. Every sentence is embedded together
+    with its neighbours, and the text is cut where the cosine distance between
+    consecutive sentences is above the given percentile of the page. Chunks
+    longer than chunk_size characters are split further with the character
+    splitter, so the cap of SimpleChunker still holds.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        chunk_size: int = 10000,
+        chunk_overlap: int = 200,
+        breakpoint_percentile: float = 95.0,
+        buffer_size: int = 1
+    ):
+        """
+        Args:
+            embeddings: Embedding model used for sentences, ideally cache-backed
+            chunk_size: Maximum size of a chunk in characters
+            chunk_overlap: Overlap in characters between the pieces of a chunk split for being too long
+            breakpoint_percentile: Percentile of the sentence distances above which the text is cut
+            buffer_size: Number of neighbouring sentences embedded on each side of a sentence
+        """
+        self.embeddings = embeddings
+        self.chunk_size = chunk_size
+        self.breakpoint_percentile = breakpoint_percentile
+        self.buffer_size = buffer_size
+        self.size_splitter = OffsetTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        sentence_spans = [self._sentence_spans(doc.page_content) for doc in documents]
+
+        # Embed the sentences of every document in one batched call
+        windows = [
+            window
+            for doc, spans in zip(documents, sentence_spans) if len(spans) > 1
+            for window in self._windows(doc.page_content, spans)
+        ]
+        vectors = np.asarray(self.embeddings.embed_documents(windows), dtype=np.float32) if windows else None
+
+        chunks = []
+        offset = 0
+        for doc, spans in zip(documents, sentence_spans):
+            if len(spans) > 1:
+                breakpoints = self._breakpoints(vectors[offset:offset + len(spans)])
+                offset += len(spans)
+            else:
+                breakpoints = []
+            for chunk_text in self._group(doc.page_content, spans, breakpoints):
+                chunks.append(Document(page_content=chunk_text, metadata=dict(doc.metadata)))
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        return [doc.page_content for doc in self.split_documents([Document(page_content=text)])]
+
+    @staticmethod
+    def _sentence_spans(text: str) -> List[Tuple[int, int]]:
+        """Return the (start, end) offsets of the non-blank sentences of text"""
+        spans = []
+        start = 0
+        for boundary in SENTENCE_BOUNDARY.finditer(text):
+            if text[start:boundary.start()].strip():
+                spans.append((start, boundary.start()))
+            start = boundary.end()
+        if text[start:].strip():
+            spans.append((start, len(text)))
+        return spans
+
+    def _windows(self, text: str, spans: List[Tuple[int, int]]) -> List[str]:
+        """Text embedded for each sentence: the sentence and buffer_size neighbours on each side"""
+        last = len(spans) - 1
+        return [
+            text[spans[max(i - self.buffer_size, 0)][0]:spans[min(i + self.buffer_size, last)][1]]
+            for i in range(len(spans))
+        ]
+
+    def _breakpoints(self, vectors: np.ndarray) -> List[int]:
+        """Indices of the sentences after which the text is cut"""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        unit = vectors / np.where(norms == 0, 1, norms)
+        distances = 1.0 - np.einsum("ij,ij->i", unit[:-1], unit[1:])
+        threshold = np.percentile(distances, self.breakpoint_percentile)
+        return np.flatnonzero(distances > threshold).tolist()
+
+    def _group(self, text: str, spans: List[Tuple[int, int]], breakpoints: List[int]) -> List[str]:
+        """Join the sentences between breakpoints and split groups over chunk_size"""
+        if not spans:
+            return []
+        groups = []
+        first = 0
+        for breakpoint in breakpoints + [len(spans) - 1]:
+            group = text[spans[first][0]:spans[breakpoint][1]].strip()
+            if len(group) > self.chunk_size:
+                groups.extend(self.size_splitter.split_text(group))
+            elif group:
+                groups.append(group)
+            first = breakpoint + 1
+        return groups
@@ -1,16 +1,21 @@
 from typing import List
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from app.core.chunkers.offset_splitter import OffsetTextSplitter
 
 class SimpleChunker:
     def __init__(self, chunk_size=10000, chunk_overlap=200):
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        # Same chunks as RecursiveCharacterTextSplitter, computed on offsets
+        self.text_splitter = OffsetTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap
         )
     
     def split_documents(self, documents: List[Document]) -> List[Document]:
-        return self.text_splitter.split_documents(documents)
+        return [
+            Document(page_content=chunk, metadata=dict(doc.metadata))
+            for doc in documents
+            for chunk in self.text_splitter.split_text(doc.page_content)
+        ]
     
     def split_text(self, text: str) -> List[str]:
         return self.text_splitter.split_text(text)
\ No newline at end of file
@@ -0,0 +1,61 @@
+from functools import lru_cache
+from typing import Iterator, List, Tuple
+import tiktoken
+from langchain_core.documents import Document
+
+DEFAULT_ENCODING = "cl100k_base"
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name: str = DEFAULT_ENCODING) -> tiktoken.Encoding:
+    """Load a tiktoken encoding once per process"""
+    return tiktoken.get_encoding(encoding_name)
+
+class TokenChunker:
+    """Split text into chunks measured in tokens rather than characters.
+
+    The text is encoded once; chunk boundaries are mapped back to character
+    offsets and every chunk is a single slice of the original text.
+    """
+
+    def __init__(self, chunk_size=1000, chunk_overlap=100, encoding_name=DEFAULT_ENCODING):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"Chunk overlap ({chunk_overlap}) must be smaller than chunk size ({chunk_size})"
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.encoding = get_encoding(encoding_name)
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        chunks = []
+        for doc in documents:
+            for chunk_text, token_count in self._split(doc.page_content):
+                chunks.append(Document(
+                    page_content=chunk_text,
+                    metadata={**doc.metadata, "token_count": token_count}
+                ))
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk_text for chunk_text, _ in self._split(text)]
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def _split(self, text: str) -> Iterator[Tuple[str, int]]:
+        """Yield (chunk text, token count) of each chunk, sliced from text at token offsets"""
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if not tokens:
+            return
+        decoded, offsets = self.encoding.decode_with_offsets(tokens)
+        if decoded != text:
+            # Only happens for text that doesn't round-trip, e.g. lone surrogates
+            text = decoded
+        step = self.chunk_size - self.chunk_overlap
+        for start in range(0, len(tokens), step):
+            end = min(start + self.chunk_size, len(tokens))
+            chunk_text = text[offsets[start]:offsets[end] if end < len(tokens) else len(text)]
+            if chunk_text.strip():
+                yield chunk_text, end - start
+            if end == len(tokens):
+                break
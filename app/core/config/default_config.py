@@ -14,7 +14,8 @@ AVAILABLE_LLMS: Dict[str, LLMConfig] = {
         type="openai",
         parameters={
             "temperature": 0.7,
-        }
+        },
+        context_budget=6000
     ),
 }
 
@@ -23,7 +24,10 @@ AVAILABLE_EMBEDDINGS: Dict[str, EmbeddingConfig] = {
     "text-embedding-3-small": EmbeddingConfig(
         name="text-embedding-3-small",
         type="openai",
-        parameters={}
+        parameters={},
+        dimensions=1536,
+        price_per_million_tokens=0.02,
+        max_input_tokens=8191
     ),
 }
 
@@ -33,6 +37,17 @@ AVAILABLE_DATABASES = ["ChromaDB"]  # Add more as needed
 # Available Search Types
 AVAILABLE_SEARCH_TYPES = ["similarity", "mmr", "similarity_score_threshold"]
 
+# Available Chunkers. chunk_size and chunk_overlap are measured in characters
+# for "simple" and "semantic" (where they cap topic-based chunks), in tokens for "token"
+AVAILABLE_CHUNKERS = ["simple", "token", "semantic"]
+
+# Chunk size of each chunker when none is given, in the unit of the chunker
+DEFAULT_CHUNK_SIZES = {
+    "simple": 10000,
+    "token": 800,
+    "semantic": 10000
+}
+
 # Default Configurations
 DEFAULT_LLM = AVAILABLE_LLMS["gpt-4o-mini"]
 
@@ -47,6 +62,44 @@ DEFAULT_DATABASE = DatabaseConfig(
     }
 )
 
+# Local SQLite database holding the per-collection ingestion manifests
+INGESTION_DB_PATH = "./app/databases/ingestion.sqlite3"
+
+# Local SQLite database holding the per-collection registry of source documents referenced by chunks
+DOCUMENT_REGISTRY_DB_PATH = "./app/databases/documents.sqlite3"
+
+# Local SQLite database holding the per-collection near-duplicate chunk index
+NEAR_DUPLICATES_DB_PATH = "./app/databases/near_duplicates.sqlite3"
+
+# Directory of the parsed-page cache, keyed by PDF content hash and loader version
+PAGE_CACHE_DIRECTORY = "./app/databases/page_cache"
+
+# Local SQLite database caching embeddings of texts, e.g. the sentences embedded by the semantic chunker
+EMBEDDING_CACHE_DB_PATH = "./app/databases/embedding_cache.sqlite3"
+
+# Local SQLite database holding the background ingestion jobs
+JOBS_DB_PATH = "./app/databases/jobs.sqlite3"
+
+# Number of ingestion jobs running at the same time
+MAX_INGESTION_JOBS = 2
+
+# Assumed values of the ingestion dry run when projecting time and index size.
+# Embedding requests are sent one batch of index_batch_size chunks at a time;
+# index size is a fixed overhead plus a multiple of vector and text bytes per
+# chunk. None of them is measured: the embedding latency and throughput are
+# rough figures for the OpenAI embeddings API at a low rate-limit tier, which
+# benchmarks/ingestion_benchmark.py can't measure as it embeds with a fake
+# model; the write rate and size ratios are rough figures for a local ChromaDB
+# HNSW index. A dry run can override any of them with values measured on its setup
+INGESTION_ESTIMATE_ASSUMPTIONS = {
+    "embedding_request_seconds": 0.5,
+    "embedding_tokens_per_second": 200000,
+    "write_chunks_per_second": 400,
+    "index_overhead_bytes": 5 * 1024 * 1024,
+    "index_bytes_per_vector_byte": 2.5,
+    "index_bytes_per_text_byte": 3.5
+}
+
 DEFAULT_RETRIEVER = RetrieverConfig(
     collection_name="default_collection",
     search_type="similarity",
@@ -60,12 +113,94 @@ DEFAULT_AGENT_CONFIG = AgentConfig(
     agent_parameters={}
 )
 
+DEFAULT_COMPLEX_AGENT_CONFIG = AgentConfig(
+    llm=DEFAULT_LLM,
+    retriever=DEFAULT_RETRIEVER,
+    agent_parameters={
+        "max_retrievals": 3,
+        "max_generations": 3
+    }
+)
+
+# Number of constructed agents kept by the agent registry, least recently used are evicted
+AGENT_REGISTRY_MAX_SIZE = 16
+
+# Grader outcomes kept by a grade memo shared across runs of the complex agent (agent_parameters.grade_memo_ttl)
+GRADE_MEMO_MAX_SIZE = 10000
+
+# Local SQLite database caching LLM responses of the agent chains listed in agent_parameters.cached_chains
+LLM_CACHE_DB_PATH = "./app/databases/llm_cache.sqlite3"
+
+# Lifetime of a cached LLM response in seconds, and number of responses kept
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+LLM_CACHE_MAX_ENTRIES = 100000
+
+# Local pre-router of the complex agent (agent_parameters.pre_router). A question is routed
+# without the LLM when its best route reaches PRE_ROUTER_MIN_SIMILARITY (cosine similarity to
+# the route exemplars, or to the nearest chunks of the collection for vectorstore) and leads
+# the runner-up by PRE_ROUTER_MIN_MARGIN. A PRE_ROUTER_AUDIT_RATE share of local decisions is
+# still checked against the LLM router to measure accuracy
+PRE_ROUTER_MIN_SIMILARITY = 0.5
+PRE_ROUTER_MIN_MARGIN = 0.05
+PRE_ROUTER_AUDIT_RATE = 0.1
+
+# Labeled example questions of each route of the pre-router
+PRE_ROUTER_EXEMPLARS = {
+    "vectorstore": [
+        "What does the paper propose?",
+        "How does the attention mechanism work in the transformer architecture?",
+        "What datasets were used to evaluate the model?",
+        "Summarize the main contributions of the paper",
+        "What are the limitations discussed by the authors?",
+        "How does retrieval-augmented generation reduce hallucinations?"
+    ],
+    "websearch": [
+        "What is the weather in Paris today?",
+        "Who won the match last night?",
+        "What are the latest news about OpenAI?",
+        "What is the current stock price of Nvidia?",
+        "When is the next Apple event?",
+        "Which restaurants are open near me?"
+    ],
+    "QA_LM": [
+        "Hello, how are you?",
+        "Thank you!",
+        "What is 12 times 7?",
+        "Translate 'good morning' to Spanish",
+        "Write a haiku about autumn",
+        "What is the capital of France?"
+    ]
+}
+
+# Local SQLite database logging pre-router decisions, and number of decisions kept
+PRE_ROUTER_DB_PATH = "./app/databases/pre_router.sqlite3"
+PRE_ROUTER_LOG_MAX_ENTRIES = 100000
+
+# Local SQLite database checkpointing the graph state of agent sessions
+SESSIONS_DB_PATH = "./app/databases/sessions.sqlite3"
+
+# Relevant documents kept by a session for reuse by its follow-up questions, most recent first
+SESSION_MAX_DOCUMENTS = 20
+
+# Agents constructed when the API starts, as (agent type, configuration) pairs
+AGENT_WARM_UP_CONFIGS = [
+    ("simple", DEFAULT_AGENT_CONFIG),
+    ("complex", DEFAULT_COMPLEX_AGENT_CONFIG)
+]
+
 def get_llm_config(model_name: str) -> LLMConfig:
     """Get LLM configuration by model name"""
     if model_name not in AVAILABLE_LLMS:
         raise ValueError(f"Model {model_name} not found in available models")
     return AVAILABLE_LLMS[model_name]
 
+def get_context_budget(llm: LLMConfig) -> Optional[int]:
+    """Token budget of the retrieved context of a model: its own, or the one of the model in AVAILABLE_LLMS"""
+    if llm.context_budget is not None:
+        return llm.context_budget
+    available = AVAILABLE_LLMS.get(llm.name)
+    return available.context_budget if available else None
+
 def get_embedding_config(model_name: str) -> EmbeddingConfig:
     """Get embedding configuration by model name"""
     if model_name not in AVAILABLE_EMBEDDINGS:
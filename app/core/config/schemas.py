@@ -11,6 +11,10 @@ class LLMConfig(BaseModel):
         default_factory=dict,
         description="Additional parameters like temperature, max_tokens etc."
     )
+    context_budget: Optional[int] = Field(
+        default=None,
+        description="Maximum tokens of retrieved context in a generation prompt. Uses the budget of the model in AVAILABLE_LLMS if not set."
+    )
 
 class EmbeddingConfig(BaseModel):
     """Configuration for embedding models"""
@@ -22,6 +26,18 @@ class EmbeddingConfig(BaseModel):
         default_factory=dict,
         description="Additional parameters for the embedding model"
     )
+    dimensions: Optional[int] = Field(
+        default=None,
+        description="Size of the embedding vectors, used to project index sizes"
+    )
+    price_per_million_tokens: Optional[float] = Field(
+        default=None,
+        description="API price in USD per million embedded tokens, used to estimate ingestion costs"
+    )
+    max_input_tokens: Optional[int] = Field(
+        default=None,
+        description="Maximum tokens of a text embedded in one input, caps the chunk size of the token chunker"
+    )
 
 class DatabaseConfig(BaseModel):
     """Base configuration for Vector Stores"""
@@ -52,5 +68,10 @@ class AgentConfig(BaseModel):
     retriever: RetrieverConfig = Field(..., description="Retriever configuration")
     agent_parameters: Dict[str, Any] = Field(
         default_factory=dict,
-        description="Agent-specific parameters (e.g., max_retrievals, max_generations for LangComplexRAG)"
+        description=(
+            "Agent-specific parameters (e.g., max_retrievals, max_generations, "
+            "grading_concurrency, relevant_documents_target, relevance_score_threshold, "
+            "grade_memo_ttl, pre_router, pre_router_min_similarity, pre_router_min_margin, "
+            "pre_router_audit_rate for LangComplexRAG, cached_chains for both agents)"
+        )
     )
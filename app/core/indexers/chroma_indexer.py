@@ -1,15 +1,21 @@
 from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables.config import run_in_executor
 from langchain_chroma import Chroma
+from langchain_chroma.vectorstores import maximal_marginal_relevance
 from langchain_openai import OpenAIEmbeddings
 from chromadb import PersistentClient
 from app.core.config.schemas import DatabaseConfig
 from langchain_core.documents import Document
 from app.core.config.schemas import DatabaseConfig, RetrieverConfig
 from app.core.config.default_config import DEFAULT_DATABASE, DEFAULT_RETRIEVER
+from app.core.indexers.document_registry import DocumentRegistry
 from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 import logging
+import numpy as np
 import os
+import uuid
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -122,11 +128,43 @@ class ChromaIndexer:
         """
         self.config = config or DEFAULT_RETRIEVER
         self.vectorstore = chroma_db.initialize_db(self.config.collection_name)
+        self.documents = DocumentRegistry(self.config.collection_name)
     
     def add_documents(self, documents: List[Document]):
         """Add documents to the vectorstore"""
         self.vectorstore.add_documents(documents)
-    
+
+    def embed_documents(self, documents: List[Document]) -> List[List[float]]:
+        """Compute embeddings for documents without writing them"""
+        return self.vectorstore.embeddings.embed_documents(
+            [doc.page_content for doc in documents]
+        )
+
+    def add_embeddings(
+        self,
+        documents: List[Document],
+        embeddings: List[List[float]],
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """Write documents with precomputed embeddings to the vectorstore
+
+        Args:
+            documents: Documents to store
+            embeddings: One embedding per document
+            ids: Optional document ids. Defaults to the ids of the documents, or random UUIDs.
+
+        Returns:
+            List of ids of the written documents
+        """
+        ids = ids or [doc.id or str(uuid.uuid4()) for doc in documents]
+        self.vectorstore._collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=[doc.page_content for doc in documents],
+            metadatas=[doc.metadata or None for doc in documents]
+        )
+        return ids
+
     def similarity_search(
         self, 
         query: str,
@@ -134,6 +172,8 @@ class ChromaIndexer:
     ):
         """Perform similarity search with optional retriever configuration
         
+        The metadata of the source document of each chunk is joined into the results.
+        
         Args:
             query: Search query string
             config: Optional RetrieverConfig to override default settings
@@ -142,21 +182,137 @@ class ChromaIndexer:
             search_config = config or self.config
             
             if search_config.search_type == "mmr":
-                return self.vectorstore.max_marginal_relevance_search(
+                results = self.vectorstore.max_marginal_relevance_search(
                     query,
                     k=search_config.k,
                     **search_config.search_parameters
                 )
             else:  # default similarity search
-                return self.vectorstore.similarity_search(
+                results = self.vectorstore.similarity_search(
                     query,
                     k=search_config.k,
                     **search_config.search_parameters
                 )
+            return self.documents.join(results)
         except Exception as e:
             logger.error(f"Error in similarity search: {str(e)}")
             raise
     
+    def retrieve(
+        self,
+        query: str,
+        exclude_ids: Optional[Sequence[str]] = None,
+        config: Optional[RetrieverConfig] = None
+    ) -> List[Tuple[Document, float]]:
+        """Search chunks with their ids and relevance scores, leaving out chunks already seen
+        
+        Supports the similarity, mmr and similarity_score_threshold search types
+        of the retriever configuration. Excluded chunks are filtered out of an
+        enlarged result set, so k unseen chunks are returned when available.
+        
+        Args:
+            query: Search query string
+            exclude_ids: Ids of chunks not to return again
+            config: Optional RetrieverConfig to override default settings
+            
+        Returns:
+            List of (chunk with its id and joined document metadata, relevance score), most relevant first
+        """
+        try:
+            search_config = config or self.config
+            parameters = search_config.search_parameters
+            exclude_ids = set(exclude_ids or ())
+            mmr = search_config.search_type == "mmr"
+            n_results = (parameters.get("fetch_k", 20) if mmr else search_config.k) + len(exclude_ids)
+            n_results = min(n_results, self.count_documents())
+            if n_results <= 0:
+                return []
+            
+            query_embedding = self.vectorstore.embeddings.embed_query(query)
+            include = ["documents", "metadatas", "distances"] + (["embeddings"] if mmr else [])
+            results = self.vectorstore._collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results,
+                where=parameters.get("filter"),
+                include=include
+            )
+            relevance = self.vectorstore._select_relevance_score_fn()
+            candidates = [
+                (index, Document(id=chunk_id, page_content=text, metadata=metadata or {}), relevance(distance))
+                for index, (chunk_id, text, metadata, distance) in enumerate(zip(
+                    results["ids"][0],
+                    results["documents"][0],
+                    results["metadatas"][0],
+                    results["distances"][0]
+                ))
+                if chunk_id not in exclude_ids
+            ]
+            
+            if mmr:
+                selected = maximal_marginal_relevance(
+                    np.array(query_embedding, dtype=np.float32),
+                    [results["embeddings"][0][index] for index, _, _ in candidates],
+                    k=search_config.k,
+                    lambda_mult=parameters.get("lambda_mult", 0.5)
+                )
+                candidates = [candidates[position] for position in selected]
+            else:
+                candidates = candidates[:search_config.k]
+            
+            if search_config.search_type == "similarity_score_threshold" and "score_threshold" in parameters:
+                candidates = [c for c in candidates if c[2] >= parameters["score_threshold"]]
+            
+            documents = self.documents.join([doc for _, doc, _ in candidates])
+            return [(doc, score) for doc, (_, _, score) in zip(documents, candidates)]
+        except Exception as e:
+            logger.error(f"Error retrieving chunks: {str(e)}")
+            raise
+    
+    def nearest_embeddings(self, query_embedding: List[float], k: int = 3) -> List[List[float]]:
+        """Embeddings of the k chunks nearest to a query embedding, empty for an empty collection"""
+        n_results = min(k, self.count_documents())
+        if n_results <= 0:
+            return []
+        results = self.vectorstore._collection.query(
+            query_embeddings=[query_embedding],
+            n_results=n_results,
+            include=["embeddings"]
+        )
+        return list(results["embeddings"][0])
+
+    def chunk_embeddings(self, ids: Sequence[str]) -> Dict[str, List[float]]:
+        """Stored embeddings of chunks by id, chunks no longer in the collection are left out"""
+        if not ids:
+            return {}
+        results = self.vectorstore._collection.get(ids=list(ids), include=["embeddings"])
+        return {chunk_id: list(embedding) for chunk_id, embedding in zip(results["ids"], results["embeddings"])}
+
+    def relevance_scores(self, query_embedding: List[float], embeddings: List[List[float]]) -> List[float]:
+        """Relevance scores of embeddings to a query embedding, on the scale of the scores of retrieve"""
+        if not embeddings:
+            return []
+        query = np.array(query_embedding, dtype=np.float32)
+        matrix = np.array(embeddings, dtype=np.float32)
+        space = (self.vectorstore._collection.metadata or {}).get("hnsw:space", "l2")
+        if space == "cosine":
+            norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+            distances = 1 - (matrix @ query) / np.where(norms == 0, 1, norms)
+        elif space == "ip":
+            distances = 1 - matrix @ query
+        else:
+            distances = ((matrix - query) ** 2).sum(axis=1)
+        relevance = self.vectorstore._select_relevance_score_fn()
+        return [relevance(float(distance)) for distance in distances]
+
+    async def aretrieve(
+        self,
+        query: str,
+        exclude_ids: Optional[Sequence[str]] = None,
+        config: Optional[RetrieverConfig] = None
+    ) -> List[Tuple[Document, float]]:
+        """Async version of retrieve, run in a worker thread"""
+        return await run_in_executor(None, self.retrieve, query, exclude_ids, config)
+    
     def update_document(self, document_id: str, document: Document):
         """Update a document in the vectorstore"""
         self.vectorstore.update_document(document_id, document)
@@ -164,10 +320,29 @@ class ChromaIndexer:
     def delete_document(self, document_id: str):
         """Delete a document from the vectorstore"""
         self.vectorstore.delete([document_id])
+
+    def delete_documents(self, document_ids: List[str]):
+        """Delete several documents from the vectorstore"""
+        if document_ids:
+            self.vectorstore.delete(document_ids)
+
+    def delete_source_document(self, doc_id: str) -> List[str]:
+        """Delete every chunk of a source document and its registry record
+        
+        Returns:
+            List of ids of the deleted chunks
+        """
+        chunk_ids = self.vectorstore._collection.get(where={"doc_id": doc_id}, include=[])["ids"]
+        self.delete_documents(chunk_ids)
+        self.documents.remove(doc_id)
+        return chunk_ids
     
     def as_retriever(self, config: Optional[RetrieverConfig] = None):
         """Get retriever with optional configuration
         
+        The retriever joins the metadata of the source document of each chunk
+        into the retrieved documents.
+        
         Args:
             config: Optional RetrieverConfig to override default settings
         """
@@ -179,10 +354,11 @@ class ChromaIndexer:
                 **search_config.search_parameters
             }
             
-            return self.vectorstore.as_retriever(
+            retriever = self.vectorstore.as_retriever(
                 search_type=search_config.search_type,
                 search_kwargs=search_kwargs
             )
+            return retriever | RunnableLambda(self.documents.join)
         except Exception as e:
             logger.error(f"Error creating retriever: {str(e)}")
             raise
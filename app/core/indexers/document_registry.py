@@ -0,0 +1,161 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from langchain_core.documents import Document
+from app.core.config.default_config import DOCUMENT_REGISTRY_DB_PATH
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Chunk metadata held once per document in the registry instead of on every chunk
+FILE_METADATA_KEYS = ("source", "source_file", "file_path", "page_number")
+
+def document_id(file_path: str) -> str:
+    """Short id of the document at a path, stable across re-indexing of the file"""
+    normalized = os.path.normcase(os.path.abspath(file_path))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+class DocumentRegistry:
+    """Per-collection table of the source documents of chunks, persisted in SQLite.
+
+    File-level metadata (path, hash, title, page count, ingestion time) is
+    stored once per document. Chunks only carry the short doc_id and their
+    page number, and the file metadata is joined back into search results.
+    """
+
+    def __init__(self, collection_name: str, db_path: str = DOCUMENT_REGISTRY_DB_PATH):
+        self.collection_name = collection_name
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                collection TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                path TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                title TEXT NOT NULL,
+                page_count INTEGER NOT NULL,
+                ingested_at REAL NOT NULL,
+                PRIMARY KEY (collection, doc_id)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def register(self, file_path: str, sha256: str, title: str, page_count: int) -> str:
+        """Record an indexed file, replacing the record of its previous version
+
+        Returns:
+            The doc_id of the file
+        """
+        doc_id = document_id(file_path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents "
+                "(collection, doc_id, path, sha256, title, page_count, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.collection_name, doc_id, file_path, sha256, title, page_count, time.time())
+            )
+            self._conn.commit()
+        return doc_id
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Get the record of a document, or None if it is not registered"""
+        records = self.get_many([doc_id])
+        return records.get(doc_id)
+
+    def get_many(self, doc_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the records of several documents, keyed by doc_id"""
+        doc_ids = list(dict.fromkeys(doc_ids))
+        records = {}
+        with self._lock:
+            # Query in slices to stay below SQLite's bound parameter limit
+            for start in range(0, len(doc_ids), 500):
+                batch = doc_ids[start:start + 500]
+                placeholders = ", ".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    "SELECT doc_id, path, sha256, title, page_count, ingested_at FROM documents "
+                    f"WHERE collection = ? AND doc_id IN ({placeholders})",
+                    (self.collection_name, *batch)
+                ).fetchall()
+                records.update({row[0]: self._record(row) for row in rows})
+        return records
+
+    def list_documents(self) -> List[Dict[str, Any]]:
+        """List every document of the collection"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doc_id, path, sha256, title, page_count, ingested_at FROM documents "
+                "WHERE collection = ? ORDER BY path",
+                (self.collection_name,)
+            ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def remove(self, doc_id: str):
+        """Forget a document"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM documents WHERE collection = ? AND doc_id = ?", (self.collection_name, doc_id)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Forget every document of the collection"""
+        with self._lock:
+            self._conn.execute("DELETE FROM documents WHERE collection = ?", (self.collection_name,))
+            self._conn.commit()
+
+    @staticmethod
+    def compact(documents: List[Document]) -> List[Document]:
+        """Chunks as stored: file metadata replaced by the doc_id of their file
+
+        Chunks without a file_path are returned unchanged.
+        """
+        compacted = []
+        for doc in documents:
+            file_path = doc.metadata.get("file_path")
+            if not file_path:
+                compacted.append(doc)
+                continue
+            metadata = {key: value for key, value in doc.metadata.items() if key not in FILE_METADATA_KEYS}
+            metadata["doc_id"] = document_id(file_path)
+            compacted.append(Document(page_content=doc.page_content, metadata=metadata, id=doc.id))
+        return compacted
+
+    def join(self, documents: List[Document]) -> List[Document]:
+        """Add the metadata of their document back to stored chunks, in place
+
+        Chunks without a doc_id, e.g. indexed before the registry existed, are left as they are.
+        """
+        records = self.get_many([doc.metadata["doc_id"] for doc in documents if doc.metadata.get("doc_id")])
+        for doc in documents:
+            record = records.get(doc.metadata.get("doc_id"))
+            if record is None:
+                continue
+            doc.metadata.update({
+                "source": record["path"],
+                "source_file": os.path.basename(record["path"]),
+                "file_path": record["path"],
+                "title": record["title"],
+                "page_number": doc.metadata.get("page", 1)
+            })
+        return documents
+
+    @staticmethod
+    def _record(row) -> Dict[str, Any]:
+        return {
+            "doc_id": row[0],
+            "path": row[1],
+            "sha256": row[2],
+            "title": row[3],
+            "page_count": row[4],
+            "ingested_at": row[5]
+        }
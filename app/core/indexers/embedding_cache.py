@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import threading
+from typing import Iterator, List, Optional, Sequence, Tuple
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain_core.embeddings import Embeddings
+from langchain_core.stores import ByteStore
+from langchain_openai import OpenAIEmbeddings
+from app.core.config.schemas import EmbeddingConfig
+from app.core.config.default_config import DEFAULT_EMBEDDING, EMBEDDING_CACHE_DB_PATH
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SQLiteByteStore(ByteStore):
+    """Key-value byte store in a local SQLite database, safe to share between threads and processes"""
+
+    def __init__(self, db_path: str = EMBEDDING_CACHE_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS byte_store (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+        self._conn.commit()
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        values = {}
+        with self._lock:
+            # Query in slices to stay below SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                batch = list(keys[start:start + 500])
+                placeholders = ", ".join("?" for _ in batch)
+                values.update(self._conn.execute(
+                    f"SELECT key, value FROM byte_store WHERE key IN ({placeholders})", batch
+                ).fetchall())
+        return [values.get(key) for key in keys]
+
+    def mset(self, key_value_pairs: Sequence[Tuple[str, bytes]]):
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO byte_store (key, value) VALUES (?, ?)", key_value_pairs)
+            self._conn.commit()
+
+    def mdelete(self, keys: Sequence[str]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM byte_store WHERE key = ?", [(key,) for key in keys])
+            self._conn.commit()
+
+    def yield_keys(self, prefix: Optional[str] = None) -> Iterator[str]:
+        with self._lock:
+            if prefix:
+                rows = self._conn.execute(
+                    "SELECT key FROM byte_store WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT key FROM byte_store").fetchall()
+        for row in rows:
+            yield row[0]
+
+def create_embeddings(config: EmbeddingConfig = DEFAULT_EMBEDDING) -> Embeddings:
+    """Create the embedding model described by an EmbeddingConfig"""
+    if config.type == "openai":
+        return OpenAIEmbeddings(model=config.name, **config.parameters)
+    raise ValueError(f"Embedding type {config.type} not supported")
+
+def cached_embeddings(
+    embeddings: Embeddings,
+    store: Optional[ByteStore] = None,
+    batch_size: int = 256
+) -> CacheBackedEmbeddings:
+    """Wrap an embedding model so each text is embedded once and then served from the cache
+
+    Args:
+        embeddings: Underlying embedding model
+        store: Byte store holding the cached vectors, a SQLiteByteStore by default
+        batch_size: Number of texts embedded and written to the cache at a time
+
+    Returns:
+        Embeddings backed by the cache, namespaced by the model name
+    """
+    namespace = getattr(embeddings, "model", None) or type(embeddings).__name__
+    return CacheBackedEmbeddings.from_bytes_store(
+        embeddings,
+        store or SQLiteByteStore(),
+        namespace=namespace,
+        batch_size=batch_size
+    )
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+from app.core.config.default_config import INGESTION_DB_PATH
+import logging
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+class FileFingerprint(NamedTuple):
+    """Size, modification time and content hash of a file on disk"""
+    size: int
+    mtime_ns: int
+    sha256: str
+
+def parameters_hash(parameters: Dict[str, Any]) -> str:
+    """Hash of the processing parameters a file was indexed with, independent of key order"""
+    return hashlib.sha256(json.dumps(parameters, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def file_sha256(file_path: str) -> str:
+    """Compute the sha256 of a file, reading it in fixed-size blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class IngestionManifest:
+    """Per-collection record of the files indexed from disk and the chunks they produced.
+
+    Lets folder ingestion skip unchanged files, re-index modified ones and
+    delete the chunks of files that disappeared. Each file is recorded with a
+    hash of the chunking parameters it was indexed with, so that a file
+    indexed with other parameters counts as modified.
+    """
+
+    def __init__(self, collection_name: str, db_path: str = INGESTION_DB_PATH):
+        self.collection_name = collection_name
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS manifest_files (
+                collection TEXT NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                indexed_at REAL NOT NULL,
+                params_hash TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (collection, path)
+            )
+            """
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(manifest_files)")]
+        if "params_hash" not in columns:
+            # Manifests written before parameters were recorded: their files are re-indexed once
+            self._conn.execute("ALTER TABLE manifest_files ADD COLUMN params_hash TEXT NOT NULL DEFAULT ''")
+        self._conn.commit()
+
+    @staticmethod
+    def normalize_path(file_path: str) -> str:
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get the manifest entry of a file, or None if it was never indexed"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, size, mtime_ns, sha256, chunk_ids, indexed_at, params_hash FROM manifest_files "
+                "WHERE collection = ? AND path = ?",
+                (self.collection_name, self.normalize_path(file_path))
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "path": row[0],
+            "size": row[1],
+            "mtime_ns": row[2],
+            "sha256": row[3],
+            "chunk_ids": json.loads(row[4]),
+            "indexed_at": row[5],
+            "params_hash": row[6]
+        }
+
+    def fingerprint(self, file_path: str, entry: Optional[Dict[str, Any]] = None) -> FileFingerprint:
+        """Fingerprint a file, reusing the recorded hash when size and mtime are unchanged"""
+        stat = os.stat(file_path)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return FileFingerprint(stat.st_size, stat.st_mtime_ns, entry["sha256"])
+        return FileFingerprint(stat.st_size, stat.st_mtime_ns, file_sha256(file_path))
+
+    def is_unchanged(self, entry: Optional[Dict[str, Any]], fingerprint: FileFingerprint, params_hash: str = "") -> bool:
+        """Whether a recorded file has the same content and was indexed with the same parameters"""
+        return bool(entry) and entry["sha256"] == fingerprint.sha256 and entry["params_hash"] == params_hash
+
+    def record(self, file_path: str, fingerprint: FileFingerprint, chunk_ids: List[str], params_hash: str = ""):
+        """Record a successfully indexed file, the ids of its chunks and the hash of its processing parameters"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO manifest_files "
+                "(collection, path, size, mtime_ns, sha256, chunk_ids, indexed_at, params_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.collection_name,
+                    self.normalize_path(file_path),
+                    fingerprint.size,
+                    fingerprint.mtime_ns,
+                    fingerprint.sha256,
+                    json.dumps(chunk_ids),
+                    time.time(),
+                    params_hash
+                )
+            )
+            self._conn.commit()
+
+    def touch(self, file_path: str, fingerprint: FileFingerprint):
+        """Update size and mtime of a file whose content did not change"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE manifest_files SET size = ?, mtime_ns = ? WHERE collection = ? AND path = ?",
+                (fingerprint.size, fingerprint.mtime_ns, self.collection_name, self.normalize_path(file_path))
+            )
+            self._conn.commit()
+
+    def remove(self, file_path: str):
+        """Forget a file"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM manifest_files WHERE collection = ? AND path = ?",
+                (self.collection_name, self.normalize_path(file_path))
+            )
+            self._conn.commit()
+
+    def paths_under(self, folder_path: str) -> List[str]:
+        """List the recorded files located below a folder"""
+        prefix = os.path.join(self.normalize_path(folder_path), "")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path FROM manifest_files WHERE collection = ? AND substr(path, 1, ?) = ?",
+                (self.collection_name, len(prefix), prefix)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def clear(self):
+        """Forget every file of the collection"""
+        with self._lock:
+            self._conn.execute("DELETE FROM manifest_files WHERE collection = ?", (self.collection_name,))
+            self._conn.commit()
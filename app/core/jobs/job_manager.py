@@ -0,0 +1,208 @@
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from app.core.chunkers.chunker_factory import resolve_chunk_size
+from app.core.config.default_config import MAX_INGESTION_JOBS
+from app.core.jobs.job_store import JobStore, FINISHED_STATUSES
+from app.core.pipes.simple_index_pipeline import SimpleIndexChromaPipeline, StreamRun
+import logging
+
+logger = logging.getLogger(__name__)
+
+class JobCancelled(Exception):
+    """Raised when a job is cancelled before it started"""
+
+class JobManager:
+    """Runs ingestion jobs on a bounded worker pool and tracks them in a JobStore"""
+
+    def __init__(self, store: Optional[JobStore] = None, max_workers: int = MAX_INGESTION_JOBS):
+        self.store = store or JobStore()
+        self.store.mark_interrupted()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingestion-job")
+        self._cancel_events: Dict[str, threading.Event] = {}
+
+    def submit_folder(
+        self,
+        collection_name: str,
+        folder_path: str,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: int = 200,
+        chunker: str = "simple",
+        parallel: bool = False,
+        deduplicate: bool = False,
+        incremental: bool = True
+    ) -> str:
+        """Queue the ingestion of a folder of PDFs and return the job id
+
+        Raises:
+            NotADirectoryError: If folder_path is not a directory
+            ValueError: If the chunk size or overlap is invalid for the chunker
+        """
+        if not os.path.isdir(folder_path):
+            raise NotADirectoryError(f"Not a directory: {folder_path}")
+        chunk_size = resolve_chunk_size(chunker, chunk_size, chunk_overlap)
+        params = {
+            "folder_path": folder_path,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "chunker": chunker,
+            "parallel": parallel,
+            "deduplicate": deduplicate,
+            "incremental": incremental
+        }
+
+        def work(pipeline: SimpleIndexChromaPipeline, job_id: str, cancel_event: threading.Event):
+            total = sum(
+                1 for _, _, files in os.walk(folder_path)
+                for file in files if file.lower().endswith('.pdf')
+            )
+            self.store.update(job_id, total_files=total)
+            return pipeline.process_folder(
+                folder_path,
+                incremental=incremental,
+                on_progress=self._progress_callback(job_id),
+                cancel_event=cancel_event
+            )
+
+        return self._submit("process_folder", collection_name, params, work)
+
+    def submit_files(
+        self,
+        collection_name: str,
+        file_paths: List[str],
+        chunk_size: Optional[int] = None,
+        chunk_overlap: int = 200,
+        chunker: str = "simple",
+        parallel: bool = False,
+        deduplicate: bool = False,
+        cleanup_dir: Optional[str] = None
+    ) -> str:
+        """Queue the ingestion of PDF files and return the job id
+
+        Args:
+            cleanup_dir: Directory deleted once the job finished, e.g. the one holding uploaded files
+
+        Raises:
+            ValueError: If the chunk size or overlap is invalid for the chunker
+        """
+        chunk_size = resolve_chunk_size(chunker, chunk_size, chunk_overlap)
+        params = {
+            "files": [os.path.basename(file_path) for file_path in file_paths],
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "chunker": chunker,
+            "parallel": parallel,
+            "deduplicate": deduplicate
+        }
+
+        def work(pipeline: SimpleIndexChromaPipeline, job_id: str, cancel_event: threading.Event):
+            self.store.update(job_id, total_files=len(file_paths))
+            run = StreamRun(on_progress=self._progress_callback(job_id), cancel_event=cancel_event)
+            try:
+                return pipeline.process_stream(lambda _: iter(file_paths), run)
+            finally:
+                if cleanup_dir:
+                    shutil.rmtree(cleanup_dir, ignore_errors=True)
+
+        return self._submit("process_pdfs", collection_name, params, work)
+
+    def cancel(self, job_id: str) -> bool:
+        """Request the cancellation of a job. Files already started are finished.
+
+        Returns:
+            False if the job doesn't exist or already finished
+        """
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED_STATUSES:
+            return False
+        event = self._cancel_events.get(job_id)
+        if event is not None:
+            event.set()
+        if job["status"] == "queued":
+            self.store.update(job_id, status="cancelled", finished_at=time.time())
+        return True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job with its throughput and ETA"""
+        job = self.store.get(job_id)
+        return self._with_progress(job) if job else None
+
+    def list_jobs(self, limit: int = 50, collection_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List recent jobs with their throughput and ETA"""
+        return [self._with_progress(job) for job in self.store.list(limit, collection_name)]
+
+    def _submit(self, job_type: str, collection_name: str, params: Dict[str, Any], work: Callable) -> str:
+        job_id = self.store.create(job_type, collection_name, params)
+        self._cancel_events[job_id] = threading.Event()
+        self.executor.submit(self._run, job_id, collection_name, params, work)
+        logger.info(f"Queued {job_type} job {job_id} for collection '{collection_name}'")
+        return job_id
+
+    def _run(self, job_id: str, collection_name: str, params: Dict[str, Any], work: Callable):
+        """Run a job on a worker thread and record its outcome"""
+        cancel_event = self._cancel_events[job_id]
+        try:
+            if cancel_event.is_set():
+                raise JobCancelled()
+            self.store.update(job_id, status="running", started_at=time.time())
+            pipeline = SimpleIndexChromaPipeline(
+                collection_name=collection_name,
+                chunk_size=params["chunk_size"],
+                chunk_overlap=params["chunk_overlap"],
+                chunker=params["chunker"],
+                parallel=params["parallel"],
+                deduplicate=params["deduplicate"]
+            )
+            result = work(pipeline, job_id, cancel_event)
+            self.store.update(
+                job_id,
+                status="cancelled" if cancel_event.is_set() else "completed",
+                result=result,
+                failed_files=result["failed_files"],
+                pages=result["pages"],
+                chunks=result["chunks"],
+                current_file=None,
+                finished_at=time.time()
+            )
+            logger.info(f"Ingestion job {job_id} finished: {result['files']} files, {result['chunks']} chunks")
+        except JobCancelled:
+            logger.info(f"Ingestion job {job_id} cancelled before it started")
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {str(e)}")
+            self.store.update(job_id, status="failed", error=str(e), finished_at=time.time())
+        finally:
+            self._cancel_events.pop(job_id, None)
+
+    def _progress_callback(self, job_id: str) -> Callable[[str, Dict[str, Any]], None]:
+        def on_progress(file_path: str, stats: Dict[str, Any]):
+            self.store.update(
+                job_id,
+                processed_files=stats["files"] + stats["unchanged_files"] + len(stats["failed_files"]),
+                failed_files=stats["failed_files"],
+                pages=stats["pages"],
+                chunks=stats["chunks"],
+                current_file=os.path.basename(file_path)
+            )
+        return on_progress
+
+    @staticmethod
+    def _with_progress(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Add throughput (files/s, pages/s) and ETA to a job record"""
+        job["files_per_second"] = None
+        job["pages_per_second"] = None
+        job["eta_seconds"] = None
+        if job.get("started_at"):
+            elapsed = (job.get("finished_at") or time.time()) - job["started_at"]
+            if elapsed > 0:
+                job["files_per_second"] = round(job["processed_files"] / elapsed, 3)
+                job["pages_per_second"] = round(job["pages"] / elapsed, 3)
+            if job["status"] == "running" and job["files_per_second"] and job.get("total_files"):
+                remaining = max(job["total_files"] - job["processed_files"], 0)
+                job["eta_seconds"] = round(remaining / job["files_per_second"], 1)
+        return job
+
+# Global instance shared by the API
+job_manager = JobManager()
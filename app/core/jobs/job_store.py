@@ -0,0 +1,116 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from app.core.config.default_config import JOBS_DB_PATH
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ["queued", "running", "completed", "failed", "cancelled"]
+FINISHED_STATUSES = {"completed", "failed", "cancelled"}
+
+_JSON_COLUMNS = {"params", "failed_files", "result"}
+
+class JobStore:
+    """Persistent table of ingestion jobs backed by a local SQLite database"""
+
+    def __init__(self, db_path: str = JOBS_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ingestion_jobs (
+                id TEXT PRIMARY KEY,
+                job_type TEXT NOT NULL,
+                collection_name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                total_files INTEGER,
+                processed_files INTEGER NOT NULL DEFAULT 0,
+                failed_files TEXT NOT NULL DEFAULT '[]',
+                pages INTEGER NOT NULL DEFAULT 0,
+                chunks INTEGER NOT NULL DEFAULT 0,
+                current_file TEXT,
+                error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def create(self, job_type: str, collection_name: str, params: Dict[str, Any]) -> str:
+        """Create a queued job and return its id"""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO ingestion_jobs (id, job_type, collection_name, status, params, created_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, job_type, collection_name, json.dumps(params), time.time())
+            )
+            self._conn.commit()
+        return job_id
+
+    def update(self, job_id: str, **fields: Any):
+        """Update columns of a job"""
+        if not fields:
+            return
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        values = [
+            json.dumps(value) if name in _JSON_COLUMNS else value
+            for name, value in fields.items()
+        ]
+        with self._lock:
+            self._conn.execute(f"UPDATE ingestion_jobs SET {columns} WHERE id = ?", (*values, job_id))
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by id, or None if it doesn't exist"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM ingestion_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, limit: int = 50, collection_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List the most recent jobs, optionally for a single collection"""
+        query = "SELECT * FROM ingestion_jobs"
+        params: list = []
+        if collection_name:
+            query += " WHERE collection_name = ?"
+            params.append(collection_name)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def mark_interrupted(self) -> int:
+        """Fail the jobs left queued or running by a previous server process"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE ingestion_jobs SET status = 'failed', error = ?, finished_at = ? "
+                "WHERE status IN ('queued', 'running')",
+                ("Interrupted by a server restart", time.time())
+            )
+            self._conn.commit()
+        if cursor.rowcount:
+            logger.warning(f"Marked {cursor.rowcount} interrupted ingestion jobs as failed")
+        return cursor.rowcount
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for name in _JSON_COLUMNS:
+            if job.get(name) is not None:
+                job[name] = json.loads(job[name])
+        return job
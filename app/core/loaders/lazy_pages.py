@@ -0,0 +1,29 @@
+from typing import Iterator
+import pypdf
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
+
+def lazy_load_pages(loader, file_path: str) -> Iterator[Document]:
+    """Yield the pages of a PDF as they are parsed.
+
+    PyPDFLoader.lazy_load extracts the text of every page into a list before
+    yielding the first one. For PyPDFLoader the pages are read with pypdf here
+    instead, one at a time, producing the same Documents. Other loaders use
+    their own lazy_load.
+
+    Args:
+        loader: Document loader class
+        file_path: Path to the PDF file
+    """
+    instance = loader(file_path)
+    if not isinstance(instance, PyPDFLoader) or instance.web_path or instance.parser.extract_images:
+        yield from instance.lazy_load()
+        return
+    parser = instance.parser
+    with open(instance.file_path, "rb") as f:
+        reader = pypdf.PdfReader(f, password=parser.password)
+        for page_number, page in enumerate(reader.pages):
+            yield Document(
+                page_content=page.extract_text(extraction_mode=parser.extraction_mode, **parser.extraction_kwargs),
+                metadata={"source": instance.file_path, "page": page_number}
+            )
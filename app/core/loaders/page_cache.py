@@ -0,0 +1,109 @@
+import gzip
+import json
+import os
+import re
+import shutil
+import tempfile
+from importlib import metadata
+from typing import Iterator, Optional
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
+from app.core.config.default_config import PAGE_CACHE_DIRECTORY
+from app.core.indexers.manifest import file_sha256
+from app.core.loaders.lazy_pages import lazy_load_pages
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of cached pages changes
+PAGE_CACHE_FORMAT = 1
+
+# Packages whose version changes the text extracted by a loader
+LOADER_PACKAGES = {
+    "PyPDFLoader": ["pypdf", "langchain-community"]
+}
+
+def loader_version(loader=PyPDFLoader) -> str:
+    """Identify a loader together with the versions of the packages it parses with"""
+    name = getattr(loader, "__name__", type(loader).__name__)
+    parts = [name]
+    for package in LOADER_PACKAGES.get(name, []):
+        try:
+            parts.append(f"{package}-{metadata.version(package)}")
+        except metadata.PackageNotFoundError:
+            parts.append(f"{package}-unknown")
+    parts.append(f"v{PAGE_CACHE_FORMAT}")
+    return re.sub(r"[^A-Za-z0-9.\-]+", "_", "_".join(parts))
+
+class PageCache:
+    """On-disk cache of the pages extracted from PDFs.
+
+    Entries are keyed by (file sha256, loader version), so the same PDF is
+    parsed once no matter its path, and re-chunking it with other parameters
+    skips parsing entirely. Each entry is a gzip-compressed JSON Lines file
+    with one page per line, read and written lazily.
+    """
+
+    def __init__(self, directory: str = PAGE_CACHE_DIRECTORY, loader=PyPDFLoader):
+        self.directory = directory
+        self.loader = loader
+        self.version = loader_version(loader)
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, sha256: str) -> str:
+        """Path of the cache entry of a file hash"""
+        return os.path.join(self.directory, sha256[:2], f"{sha256}.{self.version}.jsonl.gz")
+
+    def has(self, sha256: str) -> bool:
+        return os.path.exists(self.path(sha256))
+
+    def iter_pages(self, file_path: str, sha256: Optional[str] = None) -> Iterator[Document]:
+        """Yield the pages of a PDF from the cache, or parse it and fill the cache on the way
+
+        Args:
+            file_path: Path to the PDF file
+            sha256: Content hash of the file, computed if not given
+
+        Returns:
+            Iterator over the page Documents
+        """
+        sha256 = sha256 or file_sha256(file_path)
+        entry_path = self.path(sha256)
+        if os.path.exists(entry_path):
+            self.hits += 1
+            logger.debug(f"Page cache hit for {file_path}")
+            return self._read(entry_path, file_path)
+        self.misses += 1
+        return self._parse_and_write(entry_path, file_path)
+
+    def clear(self):
+        """Delete every cache entry"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    @staticmethod
+    def _read(entry_path: str, file_path: str) -> Iterator[Document]:
+        with gzip.open(entry_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                page = json.loads(line)
+                # The cached source is the path the file had when it was parsed
+                page["metadata"]["source"] = file_path
+                yield Document(page_content=page["page_content"], metadata=page["metadata"])
+
+    def _parse_and_write(self, entry_path: str, file_path: str) -> Iterator[Document]:
+        """Parse a PDF lazily, writing each page to a temporary entry made visible once complete"""
+        directory = os.path.dirname(entry_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        complete = False
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                for page in lazy_load_pages(self.loader, file_path):
+                    record = {"page_content": page.page_content, "metadata": page.metadata}
+                    f.write(json.dumps(record, default=str) + "\n")
+                    yield page
+            os.replace(tmp_path, entry_path)
+            complete = True
+        finally:
+            if not complete and os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,115 @@
+import os
+from typing import Iterator, List, Optional, Tuple
+import pypdf
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
+from app.core.chunkers.chunker_factory import create_chunker
+from app.core.loaders.lazy_pages import lazy_load_pages
+from app.core.loaders.page_cache import PageCache
+from app.core.processors.header_footer import HeaderFooterStripper
+import logging
+
+logger = logging.getLogger(__name__)
+
+def validate_pdf_path(file_path: str):
+    """Verify that a file exists and is a PDF
+
+    Raises:
+        FileNotFoundError: If the PDF file doesn't exist
+        ValueError: If the file is not a valid PDF
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    if not file_path.lower().endswith('.pdf'):
+        raise ValueError(f"File is not a PDF: {file_path}")
+
+def pdf_title(file_path: str) -> str:
+    """Title from the document information of a PDF, or the file name without extension"""
+    try:
+        info = pypdf.PdfReader(file_path).metadata
+        title = info.title if info else None
+    except Exception as e:
+        logger.debug(f"Could not read the title of {file_path}: {str(e)}")
+        title = None
+    if isinstance(title, str) and title.strip():
+        return title.strip()
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+def add_file_metadata(documents: List[Document], file_path: str) -> List[Document]:
+    """Attach source file metadata to every document"""
+    filename = os.path.basename(file_path)
+    for doc in documents:
+        if not doc.metadata.get("source_file"):
+            doc.metadata.update({
+                "source_file": filename,
+                "file_path": file_path,
+                "page_number": doc.metadata.get("page", 1)
+            })
+    return documents
+
+def load_pdf_pages(
+    file_path: str,
+    loader=PyPDFLoader,
+    page_cache: Optional[PageCache] = None,
+    sha256: Optional[str] = None
+) -> List[Document]:
+    """Load every page of a PDF as a Document with file metadata attached
+
+    Args:
+        file_path: Path to the PDF file
+        loader: Document loader class used to parse the PDF
+        page_cache: Cache of parsed pages. When given, its loader is used and parsing is skipped on hits
+        sha256: Content hash of the file if already known, saves hashing it again
+
+    Returns:
+        List of page Documents
+    """
+    return list(iter_pdf_pages(file_path, loader=loader, page_cache=page_cache, sha256=sha256))
+
+def iter_pdf_pages(
+    file_path: str,
+    loader=PyPDFLoader,
+    page_cache: Optional[PageCache] = None,
+    sha256: Optional[str] = None
+) -> Iterator[Document]:
+    """Lazily yield the pages of a PDF one at a time with file metadata attached"""
+    validate_pdf_path(file_path)
+    if page_cache is not None:
+        pages = page_cache.iter_pages(file_path, sha256)
+    else:
+        pages = lazy_load_pages(loader, file_path)
+    for page in pages:
+        yield add_file_metadata([page], file_path)[0]
+
+def parse_and_chunk_pdf(
+    file_path: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    page_cache_directory: Optional[str] = None,
+    sha256: Optional[str] = None,
+    chunker: str = "simple",
+    strip_headers: bool = True
+) -> Tuple[List[Document], int, int]:
+    """Parse and chunk a single PDF. Runs inside ingestion worker processes.
+
+    Kept free of indexer imports so that spawned workers don't open a
+    ChromaDB client or an embedding model.
+
+    Args:
+        page_cache_directory: Directory of the parsed-page cache, None to always parse
+        sha256: Content hash of the file if already known
+        chunker: Name of the chunker, see AVAILABLE_CHUNKERS
+        strip_headers: Remove running headers and footers before chunking
+
+    Returns:
+        Tuple of (chunks, page count, number of header and footer lines stripped)
+    """
+    page_cache = PageCache(page_cache_directory) if page_cache_directory else None
+    pages = iter_pdf_pages(file_path, page_cache=page_cache, sha256=sha256)
+    stripper = HeaderFooterStripper()
+    pages = list(stripper.strip(pages) if strip_headers else pages)
+    if not pages:
+        return [], 0, 0
+    text_chunker = create_chunker(chunker, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = add_file_metadata(text_chunker.split_documents(pages), file_path)
+    return chunks, len(pages), stripper.stripped_lines
@@ -0,0 +1,115 @@
+import json
+import math
+from typing import Any, Dict, List, Optional
+from langchain_core.documents import Document
+from app.core.chunkers.token_chunker import get_encoding
+from app.core.config.schemas import EmbeddingConfig
+from app.core.config.default_config import DEFAULT_EMBEDDING, INGESTION_ESTIMATE_ASSUMPTIONS
+from app.core.indexers.document_registry import DocumentRegistry
+
+def resolve_assumptions(overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """INGESTION_ESTIMATE_ASSUMPTIONS with the given values replacing the assumed ones
+
+    Raises:
+        ValueError: If an override is not a known assumption or not positive
+    """
+    overrides = overrides or {}
+    unknown = set(overrides) - set(INGESTION_ESTIMATE_ASSUMPTIONS)
+    if unknown:
+        raise ValueError(
+            f"Unknown estimate assumptions {sorted(unknown)}, expected some of {sorted(INGESTION_ESTIMATE_ASSUMPTIONS)}"
+        )
+    invalid = [name for name, value in overrides.items() if value <= 0]
+    if invalid:
+        raise ValueError(f"Estimate assumptions must be positive: {sorted(invalid)}")
+    return {**INGESTION_ESTIMATE_ASSUMPTIONS, **overrides}
+
+class IngestionEstimator:
+    """Tally of the chunks of an ingestion dry run, projected to cost, time and index size.
+
+    Token counts are exact for OpenAI embedding models, which use the
+    cl100k_base encoding. Cost, time and size are projections from the
+    embedding configuration and INGESTION_ESTIMATE_ASSUMPTIONS, whose assumed
+    values can be replaced by measured ones. The report lists which values
+    were assumed.
+    """
+
+    def __init__(
+        self,
+        embedding: EmbeddingConfig = DEFAULT_EMBEDDING,
+        index_batch_size: int = 500,
+        assumptions: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            assumptions: Measured values replacing some of INGESTION_ESTIMATE_ASSUMPTIONS
+        """
+        self.embedding = embedding
+        self.index_batch_size = index_batch_size
+        self.assumptions = resolve_assumptions(assumptions)
+        self.assumed = sorted(set(INGESTION_ESTIMATE_ASSUMPTIONS) - set(assumptions or {}))
+        self.encoding = get_encoding()
+        self.chunks = 0
+        self.tokens = 0
+        self.text_bytes = 0
+        self.metadata_bytes = 0
+
+    def add(self, chunks: List[Document]):
+        """Count the chunks that would be embedded and written"""
+        for chunk in chunks:
+            token_count = chunk.metadata.get("token_count")
+            if token_count is None:
+                token_count = len(self.encoding.encode(chunk.page_content, disallowed_special=()))
+            self.tokens += token_count
+            self.text_bytes += len(chunk.page_content.encode("utf-8"))
+        for stored in DocumentRegistry.compact(chunks):
+            self.metadata_bytes += len(json.dumps(stored.metadata, default=str))
+        self.chunks += len(chunks)
+
+    def report(self, parse_seconds: float) -> Dict[str, Any]:
+        """Project cost, time and index size
+
+        Args:
+            parse_seconds: Time the dry run took to parse and chunk the files
+
+        Returns:
+            Chunk and token counts with the projected cost in USD, seconds per stage and index size
+            in bytes, the values used for the projection and the names of those that were assumed
+        """
+        assumptions = self.assumptions
+        dimensions = self.embedding.parameters.get("dimensions", self.embedding.dimensions)
+        price = self.embedding.price_per_million_tokens
+
+        requests = math.ceil(self.chunks / self.index_batch_size)
+        embedding_seconds = (
+            requests * assumptions["embedding_request_seconds"]
+            + self.tokens / assumptions["embedding_tokens_per_second"]
+        )
+        write_seconds = self.chunks / assumptions["write_chunks_per_second"]
+
+        index_bytes = None
+        if dimensions:
+            index_bytes = int(
+                assumptions["index_overhead_bytes"]
+                + self.chunks * dimensions * 4 * assumptions["index_bytes_per_vector_byte"]
+                + self.text_bytes * assumptions["index_bytes_per_text_byte"]
+                + self.metadata_bytes
+            )
+
+        return {
+            "chunks": self.chunks,
+            "embedding_tokens": self.tokens,
+            "embedding_model": self.embedding.name,
+            "embedding_requests": requests,
+            "estimated_cost_usd": round(self.tokens / 1_000_000 * price, 4) if price is not None else None,
+            "estimated_seconds": {
+                "parse": round(parse_seconds, 3),
+                "embed": round(embedding_seconds, 3),
+                "write": round(write_seconds, 3),
+                # Stages overlap when streaming, the slowest one sets the pace
+                "total": round(max(parse_seconds, embedding_seconds, write_seconds), 3)
+            },
+            "estimated_index_bytes": index_bytes,
+            "assumptions": dict(assumptions),
+            "assumed": self.assumed
+        }
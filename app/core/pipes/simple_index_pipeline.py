@@ -1,31 +1,116 @@
 import os
-from typing import List
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import threading
+from typing import Callable, List, Dict, Any, NamedTuple, Optional, Tuple
 from langchain_community.document_loaders import PyPDFLoader
-from app.core.chunkers.simple_chunker import SimpleChunker
+from app.core.chunkers.chunker_factory import create_chunker, resolve_chunk_size
 from app.core.indexers.chroma_indexer import ChromaIndexer
-from app.core.config.schemas import RetrieverConfig
+from app.core.indexers.document_registry import document_id
+from app.core.indexers.manifest import IngestionManifest, FileFingerprint, file_sha256, parameters_hash
+from app.core.loaders.page_cache import PageCache
+from app.core.loaders.pdf_loader import (
+    iter_pdf_pages, add_file_metadata, parse_and_chunk_pdf, pdf_title, validate_pdf_path
+)
+from app.core.pipes.ingestion_estimator import IngestionEstimator
+from app.core.pipes.streaming import Stage, batched, run_stages
+from app.core.processors.header_footer import HeaderFooterStripper
+from app.core.processors.near_duplicates import NearDuplicateIndex
+from app.core.config.schemas import EmbeddingConfig, RetrieverConfig
+from app.core.config.default_config import AVAILABLE_EMBEDDINGS, DEFAULT_EMBEDDING
 from langchain_core.documents import Document
 import logging
 
 logger = logging.getLogger(__name__)
 
+def available_cpus() -> int:
+    """Number of CPUs this process may run on, which can be fewer than the host's in containers"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+class FileProcessed(NamedTuple):
+    """Marker sent through the streaming stages once a file has been fully read"""
+    file_path: str
+    pages: int
+    error: Optional[str] = None
+    stripped_lines: int = 0
+
 class SimpleIndexChromaPipeline:
-    def __init__(self, collection_name: str, chunk_size: int = 10000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        collection_name: str,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: int = 200,
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        index_batch_size: int = 500,
+        queue_size: int = 32,
+        use_page_cache: bool = True,
+        chunker: str = "simple",
+        deduplicate: bool = False,
+        duplicate_threshold: float = 0.9,
+        strip_headers: bool = True,
+        page_window: int = 50
+    ):
         """Initialize the pipeline with collection name and chunking parameters.
         
         Args:
             collection_name: Name of the collection to store documents
-            chunk_size: Size of document chunks (default: 10000)
-            chunk_overlap: Overlap between chunks (default: 200)
+            chunk_size: Size of document chunks, in characters or tokens depending on the chunker
+                (default: 10000 characters, 800 tokens for the token chunker)
+            chunk_overlap: Overlap between chunks, in the same unit as chunk_size (default: 200)
+            parallel: Parse and chunk PDFs in a process pool when processing several files (default: False)
+            max_workers: Number of worker processes (default: number of cores available to the process)
+            index_batch_size: Number of chunks embedded and written per indexer call (default: 500)
+            queue_size: Maximum number of items buffered between two streaming stages (default: 32)
+            use_page_cache: Reuse the pages parsed from the same PDF content in previous runs (default: True)
+            chunker: Name of the chunker, "simple" splits on characters, "token" on tokens and
+                "semantic" on topic shifts between sentences (default: "simple")
+            deduplicate: Skip chunks that are near duplicates of chunks already in the collection (default: False)
+            duplicate_threshold: Estimated Jaccard similarity above which a chunk is a near duplicate (default: 0.9)
+            strip_headers: Remove lines repeated at the top or bottom of most pages before chunking (default: True)
+            page_window: Number of pages of a PDF loaded, chunked and indexed at a time when files are
+                processed one by one, bounding memory on very large PDFs (default: 50)
         """
         try:
             # Create retriever config
             self.retriever_config = RetrieverConfig(collection_name=collection_name)
             
             self.collection_name = collection_name
+            self.chunk_size = resolve_chunk_size(chunker, chunk_size, chunk_overlap)
+            self.chunk_overlap = chunk_overlap
+            self.parallel = parallel
+            self.max_workers = max_workers or available_cpus()
+            self.index_batch_size = index_batch_size
+            self.queue_size = queue_size
             self.loader = PyPDFLoader
-            self.chunker = SimpleChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+            self.page_cache = PageCache(loader=self.loader) if use_page_cache else None
+            self.chunker_type = chunker
             self.indexer = ChromaIndexer(self.retriever_config)
+            self.chunker = create_chunker(
+                chunker,
+                chunk_size=self.chunk_size,
+                chunk_overlap=chunk_overlap,
+                embeddings=self.indexer.vectorstore.embeddings
+            )
+            self.manifest = IngestionManifest(collection_name)
+            self.near_duplicates = (
+                NearDuplicateIndex(collection_name, threshold=duplicate_threshold) if deduplicate else None
+            )
+            self.duplicate_chunks = 0
+            self.strip_headers = strip_headers
+            self.stripped_lines = 0
+            self.page_window = page_window
+            self.params_hash = parameters_hash({
+                "chunker": chunker,
+                "chunk_size": self.chunk_size,
+                "chunk_overlap": chunk_overlap,
+                "deduplicate": deduplicate,
+                "duplicate_threshold": duplicate_threshold if deduplicate else None,
+                "strip_headers": strip_headers
+            })
+            self.last_report: Dict[str, Any] = {}
         except Exception as e:
             logger.error(f"Error initializing pipeline: {str(e)}")
             raise
@@ -44,53 +129,61 @@ class SimpleIndexChromaPipeline:
             ValueError: If the file is not a valid PDF
             Exception: For other processing errors
         """
+        chunked_documents, _ = self._process_pdf(file_path)
+        return chunked_documents
+
+    def _process_pdf(self, file_path: str):
+        """Process a single PDF file and return its chunks and page count.
+        
+        Pages are read lazily and chunked and indexed page_window pages at a
+        time, so only one window of pages is held in memory and the first
+        chunks are searchable before the end of a long PDF is parsed.
+        """
         try:
-            # Verify file exists and is PDF
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"File not found: {file_path}")
-            if not file_path.lower().endswith('.pdf'):
-                raise ValueError(f"File is not a PDF: {file_path}")
-                
             logger.info(f"Processing PDF: {file_path}")
             
-            # Load PDF
-            loader = self.loader(file_path)
-            documents = loader.load()
+            # Verify file exists and is PDF, then load it page by page
+            validate_pdf_path(file_path)
+            sha256 = file_sha256(file_path)
+            pages = iter_pdf_pages(file_path, loader=self.loader, page_cache=self.page_cache, sha256=sha256)
+            stripper = HeaderFooterStripper()
+            if self.strip_headers:
+                pages = stripper.strip(pages)
             
-            if not documents:
-                logger.warning(f"No content extracted from PDF: {file_path}")
-                return []
-            
-            # Add file metadata to each document
-            filename = os.path.basename(file_path)
-            for doc in documents:
-                doc.metadata.update({
-                    "source_file": filename,
-                    "file_path": file_path,
-                    "page_number": doc.metadata.get("page", 1)
-                })
-
-            # Chunk documents
-            chunked_documents = self.chunker.split_documents(documents)
+            chunked_documents = []
+            page_count = 0
+            try:
+                for window in batched(pages, self.page_window):
+                    page_count += len(window)
+                    
+                    # Chunk the window, keeping file metadata on every chunk
+                    chunks = add_file_metadata(self.chunker.split_documents(window), file_path)
+                    chunks = self._suppress_duplicates(chunks)
+                    chunked_documents.extend(chunks)
+                    
+                    # Index the window
+                    if chunks:
+                        self._add_chunks(chunks)
+                    logger.info(
+                        f"Indexed {page_count} pages of {os.path.basename(file_path)}, "
+                        f"{len(chunked_documents)} chunks so far"
+                    )
+            except Exception:
+                # Drop the windows already written for a file that failed midway
+                self._discard_chunks(file_path, [doc.id for doc in chunked_documents])
+                raise
+            self.stripped_lines += stripper.stripped_lines
             
+            if not page_count:
+                logger.warning(f"No content extracted from PDF: {file_path}")
+                return [], 0
+            self._register_document(file_path, page_count, sha256)
             if not chunked_documents:
                 logger.warning(f"No chunks created from PDF: {file_path}")
-                return []
+                return [], page_count
             
-            # Ensure metadata is preserved in chunks
-            for chunk in chunked_documents:
-                if not chunk.metadata.get("source_file"):
-                    chunk.metadata.update({
-                        "source_file": filename,
-                        "file_path": file_path,
-                        "page_number": chunk.metadata.get("page", 1)
-                    })
-
-            # Index documents
-            self.indexer.add_documents(chunked_documents)
-            
-            logger.info(f"Successfully processed PDF {filename} into {len(chunked_documents)} chunks")
-            return chunked_documents
+            logger.info(f"Successfully processed PDF {os.path.basename(file_path)} into {len(chunked_documents)} chunks")
+            return chunked_documents, page_count
 
         except FileNotFoundError as e:
             logger.error(f"File not found error: {str(e)}")
@@ -105,6 +198,10 @@ class SimpleIndexChromaPipeline:
     def process_multiple_pdfs(self, file_paths: List[str]) -> List[Document]:
         """Process multiple PDF files.
         
+        Files are processed one after the other, or in a process pool when the
+        pipeline was created with parallel=True. A throughput report is stored
+        in self.last_report after every call.
+        
         Args:
             file_paths: List of paths to PDF files
             
@@ -115,20 +212,34 @@ class SimpleIndexChromaPipeline:
             Exception: If any file processing fails
         """
         try:
-            all_documents = []
-            failed_files = []
+            start_time = time.perf_counter()
+            self.duplicate_chunks = 0
+            self.stripped_lines = 0
             
-            for file_path in file_paths:
-                try:
-                    processed_docs = self.process_pdf(file_path)
-                    all_documents.extend(processed_docs)
-                except Exception as e:
-                    logger.error(f"Failed to process {file_path}: {str(e)}")
-                    failed_files.append((file_path, str(e)))
+            if self.parallel and len(file_paths) > 1:
+                all_documents, failed_files, page_count, workers = self._process_parallel(file_paths)
+            else:
+                all_documents, failed_files, page_count, workers = self._process_serial(file_paths)
             
             if failed_files:
                 logger.warning(f"Failed to process {len(failed_files)} files")
                 # Could raise an exception with failed files info if needed
+            
+            self.last_report = self._build_report(
+                file_count=len(file_paths) - len(failed_files),
+                page_count=page_count,
+                chunk_count=len(all_documents),
+                failed_files=failed_files,
+                workers=workers,
+                elapsed=time.perf_counter() - start_time
+            )
+            self.last_report["duplicate_chunks"] = self.duplicate_chunks
+            self.last_report["stripped_lines"] = self.stripped_lines
+            logger.info(
+                f"Processed {self.last_report['files']} files ({self.last_report['pages']} pages) in "
+                f"{self.last_report['elapsed_seconds']}s: {self.last_report['files_per_second']} files/s, "
+                f"{self.last_report['pages_per_second']} pages/s"
+            )
                 
             return all_documents
             
@@ -136,14 +247,179 @@ class SimpleIndexChromaPipeline:
             logger.error(f"Error in batch processing PDFs: {str(e)}")
             raise
 
-    def process_folder(self, folder_path: str) -> List[Document]:
-        """Process all PDF files in a folder.
+    def _process_serial(self, file_paths: List[str]):
+        """Process PDF files one after the other in the current process"""
+        all_documents = []
+        failed_files = []
+        page_count = 0
+        
+        for file_path in file_paths:
+            try:
+                processed_docs, pages = self._process_pdf(file_path)
+                all_documents.extend(processed_docs)
+                page_count += pages
+            except Exception as e:
+                logger.error(f"Failed to process {file_path}: {str(e)}")
+                failed_files.append((file_path, str(e)))
+        
+        return all_documents, failed_files, page_count, 1
+
+    def _process_parallel(self, file_paths: List[str]):
+        """Parse and chunk PDF files in a process pool.
+        
+        PDF parsing is CPU-bound, so it runs in worker processes. Embedding and
+        ChromaDB writes stay in this process and are issued in batches of
+        index_batch_size chunks.
+        """
+        all_documents = []
+        failed_files = []
+        page_count = 0
+        pending: List[Document] = []
+        workers = min(self.max_workers, len(file_paths))
+        
+        logger.info(f"Parsing {len(file_paths)} PDFs with {workers} worker processes")
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(parse_and_chunk_pdf, file_path, **self._worker_options()): file_path
+                for file_path in file_paths
+            }
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    chunks, pages, stripped_lines = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to process {file_path}: {str(e)}")
+                    failed_files.append((file_path, str(e)))
+                    continue
+                self.stripped_lines += stripped_lines
+                
+                if not chunks:
+                    logger.warning(f"No chunks created from PDF: {file_path}")
+                if pages:
+                    self._register_document(file_path, pages)
+                page_count += pages
+                pending.extend(chunks)
+                
+                if len(pending) >= self.index_batch_size:
+                    self._flush(pending, all_documents)
+                    pending = []
+        
+        if pending:
+            self._flush(pending, all_documents)
+        
+        return all_documents, failed_files, page_count, workers
+
+    def _worker_options(self) -> Dict[str, Any]:
+        """Keyword arguments of parse_and_chunk_pdf, worker processes open their own PageCache"""
+        return {
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "page_cache_directory": self.page_cache.directory if self.page_cache is not None else None,
+            "chunker": self.chunker_type,
+            "strip_headers": self.strip_headers
+        }
+
+    def _flush(self, chunks: List[Document], all_documents: List[Document]):
+        """Embed and write a batch of chunks to the collection"""
+        chunks = self._suppress_duplicates(chunks)
+        if not chunks:
+            return
+        self._add_chunks(chunks)
+        all_documents.extend(chunks)
+        logger.info(f"Indexed batch of {len(chunks)} chunks into '{self.collection_name}'")
+
+    def _add_chunks(self, chunks: List[Document]):
+        """Embed and write chunks, registering them in the near-duplicate index only once written"""
+        try:
+            self.indexer.add_documents(self.indexer.documents.compact(chunks))
+        except Exception:
+            if self.near_duplicates is not None:
+                self.near_duplicates.discard([doc.id for doc in chunks])
+            raise
+        if self.near_duplicates is not None:
+            self.near_duplicates.register([doc.id for doc in chunks])
+
+    def _suppress_duplicates(self, chunks: List[Document]) -> List[Document]:
+        """Drop near-duplicate chunks when deduplication is enabled, counting them"""
+        if self.near_duplicates is None or not chunks:
+            return chunks
+        kept = self.near_duplicates.filter(chunks)
+        self.duplicate_chunks += len(chunks) - len(kept)
+        return kept
+
+    def _register_document(self, file_path: str, page_count: int, sha256: Optional[str] = None):
+        """Record a processed file in the collection's document registry, referenced by its chunks"""
+        self.indexer.documents.register(
+            file_path,
+            sha256=sha256 or file_sha256(file_path),
+            title=pdf_title(file_path),
+            page_count=page_count
+        )
+
+    def _delete_chunks(self, chunk_ids: List[str]):
+        """Delete chunks from the collection and from the near-duplicate index"""
+        self.indexer.delete_documents(chunk_ids)
+        if self.near_duplicates is not None:
+            self.near_duplicates.remove(chunk_ids)
+
+    def _discard_chunks(self, file_path: str, chunk_ids: List[str]):
+        """Delete the chunks of a file that failed, written or still pending in the near-duplicate index"""
+        if not chunk_ids:
+            return
+        logger.info(f"Removing {len(chunk_ids)} chunks of failed file {file_path}")
+        try:
+            self._delete_chunks(chunk_ids)
+        except Exception as e:
+            logger.error(f"Error removing chunks of failed file {file_path}: {str(e)}")
+
+    @staticmethod
+    def _build_report(
+        file_count: int,
+        page_count: int,
+        chunk_count: int,
+        failed_files: list,
+        workers: int,
+        elapsed: float
+    ) -> Dict[str, Any]:
+        """Build the throughput report of an ingestion run"""
+        return {
+            "files": file_count,
+            "pages": page_count,
+            "chunks": chunk_count,
+            "failed_files": failed_files,
+            "workers": workers,
+            "elapsed_seconds": round(elapsed, 3),
+            "files_per_second": round(file_count / elapsed, 3) if elapsed > 0 else 0.0,
+            "pages_per_second": round(page_count / elapsed, 3) if elapsed > 0 else 0.0
+        }
+
+    def process_folder(
+        self,
+        folder_path: str,
+        incremental: bool = True,
+        on_progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Dict[str, Any]:
+        """Process all PDF files in a folder as a stream.
+        
+        Files are discovered, loaded page by page, chunked, embedded and written
+        by concurrent stages connected by bounded queues, so memory use doesn't
+        grow with the size of the folder. Chunks are not kept once written.
+        
+        Every indexed file is recorded in the collection's ingestion manifest.
+        Unchanged files are skipped, modified files have their previous chunks
+        replaced, and chunks of files that disappeared from the folder are deleted.
         
         Args:
             folder_path: Path to folder containing PDF files
+            incremental: Skip files whose content hash and processing parameters match the manifest (default: True).
+                If False, every file is re-indexed.
+            on_progress: Optional callback invoked with the file path and run statistics after each file
+            cancel_event: Optional event that stops the run from starting new files once set
             
         Returns:
-            List of processed Document objects from all PDFs
+            Summary of the ingestion run (files, pages, chunks, failures, throughput, stage timings)
             
         Raises:
             NotADirectoryError: If folder_path is not a directory
@@ -152,29 +428,516 @@ class SimpleIndexChromaPipeline:
         try:
             if not os.path.isdir(folder_path):
                 raise NotADirectoryError(f"Not a directory: {folder_path}")
-                
-            all_documents = []
-            pdf_files = []
             
-            # First collect all PDF files
-            for root, _, files in os.walk(folder_path):
-                for file in files:
-                    if file.lower().endswith('.pdf'):
-                        file_path = os.path.join(root, file)
-                        pdf_files.append(file_path)
+            logger.info(f"Streaming PDF files from {folder_path} into '{self.collection_name}'")
+            run = StreamRun(
+                track_files=True,
+                incremental=incremental,
+                on_progress=on_progress,
+                cancel_event=cancel_event
+            )
+            summary = self.process_stream(self._discover_stage(folder_path), run)
+            # Files not reached before a cancellation were never seen, don't treat them as deleted
+            summary["removed_files"] = 0 if run.cancelled else self._remove_missing_files(folder_path, run.seen)
             
-            if not pdf_files:
+            if not run.seen:
                 logger.warning(f"No PDF files found in folder: {folder_path}")
-                return []
-                
-            logger.info(f"Found {len(pdf_files)} PDF files in {folder_path}")
             
-            # Process all collected PDFs
-            return self.process_multiple_pdfs(pdf_files)
+            return summary
             
         except NotADirectoryError as e:
             logger.error(f"Directory error: {str(e)}")
             raise
         except Exception as e:
             logger.error(f"Error processing folder {folder_path}: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def process_stream(self, source: Stage, run: Optional["StreamRun"] = None) -> Dict[str, Any]:
+        """Run the streaming ingestion stages over the file paths yielded by source.
+        
+        Stages: source -> [fingerprint] -> load pages lazily -> chunk -> [deduplicate] -> embed -> write.
+        In parallel mode loading and chunking run in a process pool instead. The
+        fingerprint stage only runs when the run tracks files in the manifest, the
+        deduplicate stage when the pipeline suppresses near duplicates.
+        
+        Args:
+            source: Stage yielding PDF file paths
+            run: State of the run. Files are not tracked in the manifest if None.
+            
+        Returns:
+            Summary of the ingestion run, also stored in self.last_report
+        """
+        run = run or StreamRun()
+        stats = run.stats
+        workers = self.max_workers if self.parallel else 1
+        
+        stages = [
+            ("discover", source),
+            *([("fingerprint", self._fingerprint_stage(run))] if run.track_files else []),
+            *self._parse_stages(run),
+            *([("deduplicate", self._deduplicate_stage(run))] if self.near_duplicates is not None else []),
+            ("embed", self._embed_stage()),
+            ("write", self._write_stage(run))
+        ]
+        
+        start_time = time.perf_counter()
+        try:
+            stage_seconds = run_stages(stages, queue_size=self.queue_size)
+        finally:
+            self._discard_unfinished(run)
+        
+        self.last_report = self._build_report(
+            file_count=stats["files"],
+            page_count=stats["pages"],
+            chunk_count=stats["chunks"],
+            failed_files=stats["failed_files"],
+            workers=workers,
+            elapsed=time.perf_counter() - start_time
+        )
+        self.last_report.update({
+            "unchanged_files": stats["unchanged_files"],
+            "modified_files": stats["modified_files"],
+            "duplicate_chunks": stats["duplicate_chunks"],
+            "stripped_lines": stats["stripped_lines"],
+            "cancelled": run.cancelled,
+            "stage_seconds": stage_seconds
+        })
+        logger.info(
+            f"Streamed {stats['files']} files ({stats['pages']} pages, {stats['chunks']} chunks) "
+            f"into '{self.collection_name}', {stats['unchanged_files']} unchanged: "
+            f"{self.last_report['pages_per_second']} pages/s"
+        )
+        return self.last_report
+
+    def estimate_folder(
+        self,
+        folder_path: str,
+        incremental: bool = True,
+        assumptions: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """Dry run of process_folder: parse and chunk the files without embedding or writing anything.
+        
+        Files are parsed through the page cache like in a real run, which also
+        warms the cache for it. With incremental, files unchanged since they were
+        indexed are left out as process_folder would. Near-duplicate suppression
+        is not simulated, and the semantic chunker still embeds sentences (cached)
+        to find its cuts.
+        
+        Args:
+            folder_path: Path to folder containing PDF files
+            incremental: Leave out files whose content hash and processing parameters match the manifest (default: True)
+            assumptions: Measured values replacing some of INGESTION_ESTIMATE_ASSUMPTIONS
+            
+        Returns:
+            Files, pages, chunks and embedding tokens, with the projected embedding
+            cost, ingestion time and index size and the assumptions they rest on
+            
+        Raises:
+            NotADirectoryError: If folder_path is not a directory
+            ValueError: If an assumption is unknown or not positive
+            Exception: For other processing errors
+        """
+        try:
+            if not os.path.isdir(folder_path):
+                raise NotADirectoryError(f"Not a directory: {folder_path}")
+            
+            logger.info(f"Estimating the ingestion of {folder_path} into '{self.collection_name}'")
+            run = StreamRun(incremental=incremental)
+            estimator = IngestionEstimator(
+                self._embedding_config(),
+                index_batch_size=self.index_batch_size,
+                assumptions=assumptions
+            )
+            stages = [
+                ("discover", self._discover_stage(folder_path)),
+                ("select", self._select_stage(run)),
+                *self._parse_stages(run),
+                ("estimate", self._estimate_stage(run, estimator))
+            ]
+            
+            start_time = time.perf_counter()
+            stage_seconds = run_stages(stages, queue_size=self.queue_size)
+            
+            stats = run.stats
+            estimate = {
+                "files": stats["files"],
+                "pages": stats["pages"],
+                "unchanged_files": stats["unchanged_files"],
+                "failed_files": stats["failed_files"],
+                **estimator.report(parse_seconds=time.perf_counter() - start_time),
+                "stage_seconds": stage_seconds
+            }
+            logger.info(
+                f"Estimated {estimate['files']} files: {estimate['chunks']} chunks, "
+                f"{estimate['embedding_tokens']} tokens, ${estimate['estimated_cost_usd']}"
+            )
+            return estimate
+            
+        except NotADirectoryError as e:
+            logger.error(f"Directory error: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"Error estimating folder {folder_path}: {str(e)}")
+            raise
+
+    def _embedding_config(self) -> EmbeddingConfig:
+        """Configuration of the collection's embedding model, the default one if it is not listed"""
+        model = getattr(self.indexer.vectorstore.embeddings, "model", None)
+        return AVAILABLE_EMBEDDINGS.get(model, DEFAULT_EMBEDDING)
+
+    def _remove_missing_files(self, folder_path: str, seen: set) -> int:
+        """Delete the chunks of manifest files below folder_path that no longer exist"""
+        removed = 0
+        for path in self.manifest.paths_under(folder_path):
+            if path in seen:
+                continue
+            entry = self.manifest.get(path)
+            if entry and entry["chunk_ids"]:
+                self._delete_chunks(entry["chunk_ids"])
+            self.manifest.remove(path)
+            self.indexer.documents.remove(document_id(path))
+            removed += 1
+            logger.info(f"Removed chunks of deleted file {path} from '{self.collection_name}'")
+        return removed
+
+    def _discard_unfinished(self, run: "StreamRun"):
+        """Delete the chunks written for files a failed or cancelled run did not finish.
+
+        Also forgets the near-duplicate signatures of chunks that were never
+        written, so their content is not suppressed when it is ingested again.
+        """
+        for file_path, chunk_ids in run.chunk_ids.items():
+            logger.info(f"Removing {len(chunk_ids)} chunks of unfinished file {file_path}")
+            self._delete_chunks(chunk_ids)
+        run.chunk_ids.clear()
+        if self.near_duplicates is not None:
+            self.near_duplicates.discard()
+
+    def _fingerprint_stage(self, run: "StreamRun") -> Stage:
+        """Stage comparing each file with the manifest and dropping unchanged ones"""
+        def fingerprint(file_paths):
+            for file_path in file_paths:
+                if run.cancelled:
+                    break
+                run.seen.add(self.manifest.normalize_path(file_path))
+                try:
+                    entry = self.manifest.get(file_path)
+                    file_fingerprint = self.manifest.fingerprint(file_path, entry)
+                except OSError as e:
+                    logger.error(f"Failed to process {file_path}: {str(e)}")
+                    run.stats["failed_files"].append((file_path, str(e)))
+                    run.file_done(file_path)
+                    continue
+                
+                if run.incremental and self.manifest.is_unchanged(entry, file_fingerprint, self.params_hash):
+                    if (entry["size"], entry["mtime_ns"]) != (file_fingerprint.size, file_fingerprint.mtime_ns):
+                        self.manifest.touch(file_path, file_fingerprint)
+                    run.stats["unchanged_files"] += 1
+                    run.file_done(file_path)
+                    continue
+                
+                if entry:
+                    run.previous_chunk_ids[file_path] = entry["chunk_ids"]
+                    if self.near_duplicates is not None:
+                        # The new version must not be suppressed as a duplicate of the one it replaces
+                        self.near_duplicates.remove(entry["chunk_ids"])
+                run.fingerprints[file_path] = file_fingerprint
+                yield file_path
+        return fingerprint
+
+    def _select_stage(self, run: "StreamRun") -> Stage:
+        """Stage of a dry run leaving out unchanged files, without touching the manifest"""
+        def select(file_paths):
+            for file_path in file_paths:
+                try:
+                    entry = self.manifest.get(file_path)
+                    file_fingerprint = self.manifest.fingerprint(file_path, entry)
+                except OSError as e:
+                    logger.error(f"Failed to process {file_path}: {str(e)}")
+                    run.stats["failed_files"].append((file_path, str(e)))
+                    continue
+                if run.incremental and self.manifest.is_unchanged(entry, file_fingerprint, self.params_hash):
+                    run.stats["unchanged_files"] += 1
+                    continue
+                # Lets the page cache skip hashing the file again
+                run.fingerprints[file_path] = file_fingerprint
+                yield file_path
+        return select
+
+    def _estimate_stage(self, run: "StreamRun", estimator: IngestionEstimator) -> Stage:
+        """Final stage of a dry run counting chunks instead of embedding and writing them"""
+        stats = run.stats
+        
+        def estimate(items):
+            for item in items:
+                if isinstance(item, FileProcessed):
+                    stats["pages"] += item.pages
+                    if item.error:
+                        stats["failed_files"].append((item.file_path, item.error))
+                    else:
+                        stats["files"] += 1
+                else:
+                    estimator.add([item])
+                yield item
+        return estimate
+
+    @staticmethod
+    def _discover_stage(folder_path: str) -> Stage:
+        """Stage yielding the path of every PDF file below folder_path"""
+        def discover(_):
+            for root, _, files in os.walk(folder_path):
+                for file in files:
+                    if file.lower().endswith('.pdf'):
+                        yield os.path.join(root, file)
+        return discover
+
+    def _load_stage(self, run: "StreamRun") -> Stage:
+        """Stage loading the pages of each file lazily, followed by a FileProcessed marker"""
+        def load(file_paths):
+            for file_path in file_paths:
+                if run.cancelled:
+                    logger.info(f"Ingestion into '{self.collection_name}' cancelled")
+                    break
+                pages = 0
+                stripper = HeaderFooterStripper()
+                try:
+                    fingerprint = run.fingerprints.get(file_path)
+                    file_pages = iter_pdf_pages(
+                        file_path,
+                        loader=self.loader,
+                        page_cache=self.page_cache,
+                        sha256=fingerprint.sha256 if fingerprint else None
+                    )
+                    if self.strip_headers:
+                        file_pages = stripper.strip(file_pages)
+                    for page in file_pages:
+                        pages += 1
+                        yield page
+                except Exception as e:
+                    logger.error(f"Failed to process {file_path}: {str(e)}")
+                    yield FileProcessed(file_path, pages, error=str(e))
+                    continue
+                if not pages:
+                    logger.warning(f"No content extracted from PDF: {file_path}")
+                yield FileProcessed(file_path, pages, stripped_lines=stripper.stripped_lines)
+        return load
+
+    def _parse_stages(self, run: "StreamRun") -> List[Tuple[str, Stage]]:
+        """Stages turning file paths into chunks, in a process pool in parallel mode"""
+        if self.parallel:
+            return [("parse", self._parallel_parse_stage(run))]
+        return [("load", self._load_stage(run)), ("chunk", self._chunk_stage())]
+
+    def _chunk_stage(self) -> Stage:
+        """Stage splitting each page into chunks"""
+        def chunk(items):
+            for item in items:
+                if isinstance(item, FileProcessed):
+                    yield item
+                    continue
+                for chunk_doc in self.chunker.split_documents([item]):
+                    yield add_file_metadata([chunk_doc], item.metadata["file_path"])[0]
+        return chunk
+
+    def _parallel_parse_stage(self, run: "StreamRun") -> Stage:
+        """Stage parsing and chunking files in a process pool.
+        
+        At most two files per worker are in flight, so parsed chunks never pile
+        up faster than the embed stage consumes them.
+        """
+        def parse(file_paths):
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                in_flight = {}
+                for file_path in file_paths:
+                    if run.cancelled:
+                        logger.info(f"Ingestion into '{self.collection_name}' cancelled")
+                        break
+                    fingerprint = run.fingerprints.get(file_path)
+                    future = executor.submit(
+                        parse_and_chunk_pdf,
+                        file_path,
+                        sha256=fingerprint.sha256 if fingerprint else None,
+                        **self._worker_options()
+                    )
+                    in_flight[future] = file_path
+                    if len(in_flight) >= self.max_workers * 2:
+                        done = next(as_completed(in_flight))
+                        yield from self._collect_parsed(done, in_flight.pop(done))
+                for done in as_completed(list(in_flight)):
+                    yield from self._collect_parsed(done, in_flight.pop(done))
+        return parse
+
+    @staticmethod
+    def _collect_parsed(future, file_path: str):
+        """Yield the chunks of a finished parse job followed by its FileProcessed marker"""
+        try:
+            chunks, pages, stripped_lines = future.result()
+        except Exception as e:
+            logger.error(f"Failed to process {file_path}: {str(e)}")
+            yield FileProcessed(file_path, 0, error=str(e))
+            return
+        yield from chunks
+        yield FileProcessed(file_path, pages, stripped_lines=stripped_lines)
+
+    def _deduplicate_stage(self, run: "StreamRun") -> Stage:
+        """Stage dropping near-duplicate chunks, checked in small batches within each file"""
+        def deduplicate(items):
+            pending: List[Document] = []
+            for item in items:
+                if isinstance(item, FileProcessed):
+                    yield from self._filter_pending(pending, run)
+                    pending = []
+                    yield item
+                    continue
+                pending.append(item)
+                if len(pending) >= 64:
+                    yield from self._filter_pending(pending, run)
+                    pending = []
+            yield from self._filter_pending(pending, run)
+        return deduplicate
+
+    def _filter_pending(self, chunks: List[Document], run: "StreamRun") -> List[Document]:
+        """Filter a batch of chunks through the near-duplicate index, counting suppressed ones"""
+        kept = self.near_duplicates.filter(chunks) if chunks else []
+        run.stats["duplicate_chunks"] += len(chunks) - len(kept)
+        return kept
+
+    def _embed_stage(self) -> Stage:
+        """Stage embedding chunks in batches of index_batch_size.
+        
+        FileProcessed markers are held back until the batch holding the end of
+        their file has been emitted, so the write stage sees them after the
+        file's last chunk.
+        """
+        def embed(items):
+            batch: List[Document] = []
+            markers: List[FileProcessed] = []
+            for item in items:
+                if isinstance(item, FileProcessed):
+                    markers.append(item)
+                    if not batch:
+                        yield from markers
+                        markers = []
+                    continue
+                batch.append(item)
+                if len(batch) >= self.index_batch_size:
+                    yield batch, self.indexer.embed_documents(batch)
+                    yield from markers
+                    batch, markers = [], []
+            if batch:
+                yield batch, self.indexer.embed_documents(batch)
+            yield from markers
+        return embed
+
+    def _write_stage(self, run: "StreamRun") -> Stage:
+        """Stage writing embedded batches to the collection and tallying the run.
+        
+        When the run tracks files, the chunk ids of each file are recorded in the
+        manifest once its FileProcessed marker arrives, and the chunks of its
+        previous version are deleted.
+        """
+        stats = run.stats
+        
+        def write(items):
+            for item in items:
+                if isinstance(item, FileProcessed):
+                    self._finish_file(item, run)
+                    yield item
+                    continue
+                documents, embeddings = item
+                ids = self.indexer.add_embeddings(self.indexer.documents.compact(documents), embeddings)
+                if self.near_duplicates is not None:
+                    self.near_duplicates.register(ids)
+                for doc, chunk_id in zip(documents, ids):
+                    run.chunk_ids.setdefault(doc.metadata["file_path"], []).append(chunk_id)
+                stats["chunks"] += len(documents)
+                logger.info(f"Indexed batch of {len(documents)} chunks into '{self.collection_name}'")
+                # Show progress within long files too, not only once they are complete
+                run.report_progress(documents[-1].metadata["file_path"])
+                yield item
+        return write
+
+    def _finish_file(self, item: FileProcessed, run: "StreamRun"):
+        """Account for a fully read file, update the manifest and report progress"""
+        self._record_file(item, run)
+        run.file_done(item.file_path)
+
+    def _record_file(self, item: FileProcessed, run: "StreamRun"):
+        """Account for a fully read file and update the manifest"""
+        stats = run.stats
+        stats["pages"] += item.pages
+        stats["stripped_lines"] += item.stripped_lines
+        chunk_ids = run.chunk_ids.pop(item.file_path, [])
+        
+        if item.error:
+            stats["failed_files"].append((item.file_path, item.error))
+            if chunk_ids:
+                # Drop the chunks already written for a file that failed midway
+                self._delete_chunks(chunk_ids)
+            return
+        
+        stats["files"] += 1
+        if item.pages:
+            fingerprint = run.fingerprints.get(item.file_path)
+            self._register_document(item.file_path, item.pages, fingerprint.sha256 if fingerprint else None)
+        if not run.track_files:
+            return
+        
+        previous_chunk_ids = run.previous_chunk_ids.pop(item.file_path, None)
+        if previous_chunk_ids is not None:
+            if previous_chunk_ids:
+                self._delete_chunks(previous_chunk_ids)
+            stats["modified_files"] += 1
+        self.manifest.record(item.file_path, run.fingerprints.pop(item.file_path), chunk_ids, self.params_hash)
+
+class StreamRun:
+    """State shared by the stages of one streaming ingestion run"""
+    
+    def __init__(
+        self,
+        track_files: bool = False,
+        incremental: bool = True,
+        on_progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ):
+        """
+        Args:
+            track_files: Record indexed files in the collection's ingestion manifest
+            incremental: Skip files whose content is unchanged since they were recorded
+            on_progress: Called with the file path and the run statistics after each file and each written batch
+            cancel_event: When set, no new file is started and the run winds down
+        """
+        self.track_files = track_files
+        self.incremental = incremental
+        self.on_progress = on_progress
+        self.cancel_event = cancel_event
+        self.stats: Dict[str, Any] = {
+            "files": 0,
+            "pages": 0,
+            "chunks": 0,
+            "failed_files": [],
+            "unchanged_files": 0,
+            "modified_files": 0,
+            "duplicate_chunks": 0,
+            "stripped_lines": 0
+        }
+        self.seen = set()
+        self.fingerprints: Dict[str, FileFingerprint] = {}
+        self.previous_chunk_ids: Dict[str, List[str]] = {}
+        self.chunk_ids: Dict[str, List[str]] = {}
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def file_done(self, file_path: str):
+        """Report progress after a file was indexed, skipped or failed"""
+        self.report_progress(file_path)
+
+    def report_progress(self, file_path: str):
+        """Call on_progress with the file being worked on and the statistics so far"""
+        if self.on_progress is not None:
+            try:
+                self.on_progress(file_path, self.stats)
+            except Exception as e:
+                logger.error(f"Error in progress callback: {str(e)}")
@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# A stage is a generator function that consumes the items produced by the
+# previous stage and yields items for the next one. The first stage receives
+# an empty iterator and acts as the source.
+Stage = Callable[[Iterator[Any]], Iterable[Any]]
+
+_END = object()
+_POLL_INTERVAL = 0.1
+
+class PipelineAborted(Exception):
+    """Raised inside a stage when another stage failed"""
+
+class _StageInput:
+    """Iterator over a bounded queue that records how long the stage waited for input"""
+
+    def __init__(self, source: "queue.Queue", stop: threading.Event):
+        self.source = source
+        self.stop = stop
+        self.wait_time = 0.0
+        self.exhausted = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.exhausted:
+            raise StopIteration
+        start = time.perf_counter()
+        try:
+            while True:
+                if self.stop.is_set():
+                    raise PipelineAborted()
+                try:
+                    item = self.source.get(timeout=_POLL_INTERVAL)
+                    break
+                except queue.Empty:
+                    continue
+        finally:
+            self.wait_time += time.perf_counter() - start
+        if item is _END:
+            self.exhausted = True
+            raise StopIteration
+        return item
+
+def _put(target: "queue.Queue", item: Any, stop: threading.Event) -> float:
+    """Put an item on a bounded queue without blocking forever if the pipeline stopped"""
+    start = time.perf_counter()
+    while True:
+        if stop.is_set():
+            raise PipelineAborted()
+        try:
+            target.put(item, timeout=_POLL_INTERVAL)
+            return time.perf_counter() - start
+        except queue.Full:
+            continue
+
+def run_stages(stages: List[Tuple[str, Stage]], queue_size: int = 8) -> Dict[str, float]:
+    """Run generator stages concurrently, connected by bounded queues.
+
+    Every stage runs in its own thread. Back-pressure from the bounded queues
+    keeps at most queue_size items in flight between two stages, so memory
+    stays flat regardless of how much data flows through the pipeline. The
+    items yielded by the last stage are discarded.
+
+    Args:
+        stages: Ordered list of (name, stage) pairs
+        queue_size: Maximum number of items buffered between two stages
+
+    Returns:
+        Seconds each stage spent working, excluding time spent waiting on its neighbours
+
+    Raises:
+        Exception: The first exception raised by any stage
+    """
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    timings: Dict[str, float] = {name: 0.0 for name, _ in stages}
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages[1:]]
+
+    def worker(index: int, name: str, stage: Stage):
+        inbound = _StageInput(queues[index - 1], stop) if index > 0 else None
+        outbound = queues[index] if index < len(queues) else None
+        blocked = 0.0
+        start = time.perf_counter()
+        try:
+            for item in stage(inbound if inbound is not None else iter(())):
+                if outbound is not None:
+                    blocked += _put(outbound, item, stop)
+            if inbound is not None:
+                # A stage that returned early must not leave its upstream blocked on a full queue
+                for _ in inbound:
+                    pass
+            if outbound is not None:
+                blocked += _put(outbound, _END, stop)
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            logger.error(f"Stage '{name}' failed: {str(e)}")
+            errors.append(e)
+            stop.set()
+        finally:
+            waited = inbound.wait_time if inbound is not None else 0.0
+            timings[name] = round(time.perf_counter() - start - waited - blocked, 3)
+
+    threads = [
+        threading.Thread(target=worker, args=(index, name, stage), name=f"ingest-{name}", daemon=True)
+        for index, (name, stage) in enumerate(stages)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    return timings
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Group a stream of items into lists of at most size items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,80 @@
+import re
+from collections import Counter
+from typing import Iterable, Iterator, List, Set
+from langchain_core.documents import Document
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+class HeaderFooterStripper:
+    """Remove running headers, footers and page numbers from the pages of a document.
+
+    A line is a header or footer when, once digits are normalized, it appears
+    among the first or last edge_lines lines of at least min_ratio of the
+    pages. Repeated lines are learned from the first sample_pages pages and
+    then stripped from every page as it streams through, so long documents are
+    never held in memory. The number of lines stripped from a page is recorded
+    in its "stripped_line_count" metadata; the text itself is dropped, so the
+    boilerplate isn't stored again on every chunk of the page.
+
+    Use one instance per document.
+    """
+
+    def __init__(self, edge_lines: int = 3, min_ratio: float = 0.5, min_pages: int = 3, sample_pages: int = 50):
+        self.edge_lines = edge_lines
+        self.min_ratio = min_ratio
+        self.min_pages = min_pages
+        self.sample_pages = sample_pages
+        self.repeated: Set[str] = set()
+        self.stripped_lines = 0
+
+    def strip(self, pages: Iterable[Document]) -> Iterator[Document]:
+        """Yield the pages of a document with their repeated header and footer lines removed"""
+        self.repeated = set()
+        self.stripped_lines = 0
+        pages = iter(pages)
+        sample: List[Document] = []
+        for page in pages:
+            sample.append(page)
+            if len(sample) >= self.sample_pages:
+                break
+        self.repeated = self.learn(sample)
+        for page in sample:
+            yield self._strip_page(page)
+        for page in pages:
+            yield self._strip_page(page)
+
+    def learn(self, pages: List[Document]) -> Set[str]:
+        """Normalized lines repeated at the edges of enough pages"""
+        if len(pages) < self.min_pages:
+            return set()
+        counts: Counter = Counter()
+        for page in pages:
+            counts.update({self._normalize(line) for _, line in self._edge_lines(page.page_content.split("\n"))})
+        min_count = max(self.min_pages, self.min_ratio * len(pages))
+        return {line for line, count in counts.items() if line and count >= min_count}
+
+    def _strip_page(self, page: Document) -> Document:
+        if not self.repeated:
+            return page
+        lines = page.page_content.split("\n")
+        removed = {
+            index for index, line in self._edge_lines(lines)
+            if self._normalize(line) in self.repeated
+        }
+        if removed:
+            page.metadata["stripped_line_count"] = len(removed)
+            page.page_content = "\n".join(line for index, line in enumerate(lines) if index not in removed)
+            self.stripped_lines += len(removed)
+        return page
+
+    def _edge_lines(self, lines: List[str]) -> Iterator:
+        """Yield (index, line) of the first and last edge_lines non-blank lines"""
+        non_blank = [index for index, line in enumerate(lines) if line.strip()]
+        edges = non_blank[:self.edge_lines] + non_blank[-self.edge_lines:]
+        for index in sorted(set(edges)):
+            yield index, lines[index]
+
+    @staticmethod
+    def _normalize(line: str) -> str:
+        return _DIGITS.sub("#", _SPACES.sub(" ", line.strip().lower()))
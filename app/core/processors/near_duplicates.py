@@ -0,0 +1,226 @@
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import mmh3
+import numpy as np
+from langchain_core.documents import Document
+from app.core.config.default_config import NEAR_DUPLICATES_DB_PATH
+import logging
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+class MinHasher:
+    """MinHash signatures of texts over word shingles.
+
+    Words are hashed once with MurmurHash3. Shingles and the num_perm hash
+    permutations are then computed as NumPy array operations.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text, as num_perm uint32 values"""
+        words = _WORD.findall(text.lower())
+        if not words:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        word_hashes = np.array([mmh3.hash(word, signed=False) for word in words], dtype=np.uint64)
+        # Combine consecutive word hashes into one hash per shingle
+        shingles = word_hashes[:max(len(words) - self.shingle_size + 1, 1)].copy()
+        for offset in range(1, min(self.shingle_size, len(words))):
+            shingles = shingles * np.uint64(1000003) + word_hashes[offset:offset + len(shingles)]
+        shingles = np.unique(shingles & _MAX_HASH)
+        # Overflowing uint64 arithmetic wraps around, which keeps the permutations well mixed
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(shingles, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the shingle sets of two signatures"""
+        return float(np.mean(first == second))
+
+class NearDuplicateIndex:
+    """Per-collection LSH index of chunk MinHash signatures, persisted in SQLite.
+
+    Signatures are split into bands; chunks sharing a band bucket are
+    candidates, and a candidate is a near duplicate when the estimated
+    similarity of the full signatures reaches the threshold. A suppressed
+    chunk is not indexed at all, so if the chunk it duplicates is later
+    deleted the content leaves the collection with it.
+
+    Signatures of kept chunks stay pending in memory until the chunks are
+    written and register is called, so chunks whose write failed never
+    suppress the same content in later runs.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        bands: int = 16,
+        db_path: str = NEAR_DUPLICATES_DB_PATH
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.collection_name = collection_name
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[np.ndarray, List[int]]] = {}
+        self._pending_buckets: Dict[int, Set[str]] = {}
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS near_duplicate_signatures (
+                collection TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                PRIMARY KEY (collection, chunk_id)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS near_duplicate_buckets (
+                collection TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                chunk_id TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS near_duplicate_buckets_lookup "
+            "ON near_duplicate_buckets (collection, bucket)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS near_duplicate_buckets_chunk "
+            "ON near_duplicate_buckets (collection, chunk_id)"
+        )
+        self._conn.commit()
+
+    def filter(self, documents: List[Document]) -> List[Document]:
+        """Drop the near duplicates of indexed chunks, of pending chunks and of each other.
+
+        Kept documents get an id, unless they already have one, and are held
+        as pending under that id: write them to the vectorstore with it, then
+        register the ids. Pending chunks are already matched by later calls.
+
+        Returns:
+            The documents that are not near duplicates
+        """
+        kept = []
+        for doc in documents:
+            signature = self.hasher.signature(doc.page_content)
+            buckets = self._buckets(signature)
+            duplicate_of = self._find_duplicate(signature, buckets)
+            if duplicate_of is not None:
+                logger.debug(f"Chunk of {doc.metadata.get('source_file')} is a near duplicate of {duplicate_of}")
+                continue
+            doc.id = doc.id or str(uuid.uuid4())
+            with self._lock:
+                self._pending[doc.id] = (signature, buckets)
+                for bucket in buckets:
+                    self._pending_buckets.setdefault(bucket, set()).add(doc.id)
+            kept.append(doc)
+        return kept
+
+    def register(self, chunk_ids: Sequence[str]):
+        """Add pending chunks to the index once they were written to the collection"""
+        with self._lock:
+            for chunk_id in chunk_ids:
+                pending = self._pop_pending(chunk_id)
+                if pending is not None:
+                    self._add(chunk_id, *pending)
+            self._conn.commit()
+
+    def discard(self, chunk_ids: Optional[Sequence[str]] = None):
+        """Forget pending chunks that won't be written, all of them if chunk_ids is None"""
+        with self._lock:
+            for chunk_id in list(self._pending) if chunk_ids is None else chunk_ids:
+                self._pop_pending(chunk_id)
+
+    def remove(self, chunk_ids: Sequence[str]):
+        """Forget chunks deleted from the collection"""
+        rows = [(self.collection_name, chunk_id) for chunk_id in chunk_ids]
+        with self._lock:
+            for chunk_id in chunk_ids:
+                self._pop_pending(chunk_id)
+            self._conn.executemany(
+                "DELETE FROM near_duplicate_signatures WHERE collection = ? AND chunk_id = ?", rows
+            )
+            self._conn.executemany(
+                "DELETE FROM near_duplicate_buckets WHERE collection = ? AND chunk_id = ?", rows
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Forget every chunk of the collection"""
+        with self._lock:
+            self._conn.execute("DELETE FROM near_duplicate_signatures WHERE collection = ?", (self.collection_name,))
+            self._conn.execute("DELETE FROM near_duplicate_buckets WHERE collection = ?", (self.collection_name,))
+            self._conn.commit()
+
+    def _buckets(self, signature: np.ndarray) -> List[int]:
+        """One bucket per band, hashing the band index together with its rows"""
+        return [
+            mmh3.hash64(band.to_bytes(2, "little") + signature[band * self.rows:(band + 1) * self.rows].tobytes())[0]
+            for band in range(self.bands)
+        ]
+
+    def _find_duplicate(self, signature: np.ndarray, buckets: List[int]) -> Optional[str]:
+        placeholders = ", ".join("?" for _ in buckets)
+        with self._lock:
+            pending_ids = set().union(*(self._pending_buckets.get(bucket, ()) for bucket in buckets))
+            pending = [(chunk_id, self._pending[chunk_id][0]) for chunk_id in pending_ids]
+            rows = self._conn.execute(
+                f"SELECT chunk_id, signature FROM near_duplicate_signatures WHERE collection = ? AND chunk_id IN ("
+                f"SELECT chunk_id FROM near_duplicate_buckets WHERE collection = ? AND bucket IN ({placeholders}))",
+                (self.collection_name, self.collection_name, *buckets)
+            ).fetchall()
+        candidates = pending + [(chunk_id, np.frombuffer(blob, dtype=np.uint32)) for chunk_id, blob in rows]
+        for chunk_id, candidate in candidates:
+            if self.hasher.similarity(signature, candidate) >= self.threshold:
+                return chunk_id
+        return None
+
+    def _pop_pending(self, chunk_id: str) -> Optional[Tuple[np.ndarray, List[int]]]:
+        """Remove a chunk from the pending ones, called with the lock held"""
+        pending = self._pending.pop(chunk_id, None)
+        if pending is not None:
+            for bucket in pending[1]:
+                ids = self._pending_buckets.get(bucket)
+                if ids is not None:
+                    ids.discard(chunk_id)
+                    if not ids:
+                        del self._pending_buckets[bucket]
+        return pending
+
+    def _add(self, chunk_id: str, signature: np.ndarray, buckets: List[int]):
+        """Insert a chunk without committing, called with the lock held"""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO near_duplicate_signatures (collection, chunk_id, signature) VALUES (?, ?, ?)",
+            (self.collection_name, chunk_id, signature.tobytes())
+        )
+        self._conn.executemany(
+            "INSERT INTO near_duplicate_buckets (collection, bucket, chunk_id) VALUES (?, ?, ?)",
+            [(self.collection_name, bucket, chunk_id) for bucket in buckets]
+        )
@@ -0,0 +1,68 @@
+"""Microbenchmark of OffsetTextSplitter against RecursiveCharacterTextSplitter.
+
+Both splitters produce the same chunks, checked by tests/test_offset_splitter.py.
+Run from the repository root:
+
+    python -m benchmarks.chunker_benchmark --megabytes 4
+"""
+import argparse
+import random
+import string
+import time
+from typing import Callable, List, Tuple
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from app.core.chunkers.offset_splitter import OffsetTextSplitter
+
+CONFIGS = [(10000, 200), (4000, 500), (1000, 200), (200, 0), (50, 49)]
+
+def synthetic_text(size: int, seed: int = 0) -> str:
+    """Text shaped like extracted PDF pages: short lines, paragraphs, the odd very long line or unbroken token"""
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 12))) for _ in range(5000)]
+    parts: List[str] = []
+    length = 0
+    while length < size:
+        roll = rng.random()
+        if roll < 0.01:
+            part = "".join(rng.choices(string.ascii_letters, k=rng.randint(500, 15000)))
+        elif roll < 0.03:
+            part = " ".join(rng.choices(vocabulary, k=rng.randint(500, 3000)))
+        else:
+            part = " ".join(rng.choices(vocabulary, k=rng.randint(3, 15)))
+        part += rng.choice(["\n", "\n", "\n", "\n\n", " \n", "\n\n\n", "  \t\n"])
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+def best_time(split: Callable[[str], List[str]], text: str, repeat: int) -> Tuple[float, int]:
+    """Best wall time over repeat runs, with the number of chunks produced"""
+    best = float("inf")
+    chunks = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = len(split(text))
+        best = min(best, time.perf_counter() - start)
+    return best, chunks
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=4.0, help="Size of the benchmark document")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, the best one is kept")
+    args = parser.parse_args()
+
+    text = synthetic_text(int(args.megabytes * 1024 * 1024))
+    print(f"Document: {len(text) / 1024 / 1024:.1f} MB")
+    print(f"{'chunk_size':>10} {'overlap':>8} {'chunks':>8} {'recursive s':>12} {'offset s':>10} {'speedup':>8}")
+    for chunk_size, chunk_overlap in CONFIGS:
+        reference = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        candidate = OffsetTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        reference_time, reference_chunks = best_time(reference.split_text, text, args.repeat)
+        candidate_time, candidate_chunks = best_time(candidate.split_text, text, args.repeat)
+        assert reference_chunks == candidate_chunks
+        print(
+            f"{chunk_size:>10} {chunk_overlap:>8} {candidate_chunks:>8} {reference_time:>12.3f} "
+            f"{candidate_time:>10.3f} {reference_time / candidate_time:>7.1f}x"
+        )
+
+if __name__ == "__main__":
+    main()
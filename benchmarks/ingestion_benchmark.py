@@ -0,0 +1,179 @@
+"""End-to-end ingestion benchmark of SimpleIndexChromaPipeline on a synthetic PDF corpus.
+
+Run from the repository root:
+
+    python -m benchmarks.ingestion_benchmark --files 20 --pages 50 --output results.json
+    python -m benchmarks.ingestion_benchmark --files 20 --pages 50 --baseline results.json
+
+Embeddings come from a local deterministic embedder, so no API is called and
+the numbers only reflect the pipeline. Each run indexes the same generated
+corpus from a fresh temporary directory holding the collection, manifest and
+caches, so every run starts cold. Results are printed as JSON; with
+--baseline the median throughput is compared with a previous result and the
+exit status is 1 if it dropped by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+from typing import Any, Dict, Optional
+
+# The ChromaDB singleton builds an OpenAI embedder on import. It is replaced below and never called.
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.core.indexers.chroma_indexer import chroma_db
+from app.core.pipes.simple_index_pipeline import SimpleIndexChromaPipeline, available_cpus
+from benchmarks.synthetic_pdf import generate_corpus
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak RSS is then not reported
+    resource = None
+
+def directory_size(path: str) -> int:
+    """Total size in bytes of the files below path"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+def peak_rss_mb() -> Optional[Dict[str, float]]:
+    """Peak resident set size of this process and of its largest worker process, in MB"""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    return {
+        "process": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 1024 / 1024, 1),
+        "workers": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit / 1024 / 1024, 1)
+    }
+
+def run_once(corpus_dir: str, args: argparse.Namespace, index: int) -> Dict[str, Any]:
+    """Index the corpus into a new collection and return the measurements of the run"""
+    repository = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="ingestion-benchmark-")
+    # The pipeline's databases and caches use paths relative to the working directory
+    os.chdir(workdir)
+    try:
+        chroma_db.client = None
+        chroma_db.vectorstore = None
+        chroma_db.persist_directory = os.path.join(workdir, "chroma_db")
+        pipeline = SimpleIndexChromaPipeline(
+            collection_name=f"benchmark_{index}",
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            chunker=args.chunker,
+            parallel=args.parallel,
+            max_workers=args.workers,
+            index_batch_size=args.batch_size,
+            deduplicate=args.deduplicate
+        )
+        report = pipeline.process_folder(corpus_dir, incremental=False)
+        elapsed = report["elapsed_seconds"]
+        return {
+            "elapsed_seconds": elapsed,
+            "files": report["files"],
+            "pages": report["pages"],
+            "chunks": report["chunks"],
+            "failed_files": len(report["failed_files"]),
+            "pages_per_second": report["pages_per_second"],
+            "chunks_per_second": round(report["chunks"] / elapsed, 3) if elapsed > 0 else 0.0,
+            "stage_seconds": report["stage_seconds"],
+            "collection_bytes": directory_size(chroma_db.persist_directory)
+        }
+    finally:
+        chroma_db.client = None
+        chroma_db.vectorstore = None
+        os.chdir(repository)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    """Relative change of the median throughput against a baseline result"""
+    comparison = {}
+    for metric in ("pages_per_second", "chunks_per_second"):
+        before = baseline["median"][metric]
+        after = result["median"][metric]
+        comparison[metric] = round((after - before) / before, 3) if before else None
+    comparison["regression"] = any(
+        change is not None and change < -tolerance for change in comparison.values()
+    )
+    return comparison
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10, help="Number of PDFs in the corpus")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per PDF")
+    parser.add_argument("--lines-per-page", type=int, default=50, help="Text lines per page")
+    parser.add_argument("--words-per-line", type=int, default=12, help="Words per text line")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated corpus")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--chunker", choices=["simple", "token", "semantic"], default="simple")
+    parser.add_argument("--parallel", action="store_true", help="Parse PDFs in a process pool")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes in parallel mode")
+    parser.add_argument("--batch-size", type=int, default=500, help="Chunks embedded and written per batch")
+    parser.add_argument("--deduplicate", action="store_true", help="Skip near-duplicate chunks")
+    parser.add_argument("--embedding-size", type=int, default=1536, help="Dimensions of the fake embeddings")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs, medians are reported")
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    parser.add_argument("--baseline", help="JSON result of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative throughput drop")
+    args = parser.parse_args()
+
+    chroma_db.embedding_function = DeterministicFakeEmbedding(size=args.embedding_size)
+
+    with tempfile.TemporaryDirectory(prefix="ingestion-corpus-") as corpus_dir:
+        paths = generate_corpus(
+            corpus_dir,
+            args.files,
+            args.pages,
+            lines_per_page=args.lines_per_page,
+            words_per_line=args.words_per_line,
+            seed=args.seed
+        )
+        corpus_bytes = sum(os.path.getsize(path) for path in paths)
+        runs = [run_once(corpus_dir, args, index) for index in range(args.repeat)]
+
+    result: Dict[str, Any] = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "available_cpus": available_cpus()
+        },
+        "corpus": {"files": args.files, "pages": args.files * args.pages, "bytes": corpus_bytes},
+        "median": {
+            metric: round(statistics.median(run[metric] for run in runs), 3)
+            for metric in ("elapsed_seconds", "pages_per_second", "chunks_per_second", "collection_bytes")
+        },
+        "runs": runs,
+        "peak_rss_mb": peak_rss_mb()
+    }
+    result["median"]["stage_seconds"] = {
+        stage: round(statistics.median(run["stage_seconds"].get(stage, 0.0) for run in runs), 3)
+        for stage in runs[0]["stage_seconds"]
+    }
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            result["comparison"] = compare(result, json.load(f), args.tolerance)
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+    if result.get("comparison", {}).get("regression"):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
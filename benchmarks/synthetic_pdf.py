@@ -0,0 +1,84 @@
+"""Deterministic synthetic PDF corpus for ingestion benchmarks.
+
+PDFs are written directly, without a PDF library: one Helvetica font and one
+uncompressed text stream per page. The same arguments always produce
+byte-identical files, so runs on the same corpus are comparable.
+"""
+import os
+import random
+import string
+from typing import List
+
+def page_lines(rng: random.Random, vocabulary: List[str], page_number: int, lines: int, words_per_line: int) -> List[str]:
+    """Text lines of one page: a running header, body lines and a page number footer"""
+    body = [" ".join(rng.choices(vocabulary, k=words_per_line)) for _ in range(lines)]
+    return ["Synthetic Benchmark Corpus"] + body + [f"Page {page_number}"]
+
+def write_pdf(path: str, pages: int, lines_per_page: int = 50, words_per_line: int = 12, seed: int = 0):
+    """Write a PDF of pages pages, each holding lines_per_page lines of words_per_line words
+
+    Args:
+        path: Output file
+        pages: Number of pages
+        lines_per_page: Body lines per page, sets the text density together with words_per_line
+        words_per_line: Words per body line
+        seed: Seed of the generated text
+    """
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10))) for _ in range(2000)]
+    leading = max(min(720 / (lines_per_page + 2), 14), 1)
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        (
+            f"<< /Type /Pages /Kids [{' '.join(f'{4 + 2 * i} 0 R' for i in range(pages))}] "
+            f"/Count {pages} >>"
+        ).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    for index in range(pages):
+        lines = page_lines(rng, vocabulary, index + 1, lines_per_page, words_per_line)
+        stream = (
+            f"BT /F1 {leading * 0.8:.2f} Tf {leading:.2f} TL 40 770 Td "
+            + " ".join(f"({line}) Tj T*" for line in lines)
+            + " ET"
+        ).encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * index} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    body = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, content in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n".encode() + content + b"\nendobj\n"
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        body += f"{offset:010d} 00000 n \n".encode()
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+
+    with open(path, "wb") as f:
+        f.write(body)
+
+def generate_corpus(
+    directory: str,
+    files: int,
+    pages: int,
+    lines_per_page: int = 50,
+    words_per_line: int = 12,
+    seed: int = 0
+) -> List[str]:
+    """Write files synthetic PDFs to directory and return their paths
+
+    Every file gets its own seed derived from seed, so files differ from each other.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for index in range(files):
+        path = os.path.join(directory, f"synthetic_{index:04d}.pdf")
+        write_pdf(path, pages, lines_per_page=lines_per_page, words_per_line=words_per_line, seed=seed * 100003 + index)
+        paths.append(path)
+    return paths
@@ -0,0 +1,94 @@
+import hashlib
+import os
+from typing import List
+
+# Clients of the hosted models are created at import time, they are never called by the tests
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-test")
+
+import pytest
+import tiktoken
+from langchain_core.embeddings import Embeddings
+
+class HashEmbeddings(Embeddings):
+    """Deterministic embeddings derived from the sha256 of the text"""
+
+    def __init__(self, size: int = 16):
+        self.size = size
+        self.calls = 0
+
+    def _embed(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [byte / 255 for byte in digest[:self.size]]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+def toy_encoding() -> tiktoken.Encoding:
+    """Offline tiktoken encoding with one token per byte, words and whitespace split apart"""
+    return tiktoken.Encoding(
+        name="toy",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={}
+    )
+
+def make_pdf(path: str, pages: List[str]):
+    """Write a minimal PDF with one text line per entry of each page"""
+    offsets = []
+    body = b"%PDF-1.4\n"
+
+    def add(obj: bytes):
+        nonlocal body
+        offsets.append(len(body))
+        body += f"{len(offsets)} 0 obj\n".encode() + obj + b"\nendobj\n"
+
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    add(b"<< /Type /Catalog /Pages 2 0 R >>")
+    add(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, page in enumerate(pages):
+        lines = " ".join(f"({line}) '" for line in page.splitlines())
+        content = f"BT /F1 10 Tf 50 780 Td 12 TL {lines} ET".encode()
+        add(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        add(f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream")
+    xref = len(body)
+    body += f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        body += f"{offset:010d} 00000 n \n".encode()
+    body += f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(body)
+
+@pytest.fixture
+def offline_encoding(monkeypatch):
+    """Replace the tiktoken encodings, downloaded on first use, with the toy encoding"""
+    from app.core.chunkers import token_chunker
+    monkeypatch.setattr(tiktoken, "get_encoding", lambda name: toy_encoding())
+    token_chunker.get_encoding.cache_clear()
+    yield
+    token_chunker.get_encoding.cache_clear()
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run the test from an empty directory, so the local databases under ./app/databases are its own"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture
+def embeddings(workdir, monkeypatch):
+    """Point the shared ChromaDB instance to a fresh directory with deterministic embeddings"""
+    from app.core.indexers.chroma_indexer import chroma_db
+    fake = HashEmbeddings()
+    monkeypatch.setattr(chroma_db, "embedding_function", fake)
+    monkeypatch.setattr(chroma_db, "persist_directory", str(workdir / "chroma_db"))
+    monkeypatch.setattr(chroma_db, "client", None)
+    monkeypatch.setattr(chroma_db, "vectorstore", None)
+    return fake
@@ -0,0 +1,123 @@
+import threading
+import time
+import pytest
+from app.core.agents import agent_registry as registry_module
+from app.core.agents.agent_registry import AgentRegistry, agent_config_key
+from app.core.config.schemas import AgentConfig
+from app.core.config.default_config import DEFAULT_AGENT_CONFIG, create_agent_config
+
+class FakeAgent:
+    """Stands in for an agent, counting constructions"""
+    constructed = 0
+
+    def __init__(self, config):
+        type(self).constructed += 1
+        self.config = config
+
+@pytest.fixture(autouse=True)
+def fake_agents(monkeypatch):
+    FakeAgent.constructed = 0
+    monkeypatch.setitem(registry_module.AGENT_TYPES, "simple", FakeAgent)
+    monkeypatch.setitem(registry_module.AGENT_TYPES, "complex", FakeAgent)
+
+def config(collection: str = "default_collection", k: int = 4, **agent_parameters):
+    return create_agent_config(collection_name=collection, k=k, agent_parameters=agent_parameters)
+
+def test_key_is_independent_of_key_order_and_config_type():
+    first = config(max_retrievals=3, max_generations=2)
+    second = config(max_generations=2, max_retrievals=3)
+    assert agent_config_key("complex", first) == agent_config_key("complex", second)
+    assert agent_config_key("complex", first) != agent_config_key("simple", first)
+    assert agent_config_key("complex", first) != agent_config_key("complex", config(k=5, max_retrievals=3, max_generations=2))
+
+def test_key_resolves_the_context_budget_of_the_model():
+    resolved = config()
+    unset = config().model_dump()
+    unset["llm"].pop("context_budget")
+    assert resolved.llm.context_budget is not None
+    assert agent_config_key("simple", resolved) == agent_config_key("simple", AgentConfig.model_validate(unset))
+
+    unset["llm"]["context_budget"] = resolved.llm.context_budget + 1
+    assert agent_config_key("simple", resolved) != agent_config_key("simple", AgentConfig.model_validate(unset))
+
+def test_same_configuration_shares_one_agent():
+    registry = AgentRegistry()
+    agent = registry.get("simple", config())
+    assert registry.get("simple", config().model_dump()) is agent
+    # The default configuration is the one create_agent_config builds with its defaults
+    assert registry.get("simple") is agent
+    assert registry.get("simple", DEFAULT_AGENT_CONFIG) is agent
+    assert registry.get("complex", config()) is not agent
+    assert FakeAgent.constructed == 2
+    assert registry.stats()["hits"] == 3
+
+def test_least_recently_used_agent_is_evicted():
+    registry = AgentRegistry(max_size=2)
+    first = registry.get("simple", config("a"))
+    registry.get("simple", config("b"))
+    assert registry.get("simple", config("a")) is first
+    registry.get("simple", config("c"))
+
+    stats = registry.stats()
+    assert stats["size"] == 2 and stats["evictions"] == 1
+    assert registry.get("simple", config("a")) is first
+    constructed = FakeAgent.constructed
+    registry.get("simple", config("b"))
+    assert FakeAgent.constructed == constructed + 1
+
+def test_concurrent_requests_construct_once(monkeypatch):
+    class SlowAgent(FakeAgent):
+        def __init__(self, config):
+            time.sleep(0.05)
+            super().__init__(config)
+
+    monkeypatch.setitem(registry_module.AGENT_TYPES, "simple", SlowAgent)
+    registry = AgentRegistry()
+    agents = []
+    threads = [threading.Thread(target=lambda: agents.append(registry.get("simple", config()))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert SlowAgent.constructed == 1
+    assert all(agent is agents[0] for agent in agents)
+
+def test_build_locks_are_dropped_once_the_agent_is_stored(monkeypatch):
+    class FailingAgent(FakeAgent):
+        fail = True
+
+        def __init__(self, config):
+            if type(self).fail:
+                raise RuntimeError("construction failed")
+            super().__init__(config)
+
+    monkeypatch.setitem(registry_module.AGENT_TYPES, "simple", FailingAgent)
+    registry = AgentRegistry()
+    with pytest.raises(RuntimeError):
+        registry.get("simple", config())
+    assert registry._building == {} and registry.stats()["size"] == 0
+
+    FailingAgent.fail = False
+    agent = registry.get("simple", config())
+    assert registry._building == {}
+    assert registry.get("simple", config()) is agent
+    assert FailingAgent.constructed == 1
+
+def test_invalidate_drops_agents_of_a_collection():
+    registry = AgentRegistry()
+    registry.get("simple", config("a"))
+    registry.get("complex", config("a"))
+    registry.get("simple", config("b"))
+    assert registry.invalidate("a") == 2
+    assert registry.stats()["size"] == 1
+    assert registry.invalidate() == 1
+
+def test_warm_up_skips_failing_configurations(monkeypatch):
+    registry = AgentRegistry()
+    assert registry.warm_up([("simple", config()), ("unknown", config())]) == 1
+    registry.get("simple", config())
+    assert FakeAgent.constructed == 1
+
+def test_unknown_agent_type_is_rejected():
+    with pytest.raises(ValueError):
+        AgentRegistry().get("graph", config())
@@ -0,0 +1,55 @@
+import pytest
+from app.core.chunkers.chunker_factory import create_chunker, resolve_chunk_size
+from app.core.config.default_config import DEFAULT_CHUNK_SIZES, DEFAULT_EMBEDDING
+
+def test_each_chunker_has_its_default_chunk_size():
+    assert resolve_chunk_size("simple") == 10000
+    assert resolve_chunk_size("semantic") == 10000
+    assert resolve_chunk_size("token") == DEFAULT_CHUNK_SIZES["token"]
+    assert 512 <= resolve_chunk_size("token") <= 1000
+    assert resolve_chunk_size("token", 300) == 300
+
+def test_token_chunks_are_capped_by_the_embedding_input_limit():
+    assert resolve_chunk_size("token", DEFAULT_EMBEDDING.max_input_tokens) == DEFAULT_EMBEDDING.max_input_tokens
+    with pytest.raises(ValueError, match="input limit"):
+        resolve_chunk_size("token", 10000)
+    # Characters are not tokens, the limit doesn't apply to the other chunkers
+    assert resolve_chunk_size("simple", 20000) == 20000
+
+def test_unknown_chunker_is_rejected():
+    with pytest.raises(ValueError, match="not found"):
+        resolve_chunk_size("paragraph")
+
+def test_token_chunker_defaults_to_its_own_chunk_size(offline_encoding):
+    chunker = create_chunker("token")
+    assert chunker.chunk_size == DEFAULT_CHUNK_SIZES["token"]
+    with pytest.raises(ValueError):
+        create_chunker("token", chunk_size=10000)
+
+def test_overlap_must_be_smaller_than_the_chunk_size():
+    assert resolve_chunk_size("token", 100, chunk_overlap=50) == 100
+    with pytest.raises(ValueError, match="overlap"):
+        resolve_chunk_size("token", 100, chunk_overlap=200)
+    with pytest.raises(ValueError, match="overlap"):
+        resolve_chunk_size("simple", 1000, chunk_overlap=1000)
+    # The default size applies when none is given
+    with pytest.raises(ValueError, match="overlap"):
+        resolve_chunk_size("token", chunk_overlap=DEFAULT_CHUNK_SIZES["token"])
+
+def test_routes_reject_an_overlap_not_smaller_than_the_chunk_size(workdir):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api.routers import chromaindexer_router, jobs_router
+    app = FastAPI()
+    app.include_router(chromaindexer_router.router)
+    app.include_router(jobs_router.router)
+    client = TestClient(app)
+    params = {"chunker": "token", "chunk_size": 100, "chunk_overlap": 200}
+
+    response = client.post("/chroma/collection/process_folder", params=params, json={"folder_path": str(workdir)})
+    assert response.status_code == 400 and "overlap" in response.json()["detail"]
+
+    response = client.post(
+        f"{jobs_router.router.prefix}/collection/process_folder", params=params, json={"folder_path": str(workdir)}
+    )
+    assert response.status_code == 400 and "overlap" in response.json()["detail"]
@@ -0,0 +1,80 @@
+import pytest
+
+from app.core.agents.langgraph.context_packer import ContextPacker
+from app.core.agents.langgraph.document_records import DocumentRecord
+
+# With the toy encoding every character of these texts is one token
+PAGE = " ".join(f"word{i:03d}" for i in range(40))
+
+
+@pytest.fixture(autouse=True)
+def toy_tokens(offline_encoding):
+    pass
+
+
+def chunk(id, text, score=None, doc_id="doc", page=1):
+    return DocumentRecord(id=id, text=text, score=score, metadata={"doc_id": doc_id, "page_number": page})
+
+
+def web(id, text, score=None):
+    return DocumentRecord(id=id, text=text, score=score, origin="websearch")
+
+
+def test_without_budget_every_passage_is_packed_most_relevant_first():
+    documents = [web("a", "unscored first"), web("b", "low", 0.2), web("c", "unscored second"), web("d", "high", 0.9)]
+
+    context = ContextPacker().pack(documents)
+
+    assert context.split("\n\n") == ["high", "low", "unscored first", "unscored second"]
+
+
+def test_overlapping_chunks_of_a_page_are_merged():
+    first, second = PAGE[:120], PAGE[90:240]
+
+    context = ContextPacker().pack([chunk("1", first, 0.9), chunk("2", second, 0.5)])
+
+    assert context == PAGE[:240]
+
+
+def test_a_chunk_bridging_two_passages_joins_them():
+    documents = [chunk("1", PAGE[:100], 0.9), chunk("3", PAGE[180:], 0.8), chunk("2", PAGE[70:210], 0.7)]
+
+    assert ContextPacker().pack(documents) == PAGE
+
+
+def test_contained_chunks_are_dropped():
+    assert ContextPacker().pack([chunk("1", PAGE, 0.9), chunk("2", PAGE[50:150], 0.5)]) == PAGE
+
+
+def test_chunks_of_other_pages_and_web_results_are_not_merged():
+    first, second = PAGE[:120], PAGE[90:240]
+    documents = [
+        chunk("1", first, 0.9),
+        chunk("2", second, 0.8, page=2),
+        chunk("3", second, 0.7, doc_id="other"),
+        web("4", second, 0.6)
+    ]
+
+    assert ContextPacker().pack(documents).split("\n\n") == [first, second, second, second]
+
+
+def test_passages_are_packed_while_they_fit_in_the_budget():
+    documents = [web("a", "a" * 40, 0.9), web("b", "b" * 50, 0.8), web("c", "c" * 10, 0.7)]
+
+    # 40 tokens, then b does not fit, then 2 separator tokens and 10 for c
+    context = ContextPacker(budget=60).pack(documents)
+
+    assert context == "a" * 40 + "\n\n" + "c" * 10
+
+
+def test_a_first_passage_larger_than_the_budget_is_truncated():
+    documents = [web("a", "a" * 100, 0.9), web("b", "b" * 10, 0.8)]
+
+    assert ContextPacker(budget=30).pack(documents) == "a" * 30
+
+
+def test_budget_counts_tokens_of_the_model_encoding():
+    packer = ContextPacker(budget=10)
+
+    assert packer.count_tokens("\n\n") == 2
+    assert packer.count_tokens(PAGE) == len(PAGE)
@@ -0,0 +1,51 @@
+from langchain_core.documents import Document
+from app.core.indexers.document_registry import DocumentRegistry, document_id
+from app.core.loaders.pdf_loader import add_file_metadata
+
+def registry(tmp_path, collection: str = "collection") -> DocumentRegistry:
+    return DocumentRegistry(collection, db_path=str(tmp_path / "documents.sqlite3"))
+
+def chunks(file_path: str):
+    pages = [
+        Document(page_content=f"text of page {page}", metadata={"source": file_path, "page": page, "start": 0})
+        for page in range(3)
+    ]
+    return add_file_metadata(pages, file_path)
+
+def test_compact_keeps_only_the_doc_id_and_chunk_metadata(tmp_path):
+    file_path = str(tmp_path / "report.pdf")
+    compacted = DocumentRegistry.compact(chunks(file_path))
+    assert [doc.metadata for doc in compacted] == [
+        {"page": page, "start": 0, "doc_id": document_id(file_path)} for page in range(3)
+    ]
+
+def test_join_restores_the_metadata_removed_by_compact(tmp_path):
+    documents = registry(tmp_path)
+    file_path = str(tmp_path / "report.pdf")
+    original = chunks(file_path)
+    documents.register(file_path, sha256="abc", title="Report", page_count=3)
+
+    joined = documents.join(DocumentRegistry.compact(chunks(file_path)))
+
+    for doc, original_doc in zip(joined, original):
+        assert doc.page_content == original_doc.page_content
+        assert doc.metadata == {**original_doc.metadata, "doc_id": document_id(file_path), "title": "Report"}
+
+def test_chunks_without_a_registered_document_are_left_unchanged(tmp_path):
+    documents = registry(tmp_path)
+    unregistered = DocumentRegistry.compact(chunks(str(tmp_path / "missing.pdf")))
+    plain = [Document(page_content="added directly", metadata={"source": "api"})]
+
+    assert documents.join([doc.model_copy(deep=True) for doc in unregistered]) == unregistered
+    assert DocumentRegistry.compact(plain) == plain
+    assert documents.join(plain) == [Document(page_content="added directly", metadata={"source": "api"})]
+
+def test_documents_are_kept_per_collection(tmp_path):
+    first, other = registry(tmp_path), registry(tmp_path, "other")
+    file_path = str(tmp_path / "report.pdf")
+    doc_id = first.register(file_path, sha256="abc", title="Report", page_count=3)
+
+    assert first.get(doc_id)["path"] == file_path
+    assert other.get(doc_id) is None
+    first.remove(doc_id)
+    assert first.list_documents() == []
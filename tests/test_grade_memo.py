@@ -0,0 +1,106 @@
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.core.agents.langgraph.complex_agent import grade_memo as grade_memo_module
+from app.core.agents.langgraph.complex_agent.grade_memo import MISSING, GradeMemo, prompt_version
+from app.core.config.default_config import DEFAULT_LLM
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def fake_clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(grade_memo_module.time, "time", clock)
+    return clock
+
+
+def test_outcomes_are_keyed_by_version_question_and_document():
+    memo = GradeMemo()
+    memo.put("v1", "question", "document", "yes")
+
+    assert memo.get("retrieval_grader", "v1", "question", "document") == "yes"
+    assert memo.get("retrieval_grader", "v2", "question", "document") is MISSING
+    assert memo.get("retrieval_grader", "v1", "other question", "document") is MISSING
+    assert memo.get("retrieval_grader", "v1", "question", "other document") is MISSING
+
+
+def test_putting_again_replaces_the_outcome():
+    memo = GradeMemo()
+    memo.put("v1", "question", "document", "no")
+    memo.put("v1", "question", "document", "yes")
+
+    assert memo.get("retrieval_grader", "v1", "question", "document") == "yes"
+    assert memo.stats()["entries"] == 1
+
+
+def test_falsy_outcomes_are_memoized():
+    memo = GradeMemo()
+    memo.put("v1", "question", "document", "")
+
+    assert memo.get("knowledge_extractor", "v1", "question", "document") == ""
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = fake_clock(monkeypatch)
+    memo = GradeMemo(ttl=60)
+    memo.put("v1", "question", "document", "yes")
+
+    clock.now += 60
+    assert memo.get("retrieval_grader", "v1", "question", "document") == "yes"
+    clock.now += 1
+    assert memo.get("retrieval_grader", "v1", "question", "document") is MISSING
+    assert memo.stats()["entries"] == 0
+
+
+def test_entries_without_ttl_never_expire(monkeypatch):
+    clock = fake_clock(monkeypatch)
+    memo = GradeMemo()
+    memo.put("v1", "question", "document", "yes")
+
+    clock.now += 365 * 24 * 3600
+    assert memo.get("retrieval_grader", "v1", "question", "document") == "yes"
+
+
+def test_least_recently_used_entries_are_evicted_beyond_max_size():
+    memo = GradeMemo(max_size=2)
+    memo.put("v1", "q", "a", "yes")
+    memo.put("v1", "q", "b", "yes")
+    # Reading a refreshes it, so b is the least recently used
+    memo.get("retrieval_grader", "v1", "q", "a")
+    memo.put("v1", "q", "c", "yes")
+
+    assert memo.get("retrieval_grader", "v1", "q", "a") == "yes"
+    assert memo.get("retrieval_grader", "v1", "q", "b") is MISSING
+    assert memo.get("retrieval_grader", "v1", "q", "c") == "yes"
+    assert memo.stats()["entries"] == 2
+
+
+def test_stats_count_saved_and_made_calls_per_grader():
+    memo = GradeMemo()
+    memo.put("v1", "q", "a", "yes")
+    memo.get("retrieval_grader", "v1", "q", "a")
+    memo.get("retrieval_grader", "v1", "q", "b")
+    memo.get("hallucination_grader", "v1", "q", "a")
+
+    assert memo.saved_calls == 2
+    assert memo.stats() == {
+        "entries": 1,
+        "saved_calls": {"retrieval_grader": 1, "hallucination_grader": 1},
+        "llm_calls": {"retrieval_grader": 1}
+    }
+
+
+def test_prompt_version_changes_with_the_prompt_and_the_model():
+    prompt = ChatPromptTemplate.from_messages([("human", "Is {document} relevant to {question}?")])
+    other_prompt = ChatPromptTemplate.from_messages([("human", "Does {document} answer {question}?")])
+    other_llm = DEFAULT_LLM.model_copy(update={"parameters": {"temperature": 0.0}})
+
+    version = prompt_version(prompt, DEFAULT_LLM)
+    assert version == prompt_version(prompt, DEFAULT_LLM)
+    assert version != prompt_version(other_prompt, DEFAULT_LLM)
+    assert version != prompt_version(prompt, other_llm)
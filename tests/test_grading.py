@@ -0,0 +1,223 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from app.core.agents.langgraph.complex_agent.grade_memo import GradeMemo
+from app.core.agents.langgraph.complex_agent.grading import (
+    agrade_documents,
+    agrade_hallucination,
+    grade_documents,
+    grade_hallucination
+)
+from app.core.agents.langgraph.document_records import DocumentRecord
+
+
+class FakeGrader:
+    """Retrieval grader finding relevant the documents whose text starts with 'relevant'"""
+
+    def __init__(self, hold_after=None):
+        self.graded = []
+        self._lock = threading.Lock()
+        # Sync grades past the first hold_after wait for release, as slow LLM calls would
+        self.hold_after = hold_after
+        self.release = threading.Event()
+
+    def _score(self, inputs):
+        with self._lock:
+            self.graded.append(inputs["document"])
+            held = self.hold_after is not None and len(self.graded) > self.hold_after
+        score = "yes" if inputs["document"].startswith("relevant") else "no"
+        return held, SimpleNamespace(binary_score=score)
+
+    def grade(self, inputs):
+        held, result = self._score(inputs)
+        if held:
+            self.release.wait(timeout=5)
+        return result
+
+    async def agrade(self, inputs):
+        await asyncio.sleep(0)
+        return self._score(inputs)[1]
+
+    def runnable(self):
+        return RunnableLambda(self.grade, afunc=self.agrade)
+
+
+def records(*texts, score=None):
+    return [DocumentRecord(id=f"doc-{i}", text=text, score=score) for i, text in enumerate(texts)]
+
+
+def run_grading(mode, grader, *args, **kwargs):
+    if mode == "sync":
+        return grade_documents(grader.runnable(), *args, **kwargs)
+    return asyncio.run(agrade_documents(grader.runnable(), *args, **kwargs))
+
+
+modes = pytest.mark.parametrize("mode", ["sync", "async"])
+
+
+@modes
+def test_keeps_relevant_documents_in_their_original_order(mode):
+    grader = FakeGrader()
+    documents = records("relevant a", "off topic", "relevant b", "off topic too", "relevant c")
+
+    relevant = run_grading(mode, grader, "q", documents, concurrency=3)
+
+    assert [doc.text for doc in relevant] == ["relevant a", "relevant b", "relevant c"]
+    assert len(grader.graded) == len(documents)
+
+
+@modes
+def test_stops_once_the_target_is_reached(mode):
+    grader = FakeGrader(hold_after=2)
+    documents = records(*[f"relevant {i}" for i in range(20)])
+
+    try:
+        relevant = run_grading(mode, grader, "q", documents, concurrency=1, target=2)
+    finally:
+        grader.release.set()
+
+    assert [doc.id for doc in relevant] == ["doc-0", "doc-1"]
+    # One grade may already be in flight when the target is reached
+    assert len(grader.graded) <= 3
+
+
+@modes
+def test_target_counts_only_relevant_grades(mode):
+    grader = FakeGrader()
+    documents = records("off topic", "off topic too", "relevant a", "relevant b", "relevant c")
+
+    relevant = run_grading(mode, grader, "q", documents, concurrency=1, target=2)
+
+    assert [doc.text for doc in relevant] == ["relevant a", "relevant b"]
+
+
+@modes
+def test_documents_above_the_score_threshold_are_not_graded(mode):
+    grader = FakeGrader()
+    documents = records("off topic", score=0.9) + [DocumentRecord(id="low", text="relevant", score=0.1)]
+
+    relevant = run_grading(mode, grader, "q", documents, score_threshold=0.8)
+
+    assert [doc.id for doc in relevant] == ["doc-0", "low"]
+    assert grader.graded == ["relevant"]
+
+
+@modes
+def test_no_grading_when_known_relevant_documents_reach_the_target(mode):
+    grader = FakeGrader()
+    documents = records("a", "b", score=0.9) + [DocumentRecord(id="unscored", text="relevant")]
+
+    relevant = run_grading(mode, grader, "q", documents, target=2, score_threshold=0.5)
+
+    assert [doc.id for doc in relevant] == ["doc-0", "doc-1"]
+    assert grader.graded == []
+
+
+@modes
+def test_memoized_grades_are_not_sent_again(mode):
+    grader = FakeGrader()
+    memo = GradeMemo()
+    documents = records("relevant a", "off topic")
+
+    first = run_grading(mode, grader, "q", documents, memo=memo, version="v1")
+    second = run_grading(mode, grader, "q", documents, memo=memo, version="v1")
+
+    assert [doc.id for doc in first] == [doc.id for doc in second] == ["doc-0"]
+    assert len(grader.graded) == 2
+    assert memo.stats()["saved_calls"] == {"retrieval_grader": 2}
+
+
+@modes
+def test_memo_is_keyed_by_question_and_version(mode):
+    grader = FakeGrader()
+    memo = GradeMemo()
+    documents = records("relevant a")
+
+    run_grading(mode, grader, "q", documents, memo=memo, version="v1")
+    run_grading(mode, grader, "other question", documents, memo=memo, version="v1")
+    run_grading(mode, grader, "q", documents, memo=memo, version="v2")
+
+    assert len(grader.graded) == 3
+
+
+@modes
+def test_grader_errors_propagate(mode):
+    def fail(inputs):
+        raise RuntimeError("grader down")
+
+    async def afail(inputs):
+        raise RuntimeError("grader down")
+
+    grader = FakeGrader()
+    grader.runnable = lambda: RunnableLambda(fail, afunc=afail)
+
+    with pytest.raises(RuntimeError, match="grader down"):
+        run_grading(mode, grader, "q", records("relevant a"))
+
+
+class FakeHallucinationGrader:
+    def __init__(self):
+        self.contexts = []
+
+    def grade(self, inputs):
+        self.contexts.append(inputs["documents"])
+        return SimpleNamespace(binary_score="yes")
+
+    async def agrade(self, inputs):
+        return self.grade(inputs)
+
+    def runnable(self):
+        return RunnableLambda(self.grade, afunc=self.agrade)
+
+
+@modes
+def test_hallucination_grades_are_memoized_by_generation_and_context(mode):
+    grader = FakeHallucinationGrader()
+    memo = GradeMemo()
+
+    def run(context, generation):
+        if mode == "sync":
+            return grade_hallucination(grader.runnable(), context, generation, memo=memo, version="v1")
+        return asyncio.run(agrade_hallucination(grader.runnable(), context, generation, memo=memo, version="v1"))
+
+    assert run("context", "answer") == "yes"
+    assert run("context", "answer") == "yes"
+    run("other context", "answer")
+    run("context", "other answer")
+
+    assert grader.contexts == ["context", "other context", "context"]
+
+
+@modes
+def test_answer_evaluation_grades_the_context_given_to_the_generation(mode, embeddings, offline_encoding):
+    from app.core.agents.langgraph.complex_agent.agent import LangComplexRAG
+    from app.core.agents.langgraph.complex_agent.state import GraphState
+
+    agent = LangComplexRAG()
+    agent.context_packer.budget = 30
+    grader = FakeHallucinationGrader()
+    agent.hallucination_grader = grader.runnable()
+    agent.answer_grader = RunnableLambda(lambda inputs: SimpleNamespace(binary_score="yes"))
+    state = GraphState(
+        question="q",
+        generation="answer",
+        documents=[
+            DocumentRecord(id="a", text="a" * 20, score=0.9),
+            DocumentRecord(id="b", text="b" * 20, score=0.8)
+        ]
+    )
+    node = agent.nodes["answer_evaluation_node"]
+    config = {"configurable": {"grade_memo": GradeMemo()}}
+
+    if mode == "sync":
+        outcome = node.invoke(state, config)
+    else:
+        outcome = asyncio.run(node.ainvoke(state, config))
+
+    assert outcome == "useful"
+    # Only the passages packed within the budget were given to the generation
+    assert grader.contexts == ["a" * 20] == [agent.context_packer.pack(state.documents)]
@@ -0,0 +1,59 @@
+from langchain_core.documents import Document
+from app.core.processors.header_footer import HeaderFooterStripper
+
+WORDS = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta", "iota", "kappa", "lambda", "mu"]
+
+def page(number: int, body: str) -> Document:
+    """A page with a running header, page-specific text at both edges and a page number footer"""
+    lines = [f"{body} {WORDS[(number + i) % len(WORDS)]}" for i in range(6)]
+    return Document(
+        page_content="\n".join(["ACME Corp Confidential Report", *lines, "", f"Page {number} of 12"]),
+        metadata={"page": number}
+    )
+
+def test_running_header_and_page_numbers_are_stripped():
+    pages = [page(number, f"Body of page {WORDS[number]}") for number in range(1, 7)]
+    stripper = HeaderFooterStripper()
+    stripped = list(stripper.strip(pages))
+
+    assert stripper.repeated == {"acme corp confidential report", "page # of #"}
+    assert stripper.stripped_lines == 12
+    for number, result in enumerate(stripped, start=1):
+        assert "ACME Corp" not in result.page_content
+        assert f"Page {number} of 12" not in result.page_content
+        assert result.page_content.startswith(f"Body of page {WORDS[number]}")
+        assert result.metadata["stripped_line_count"] == 2
+
+def test_lines_repeated_on_too_few_pages_are_kept():
+    pages = [
+        Document(page_content=f"{'Chapter heading' if number < 2 else WORDS[number]}\nbody {WORDS[number]}\nend {WORDS[number]}")
+        for number in range(6)
+    ]
+    stripper = HeaderFooterStripper()
+    result = list(stripper.strip(pages))
+    assert stripper.repeated == set()
+    assert [doc.page_content for doc in result] == [doc.page_content for doc in pages]
+
+def test_short_documents_are_left_untouched():
+    pages = [page(number, "same body") for number in range(1, 3)]
+    stripper = HeaderFooterStripper(min_pages=3)
+    result = list(stripper.strip(pages))
+    assert stripper.stripped_lines == 0
+    assert all("ACME Corp" in doc.page_content for doc in result)
+
+def test_lines_learned_from_the_sample_are_stripped_from_later_pages():
+    pages = [page(number, f"body {number}") for number in range(1, 11)]
+    stripper = HeaderFooterStripper(sample_pages=4)
+    result = list(stripper.strip(iter(pages)))
+    assert len(result) == 10
+    assert all("ACME Corp" not in doc.page_content for doc in result)
+
+def test_repeated_lines_inside_the_body_are_kept():
+    pages = [
+        Document(page_content=f"Header\nintro {w}\nline {w}\nACME Corp\nline b {w}\nline c {w}\nfooter {w}")
+        for w in WORDS[:5]
+    ]
+    stripper = HeaderFooterStripper(edge_lines=1)
+    result = list(stripper.strip(pages))
+    assert stripper.repeated == {"header"}
+    assert all("ACME Corp" in doc.page_content for doc in result)
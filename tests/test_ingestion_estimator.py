@@ -0,0 +1,33 @@
+import pytest
+from langchain_core.documents import Document
+from app.core.config.default_config import DEFAULT_EMBEDDING, INGESTION_ESTIMATE_ASSUMPTIONS
+from app.core.pipes.ingestion_estimator import IngestionEstimator, resolve_assumptions
+
+pytestmark = pytest.mark.usefixtures("offline_encoding")
+
+def chunks(count: int):
+    return [Document(page_content="x" * 100, metadata={"token_count": 25, "source_file": "a.pdf"}) for _ in range(count)]
+
+def test_report_lists_the_assumed_values():
+    estimator = IngestionEstimator(DEFAULT_EMBEDDING, index_batch_size=10)
+    estimator.add(chunks(25))
+    report = estimator.report(parse_seconds=1.0)
+    assert report["chunks"] == 25 and report["embedding_tokens"] == 625 and report["embedding_requests"] == 3
+    assert report["assumptions"] == INGESTION_ESTIMATE_ASSUMPTIONS
+    assert report["assumed"] == sorted(INGESTION_ESTIMATE_ASSUMPTIONS)
+
+def test_measured_values_replace_assumed_ones():
+    measured = {"embedding_request_seconds": 2.0, "embedding_tokens_per_second": 625}
+    estimator = IngestionEstimator(DEFAULT_EMBEDDING, index_batch_size=10, assumptions=measured)
+    estimator.add(chunks(25))
+    report = estimator.report(parse_seconds=1.0)
+    assert report["estimated_seconds"]["embed"] == 3 * 2.0 + 1.0
+    assert report["assumptions"]["embedding_tokens_per_second"] == 625
+    assert "embedding_tokens_per_second" not in report["assumed"]
+    assert "write_chunks_per_second" in report["assumed"]
+
+def test_invalid_assumptions_are_rejected():
+    with pytest.raises(ValueError, match="Unknown"):
+        resolve_assumptions({"gpu_count": 4})
+    with pytest.raises(ValueError, match="positive"):
+        resolve_assumptions({"write_chunks_per_second": 0})
@@ -0,0 +1,73 @@
+import os
+import sqlite3
+from app.core.indexers.manifest import IngestionManifest, FileFingerprint, file_sha256, parameters_hash
+from tests.conftest import make_pdf
+
+PAGES = ["\n".join(f"line {page} {i} of the report about manifests" for i in range(20)) for page in range(3)]
+
+def test_fingerprint_reuses_recorded_hash(workdir):
+    path = workdir / "a.txt"
+    path.write_bytes(b"content")
+    manifest = IngestionManifest("collection", db_path=str(workdir / "manifest.sqlite3"))
+    fingerprint = manifest.fingerprint(str(path))
+    assert fingerprint.sha256 == file_sha256(str(path))
+
+    entry = {"size": fingerprint.size, "mtime_ns": fingerprint.mtime_ns, "sha256": "recorded"}
+    assert manifest.fingerprint(str(path), entry).sha256 == "recorded"
+
+def test_unchanged_requires_same_content_and_parameters(workdir):
+    manifest = IngestionManifest("collection", db_path=str(workdir / "manifest.sqlite3"))
+    fingerprint = FileFingerprint(10, 1, "abc")
+    params = parameters_hash({"chunk_size": 1000, "chunker": "simple"})
+    manifest.record("a.pdf", fingerprint, ["1", "2"], params)
+
+    entry = manifest.get("a.pdf")
+    assert entry["chunk_ids"] == ["1", "2"]
+    assert manifest.is_unchanged(entry, fingerprint, params)
+    assert manifest.is_unchanged(entry, fingerprint, parameters_hash({"chunker": "simple", "chunk_size": 1000}))
+    assert not manifest.is_unchanged(entry, FileFingerprint(10, 1, "def"), params)
+    assert not manifest.is_unchanged(entry, fingerprint, parameters_hash({"chunk_size": 500, "chunker": "simple"}))
+    assert not manifest.is_unchanged(None, fingerprint, params)
+
+def test_manifest_without_parameters_column_is_migrated(workdir):
+    db_path = str(workdir / "manifest.sqlite3")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE manifest_files (collection TEXT NOT NULL, path TEXT NOT NULL, size INTEGER NOT NULL, "
+        "mtime_ns INTEGER NOT NULL, sha256 TEXT NOT NULL, chunk_ids TEXT NOT NULL, indexed_at REAL NOT NULL, "
+        "PRIMARY KEY (collection, path))"
+    )
+    conn.execute(
+        "INSERT INTO manifest_files VALUES (?, ?, 10, 1, 'abc', '[]', 0)",
+        ("collection", IngestionManifest.normalize_path("a.pdf"))
+    )
+    conn.commit()
+    conn.close()
+
+    manifest = IngestionManifest("collection", db_path=db_path)
+    entry = manifest.get("a.pdf")
+    assert entry["params_hash"] == ""
+    assert not manifest.is_unchanged(entry, FileFingerprint(10, 1, "abc"), parameters_hash({}))
+
+def test_folder_is_reindexed_when_chunking_parameters_change(embeddings, workdir):
+    from app.core.pipes.simple_index_pipeline import SimpleIndexChromaPipeline
+    folder = workdir / "pdfs"
+    folder.mkdir()
+    make_pdf(str(folder / "report.pdf"), PAGES)
+
+    first = SimpleIndexChromaPipeline("manifest_collection", chunk_size=400, chunk_overlap=0)
+    report = first.process_folder(str(folder))
+    assert report["files"] == 1 and report["chunks"] > 0
+    chunks = first.indexer.count_documents()
+
+    report = SimpleIndexChromaPipeline("manifest_collection", chunk_size=400, chunk_overlap=0).process_folder(str(folder))
+    assert report["unchanged_files"] == 1 and report["files"] == 0
+
+    rechunked = SimpleIndexChromaPipeline("manifest_collection", chunk_size=200, chunk_overlap=0)
+    report = rechunked.process_folder(str(folder))
+    assert report["unchanged_files"] == 0 and report["modified_files"] == 1
+    assert rechunked.indexer.count_documents() > chunks
+    assert len(rechunked.manifest.get(str(folder / "report.pdf"))["chunk_ids"]) == rechunked.indexer.count_documents()
+
+    report = SimpleIndexChromaPipeline("manifest_collection", chunk_size=200, chunk_overlap=0, strip_headers=False).process_folder(str(folder))
+    assert report["modified_files"] == 1
@@ -0,0 +1,117 @@
+import pytest
+from langchain_core.documents import Document
+from app.core.processors.near_duplicates import MinHasher, NearDuplicateIndex
+from tests.conftest import make_pdf
+
+TEXT = " ".join(f"term{i}" for i in range(200))
+NEAR_DUPLICATE = TEXT.replace("term100", "changed", 1)
+OTHER = " ".join(f"other{i}" for i in range(200))
+
+@pytest.fixture
+def index(tmp_path):
+    return NearDuplicateIndex("collection", db_path=str(tmp_path / "near_duplicates.sqlite3"))
+
+def test_signature_similarity_estimates_jaccard():
+    hasher = MinHasher()
+    assert hasher.similarity(hasher.signature(TEXT), hasher.signature(NEAR_DUPLICATE)) > 0.8
+    assert hasher.similarity(hasher.signature(TEXT), hasher.signature(OTHER)) < 0.2
+
+def test_filter_drops_near_duplicates_within_a_batch(index):
+    kept = index.filter([Document(page_content=TEXT), Document(page_content=NEAR_DUPLICATE), Document(page_content=OTHER)])
+    assert [doc.page_content for doc in kept] == [TEXT, OTHER]
+    assert all(doc.id for doc in kept)
+
+def test_registered_chunks_suppress_later_duplicates(index, tmp_path):
+    kept = index.filter([Document(page_content=TEXT)])
+    index.register([doc.id for doc in kept])
+
+    reopened = NearDuplicateIndex("collection", db_path=str(tmp_path / "near_duplicates.sqlite3"))
+    assert reopened.filter([Document(page_content=NEAR_DUPLICATE)]) == []
+    assert len(NearDuplicateIndex("other", db_path=reopened.db_path).filter([Document(page_content=TEXT)])) == 1
+
+    index.remove([kept[0].id])
+    assert len(index.filter([Document(page_content=NEAR_DUPLICATE)])) == 1
+
+def test_pending_chunks_are_not_persisted_until_registered(index, tmp_path):
+    kept = index.filter([Document(page_content=TEXT)])
+    # Pending chunks are matched by the same index, but not stored
+    assert index.filter([Document(page_content=NEAR_DUPLICATE)]) == []
+    reopened = NearDuplicateIndex("collection", db_path=str(tmp_path / "near_duplicates.sqlite3"))
+    assert len(reopened.filter([Document(page_content=TEXT)])) == 1
+
+    index.discard([kept[0].id])
+    assert len(index.filter([Document(page_content=NEAR_DUPLICATE)])) == 1
+    index.discard()
+    assert len(index.filter([Document(page_content=TEXT)])) == 1
+
+def test_failed_embedding_does_not_leave_signatures_behind(embeddings, workdir, monkeypatch):
+    from app.core.pipes.simple_index_pipeline import SimpleIndexChromaPipeline
+    folder = workdir / "pdfs"
+    folder.mkdir()
+    pages = ["\n".join(f"section {page} line {i} about duplicate detection" for i in range(20)) for page in range(3)]
+    make_pdf(str(folder / "report.pdf"), pages)
+
+    failing = SimpleIndexChromaPipeline("dedup_collection", chunk_size=300, chunk_overlap=0, deduplicate=True)
+
+    def fail(documents):
+        raise RuntimeError("embedding service unavailable")
+
+    monkeypatch.setattr(failing.indexer, "embed_documents", fail)
+    with pytest.raises(RuntimeError):
+        failing.process_folder(str(folder))
+    assert failing.indexer.count_documents() == 0
+
+    pipeline = SimpleIndexChromaPipeline("dedup_collection", chunk_size=300, chunk_overlap=0, deduplicate=True)
+    report = pipeline.process_folder(str(folder))
+    assert report["chunks"] > 0 and report["duplicate_chunks"] == 0
+    assert pipeline.indexer.count_documents() == report["chunks"]
+
+    # Once written, the same content in another file is suppressed
+    make_pdf(str(folder / "copy.pdf"), pages)
+    report = pipeline.process_folder(str(folder))
+    assert report["chunks"] == 0 and report["duplicate_chunks"] > 0
+
+def test_failed_write_discards_pending_signatures(embeddings, workdir, monkeypatch):
+    from app.core.pipes.simple_index_pipeline import SimpleIndexChromaPipeline
+    pipeline = SimpleIndexChromaPipeline("dedup_collection", deduplicate=True)
+    chunks = [Document(page_content=TEXT, metadata={"file_path": "a.pdf"})]
+
+    def fail(documents):
+        raise RuntimeError("write failed")
+
+    monkeypatch.setattr(pipeline.indexer, "add_documents", fail)
+    with pytest.raises(RuntimeError):
+        pipeline._flush(chunks, [])
+    monkeypatch.undo()
+
+    written = []
+    pipeline._flush([Document(page_content=NEAR_DUPLICATE, metadata={"file_path": "a.pdf"})], written)
+    assert len(written) == 1 and pipeline.duplicate_chunks == 0
+
+def test_failed_window_removes_the_windows_already_written(embeddings, workdir, monkeypatch):
+    from app.core.pipes.simple_index_pipeline import SimpleIndexChromaPipeline
+    path = str(workdir / "report.pdf")
+    pages = ["\n".join(f"window {page} line {i} about partial writes" for i in range(20)) for page in range(3)]
+    make_pdf(path, pages)
+    pipeline = SimpleIndexChromaPipeline(
+        "dedup_collection", chunk_size=300, chunk_overlap=0, deduplicate=True, strip_headers=False, page_window=1
+    )
+    add_documents = pipeline.indexer.add_documents
+    writes = []
+
+    def fail_on_second_window(documents):
+        writes.append(len(documents))
+        if len(writes) == 2:
+            raise RuntimeError("write failed")
+        add_documents(documents)
+
+    monkeypatch.setattr(pipeline.indexer, "add_documents", fail_on_second_window)
+    with pytest.raises(RuntimeError):
+        pipeline.process_pdf(path)
+    assert pipeline.indexer.count_documents() == 0
+    monkeypatch.undo()
+
+    # Neither written nor pending signatures of the failed file suppress its chunks
+    chunks = pipeline.process_pdf(path)
+    assert chunks and pipeline.duplicate_chunks == 0
+    assert pipeline.indexer.count_documents() == len(chunks)
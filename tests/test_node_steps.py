@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+
+from app.core.agents.langgraph.node_steps import call, invoke, step_node
+
+
+def traced(calls):
+    """Runnable doubling its input, recording whether it ran sync or async"""
+    def double(x):
+        calls.append("sync")
+        return 2 * x
+
+    async def adouble(x):
+        calls.append("async")
+        return 2 * x
+
+    return RunnableLambda(double, afunc=adouble)
+
+
+def failing(message):
+    def fail(*args, **kwargs):
+        raise RuntimeError(message)
+
+    async def afail(*args, **kwargs):
+        raise RuntimeError(message)
+
+    return fail, afail
+
+
+def test_calls_run_sync_under_invoke_and_awaited_under_ainvoke():
+    calls = []
+    runnable = traced(calls)
+
+    def steps(state):
+        first = yield invoke(runnable, state)
+        second = yield call(runnable.invoke, runnable.ainvoke, first)
+        return {"value": second}
+
+    node = step_node(steps)
+    assert node.invoke(1) == {"value": 4}
+    assert calls == ["sync", "sync"]
+
+    calls.clear()
+    assert asyncio.run(node.ainvoke(1)) == {"value": 4}
+    assert calls == ["async", "async"]
+
+
+def test_call_passes_positional_and_keyword_arguments():
+    def combine(a, b, *, scale):
+        return (a + b) * scale
+
+    async def acombine(a, b, *, scale):
+        return (a + b) * scale
+
+    def steps(state):
+        return (yield call(combine, acombine, state, 2, scale=10))
+
+    node = step_node(steps)
+    assert node.invoke(1) == 30
+    assert asyncio.run(node.ainvoke(1)) == 30
+
+
+def test_exceptions_of_calls_are_thrown_into_steps():
+    fail, afail = failing("search down")
+
+    def steps(state):
+        try:
+            yield call(fail, afail)
+        except RuntimeError as e:
+            return {"error": str(e)}
+        return {"error": None}
+
+    node = step_node(steps)
+    assert node.invoke("q") == {"error": "search down"}
+    assert asyncio.run(node.ainvoke("q")) == {"error": "search down"}
+
+
+def test_unhandled_exceptions_propagate():
+    fail, afail = failing("llm down")
+
+    def steps(state):
+        yield call(fail, afail)
+
+    node = step_node(steps)
+    with pytest.raises(RuntimeError, match="llm down"):
+        node.invoke("q")
+    with pytest.raises(RuntimeError, match="llm down"):
+        asyncio.run(node.ainvoke("q"))
+
+
+def test_steps_without_calls_return_directly():
+    def steps(state):
+        if state:
+            return "early"
+        yield
+
+    assert step_node(steps).invoke(True) == "early"
+
+
+def test_config_is_passed_to_steps_accepting_it():
+    seen = []
+
+    def steps(state, config: RunnableConfig):
+        seen.append(config["configurable"]["memo"])
+        return (yield call(lambda: state, lambda: asyncio.sleep(0, state)))
+
+    node = step_node(steps)
+    assert node.invoke("q", {"configurable": {"memo": "sync memo"}}) == "q"
+    assert asyncio.run(node.ainvoke("q", {"configurable": {"memo": "async memo"}})) == "q"
+    assert seen == ["sync memo", "async memo"]
+
+
+def test_steps_can_delegate_to_other_steps():
+    calls = []
+    runnable = traced(calls)
+
+    def inner(state):
+        return (yield invoke(runnable, state))
+
+    def outer(state):
+        if state > 10:
+            return "big"
+        return (yield from inner(state))
+
+    node = step_node(outer)
+    assert node.invoke(3) == 6
+    assert node.invoke(11) == "big"
+    assert asyncio.run(node.ainvoke(3)) == 6
+    assert calls == ["sync", "async"]
+
+
+def test_node_is_named_after_its_steps():
+    def retriever_node(state):
+        yield
+
+    assert step_node(retriever_node).name == "retriever_node"
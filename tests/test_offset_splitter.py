@@ -0,0 +1,36 @@
+import random
+import pytest
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from app.core.chunkers.offset_splitter import OffsetTextSplitter
+from benchmarks.chunker_benchmark import CONFIGS, synthetic_text
+
+def fuzz_texts(count: int, seed: int = 1):
+    """Small random texts drawn from an alphabet rich in separators and whitespace"""
+    rng = random.Random(seed)
+    alphabet = ["a", "b", "c", " ", " ", "\n", "\n\n", "\t", "  "]
+    return ["".join(rng.choices(alphabet, k=rng.randint(0, 400))) for _ in range(count)]
+
+@pytest.mark.parametrize("chunk_size, chunk_overlap", CONFIGS + [(7, 3), (3, 0), (1, 0)])
+def test_same_chunks_as_recursive_splitter_on_fuzzed_texts(chunk_size, chunk_overlap):
+    reference = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    candidate = OffsetTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    for text in fuzz_texts(300):
+        assert candidate.split_text(text) == reference.split_text(text), repr(text)
+
+@pytest.mark.parametrize("chunk_size, chunk_overlap", CONFIGS)
+def test_same_chunks_as_recursive_splitter_on_page_like_text(chunk_size, chunk_overlap):
+    text = synthetic_text(200000)
+    reference = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    candidate = OffsetTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    assert candidate.split_text(text) == reference.split_text(text)
+
+def test_spans_slice_the_chunks_out_of_the_text():
+    text = synthetic_text(20000, seed=3)
+    splitter = OffsetTextSplitter(chunk_size=500, chunk_overlap=100)
+    spans = splitter.split_spans(text)
+    assert [text[start:end] for start, end in spans] == splitter.split_text(text)
+    assert all(start < end for start, end in spans)
+
+def test_overlap_larger_than_chunk_size_is_rejected():
+    with pytest.raises(ValueError):
+        OffsetTextSplitter(chunk_size=10, chunk_overlap=20)
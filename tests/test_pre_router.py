@@ -0,0 +1,219 @@
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import RunnableLambda
+
+from app.core.agents.langgraph.complex_agent import agent as agent_module
+from app.core.agents.langgraph.complex_agent import pre_router as pre_router_module
+from app.core.agents.langgraph.complex_agent.pre_router import PreRouter, RouteDecision, RoutingLog
+from app.core.config.schemas import AgentConfig, RetrieverConfig
+from app.core.config.default_config import DEFAULT_COMPLEX_AGENT_CONFIG
+from app.core.indexers.chroma_indexer import ChromaIndexer
+
+KEYWORDS = ["paper", "news", "poem", "quantum"]
+
+EXEMPLARS = {
+    "vectorstore": ["the paper"],
+    "websearch": ["the news"],
+    "QA_LM": ["a poem"]
+}
+
+
+class KeywordEmbeddings(Embeddings):
+    """Embeddings counting keywords, texts without any point along a separate axis"""
+
+    def __init__(self):
+        self.queries = 0
+
+    def _embed(self, text: str) -> List[float]:
+        words = text.lower().split()
+        counts = [float(sum(word.strip("?!.,") == keyword for word in words)) for keyword in KEYWORDS]
+        return counts + [0.0 if any(counts) else 1.0]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.queries += 1
+        return self._embed(text)
+
+
+@pytest.fixture
+def keyword_embeddings(embeddings, monkeypatch):
+    from app.core.indexers.chroma_indexer import chroma_db
+    fake = KeywordEmbeddings()
+    monkeypatch.setattr(chroma_db, "embedding_function", fake)
+    return fake
+
+
+@pytest.fixture
+def indexer(keyword_embeddings):
+    return ChromaIndexer(RetrieverConfig(collection_name="pre_router_test"))
+
+
+def router(indexer, **kwargs):
+    return PreRouter(indexer, exemplars=EXEMPLARS, **kwargs)
+
+
+@pytest.mark.parametrize("question, route", [
+    ("What's the weather today in Paris?", "websearch"),
+    ("Any breaking news about OpenAI?", "websearch"),
+    ("Latest stock price of the paper company", "websearch"),
+    ("What is the current exchange rate of the euro?", "websearch"),
+    ("Hello!", "QA_LM"),
+    ("thank you so much", "QA_LM"),
+    ("12 * 7 = ?", "QA_LM")
+])
+def test_lexical_rules_route_without_embedding(indexer, keyword_embeddings, question, route):
+    decision = router(indexer).route(question)
+
+    assert (decision.route, decision.source) == (route, "rule")
+    assert keyword_embeddings.queries == 0
+
+
+@pytest.mark.parametrize("question", [
+    "What were the 2019-2021 results in the report?",
+    "What does section 3 say about today's approach to transformers?",
+    "Summarize the forecast model described in the paper",
+    "How does the weather in the dataset affect the results?",
+    "What does the report say about exchange rate risk?",
+    "Which stock price model is used in chapter 2?"
+])
+def test_questions_about_documents_are_not_routed_by_rules(question):
+    assert PreRouter._rule_decision(question) is None
+
+
+@pytest.mark.parametrize("question, route", [
+    ("What does the paper propose?", "vectorstore"),
+    ("Any news?", "websearch"),
+    ("Write me a poem", "QA_LM")
+])
+def test_confident_embedding_decisions_are_routed_locally(indexer, question, route):
+    decision = router(indexer).route(question)
+
+    assert decision == RouteDecision(route=route, guess=route, source="embedding", score=1.0, margin=1.0)
+
+
+def test_ambiguous_questions_are_left_to_the_llm(indexer):
+    decision = router(indexer).route("paper or news")
+
+    assert decision.route is None
+    assert decision.source == "fallback"
+    assert decision.guess in ("vectorstore", "websearch")
+    assert decision.margin == 0.0
+
+
+def test_questions_unlike_every_route_are_left_to_the_llm(indexer):
+    decision = router(indexer).route("something else entirely")
+
+    assert decision.route is None and decision.source == "fallback"
+    assert decision.score == 0.0
+
+
+def test_thresholds_decide_confidence(indexer):
+    # paper paper news: 0.894 for vectorstore, 0.447 for websearch
+    question = "paper paper news"
+
+    assert router(indexer).route(question).route == "vectorstore"
+    assert router(indexer, min_similarity=0.9).route(question).route is None
+    assert router(indexer, min_margin=0.5).route(question).route is None
+
+
+def test_chunks_of_the_collection_count_for_the_vectorstore_route(indexer):
+    question = "explain quantum entanglement"
+    assert router(indexer).route(question).route is None
+
+    indexer.add_documents([Document(page_content="quantum states")])
+
+    decision = router(indexer).route(question)
+    assert (decision.route, decision.source) == ("vectorstore", "embedding")
+
+
+def test_embedding_errors_fall_back_to_the_llm(indexer, keyword_embeddings, monkeypatch):
+    def fail(text):
+        raise RuntimeError("embeddings down")
+
+    monkeypatch.setattr(keyword_embeddings, "embed_query", fail)
+
+    assert router(indexer).route("What does the paper propose?") == RouteDecision(source="fallback")
+
+
+def test_async_routing_matches_sync_routing(indexer):
+    pre_router = router(indexer)
+    for question in ["Hello!", "What does the paper propose?", "paper or news", "nothing"]:
+        assert asyncio.run(pre_router.aroute(question)) == pre_router.route(question)
+
+
+def test_audit_rate(indexer):
+    assert not router(indexer, audit_rate=0.0).should_audit()
+    assert router(indexer, audit_rate=1.0).should_audit()
+
+
+def test_routing_log_stats(tmp_path):
+    log = RoutingLog(str(tmp_path / "pre_router.sqlite3"))
+    local = RouteDecision(route="vectorstore", guess="vectorstore", source="embedding", score=0.9, margin=0.3)
+    fallback = RouteDecision(guess="websearch", source="fallback", score=0.4, margin=0.01)
+
+    log.record("q1", local)
+    log.record("q2", local, llm_route="vectorstore")
+    log.record("q3", local, llm_route="QA_LM")
+    log.record("q4", fallback, llm_route="websearch")
+
+    assert log.stats() == {
+        "decisions": 4,
+        "llm_calls_saved": 1,
+        "routes": {
+            "vectorstore": {"embedding": {"decisions": 3, "checked_by_llm": 2, "agreed": 1, "accuracy": 0.5}},
+            "websearch": {"fallback": {"decisions": 1, "checked_by_llm": 1, "agreed": 1, "accuracy": 1.0}}
+        }
+    }
+
+    log.clear()
+    assert log.stats() == {"decisions": 0, "llm_calls_saved": 0, "routes": {}}
+
+
+def test_routing_log_keeps_the_most_recent_decisions(tmp_path, monkeypatch):
+    monkeypatch.setattr(RoutingLog, "TRIM_INTERVAL", 2)
+    log = RoutingLog(str(tmp_path / "pre_router.sqlite3"), max_entries=3)
+    decision = RouteDecision(route="QA_LM", guess="QA_LM", source="rule", score=1.0)
+
+    for i in range(6):
+        log.record(f"q{i}", decision)
+
+    assert log.stats()["decisions"] == 3
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_agent_calls_the_llm_router_only_for_fallbacks(mode, indexer, tmp_path, monkeypatch):
+    from app.core.agents.langgraph.complex_agent.state import GraphState
+
+    log = RoutingLog(str(tmp_path / "pre_router.sqlite3"))
+    monkeypatch.setattr(agent_module, "get_routing_log", lambda: log)
+    monkeypatch.setattr(pre_router_module, "PRE_ROUTER_EXEMPLARS", EXEMPLARS)
+    config = AgentConfig.model_validate({
+        **DEFAULT_COMPLEX_AGENT_CONFIG.model_dump(),
+        "retriever": {"collection_name": "pre_router_test"},
+        "agent_parameters": {"pre_router": True, "pre_router_audit_rate": 0.0}
+    })
+    agent = agent_module.LangComplexRAG(config)
+    llm_questions = []
+
+    def llm_route(question):
+        llm_questions.append(question)
+        return SimpleNamespace(route="websearch")
+
+    agent.question_router = RunnableLambda(llm_route)
+    node = agent.nodes["session_route_node"]
+
+    def route(question):
+        state = GraphState(question=question)
+        return node.invoke(state) if mode == "sync" else asyncio.run(node.ainvoke(state))
+
+    assert route("What does the paper propose?") == "vectorstore"
+    assert route("paper or news") == "websearch"
+    assert llm_questions == ["paper or news"]
+    assert log.stats()["llm_calls_saved"] == 1
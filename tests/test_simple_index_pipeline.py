@@ -0,0 +1,20 @@
+import os
+from app.core.pipes import simple_index_pipeline
+from app.core.pipes.simple_index_pipeline import SimpleIndexChromaPipeline, available_cpus
+
+def test_available_cpus_follow_the_affinity_of_the_process(monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1}, raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 64)
+    assert available_cpus() == 2
+
+def test_available_cpus_fall_back_to_the_cpu_count(monkeypatch):
+    monkeypatch.delattr(os, "sched_getaffinity", raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    assert available_cpus() == 8
+    monkeypatch.setattr(os, "cpu_count", lambda: None)
+    assert available_cpus() == 1
+
+def test_worker_pool_defaults_to_the_available_cpus(embeddings, monkeypatch):
+    monkeypatch.setattr(simple_index_pipeline, "available_cpus", lambda: 3)
+    assert SimpleIndexChromaPipeline("pipeline_collection").max_workers == 3
+    assert SimpleIndexChromaPipeline("pipeline_collection", max_workers=5).max_workers == 5
@@ -0,0 +1,45 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from app.api.uploads import save_upload, upload_filename
+
+
+def upload(filename, content=b"%PDF-1.4"):
+    return UploadFile(io.BytesIO(content), filename=filename)
+
+
+def test_upload_filename_is_the_basename_of_a_pdf():
+    assert upload_filename(upload("dir/report.pdf")) == "report.pdf"
+
+
+def test_uploads_are_saved_under_their_basename(tmp_path):
+    file_path, _ = asyncio.run(save_upload(upload("../../etc/report.PDF"), str(tmp_path)))
+
+    assert file_path == str(tmp_path / "report.PDF")
+    assert (tmp_path / "report.PDF").read_bytes() == b"%PDF-1.4"
+
+
+@pytest.mark.parametrize("filename", ["", None, "uploads/", "notes.txt", "report.pdf.exe"])
+def test_uploads_without_a_pdf_file_name_are_rejected_before_writing(tmp_path, filename):
+    with pytest.raises(ValueError):
+        asyncio.run(save_upload(upload(filename), str(tmp_path)))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_routes_reject_uploads_without_a_pdf_file_name(workdir):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api.routers import chromaindexer_router, jobs_router
+    app = FastAPI()
+    app.include_router(chromaindexer_router.router)
+    app.include_router(jobs_router.router)
+    client = TestClient(app)
+
+    for path in ["/chroma/collection/process_pdfs", f"{jobs_router.router.prefix}/collection/process_pdfs"]:
+        for filename in ["uploads/", "notes.txt"]:
+            response = client.post(path, files={"files": (filename, b"text", "application/octet-stream")})
+            assert response.status_code == 400
@@ -21,6 +21,11 @@ INDEX_ENDPOINTS = {
     "process_folder": f"{API_BASE_URL}/chroma",  # /{collection_name}/process_folder
 }
 
+# Background ingestion job endpoints
+JOB_ENDPOINTS = {
+    "jobs": f"{API_BASE_URL}/jobs",  # /{collection_name}/process_pdfs, /{job_id}, /{job_id}/cancel
+}
+
 # Google Drive endpoints
 GDRIVE_ENDPOINTS = {
     "authorize": f"{API_BASE_URL}/gdrive/authorize",
@@ -13,10 +13,12 @@ logger = logging.getLogger(__name__)
 # Add the parent directory to sys.path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from utils.api import ChromaIndexClient, GDriveClient
+from utils.api import ChromaIndexClient, GDriveClient, JobClient
 from utils.file_utils import FileManager
 from components.status import show_status_message, show_operation_status
-from config import INDEX_ENDPOINTS, GDRIVE_ENDPOINTS
+from config import INDEX_ENDPOINTS, GDRIVE_ENDPOINTS, JOB_ENDPOINTS
+
+JOB_POLL_INTERVAL = 2
 
 def init_page():
     st.set_page_config(
@@ -34,8 +36,9 @@ def init_page():
     # Initialize API clients
     index_client = ChromaIndexClient(INDEX_ENDPOINTS)
     gdrive_client = GDriveClient(GDRIVE_ENDPOINTS)
+    job_client = JobClient(JOB_ENDPOINTS)
     
-    return index_client, gdrive_client
+    return index_client, gdrive_client, job_client
 
 def check_drive_auth():
     """Check if already authorized with Google Drive"""
@@ -168,7 +171,7 @@ def render_available_documents():
     
     return selected_files
 
-def render_document_processing(client: ChromaIndexClient):
+def render_document_processing(client: ChromaIndexClient, job_client: JobClient):
     """Render document processing section with chunking options"""
     st.header("Document Processing")
     
@@ -187,26 +190,56 @@ def render_document_processing(client: ChromaIndexClient):
     
     # Chunking parameters
     with st.expander("Chunking Configuration", expanded=False):
-        chunk_size = st.slider(
-            "Chunk Size",
-            min_value=100,
-            max_value=20000,
-            value=10000,
-            step=1000,
-            help="Size of document chunks. Larger values mean longer but fewer chunks"
+        chunker = st.selectbox(
+            "Chunker",
+            options=["simple", "token", "semantic"],
+            help="""
+            - simple: Chunk size and overlap are measured in characters
+            - token: Chunk size and overlap are measured in tokens
+            - semantic: Cuts where the topic shifts between sentences, chunk size caps the characters per chunk
+            """
         )
         
+        if chunker == "token":
+            # Token chunks must fit the input limit of the embedding model (8191 tokens)
+            chunk_size = st.slider(
+                "Chunk Size (tokens)",
+                min_value=100,
+                max_value=8000,
+                value=800,
+                step=100,
+                key="token_chunk_size",
+                help="Size of document chunks in tokens. 500 to 1000 suits most retrievals"
+            )
+        else:
+            chunk_size = st.slider(
+                "Chunk Size",
+                min_value=100,
+                max_value=20000,
+                value=10000,
+                step=1000,
+                help="Size of document chunks. Larger values mean longer but fewer chunks"
+            )
+        
+        # The overlap must stay below the chunk size, at most half of it here
+        max_overlap = min(2000, chunk_size // 2)
         chunk_overlap = st.slider(
             "Chunk Overlap",
             min_value=0,
-            max_value=2000,
-            value=200,
-            step=100,
-            help="Number of characters to overlap between chunks. Helps maintain context"
+            max_value=max_overlap,
+            value=min(200, max_overlap),
+            step=50,
+            help="Overlap between chunks, in the unit of the chunk size. Helps maintain context"
+        )
+        
+        deduplicate = st.checkbox(
+            "Skip near-duplicate chunks",
+            value=False,
+            help="Don't index chunks nearly identical to chunks already in the collection, e.g. repeated disclaimers"
         )
         
         st.info("""
-        Chunk size recommendations:
+        Chunk size recommendations (characters, 500 to 1000 tokens for the token chunker):
         - 10000: Good for general purpose use
         - 4000: Better for precise retrievals
         - 1000 and less: Best for very specific queries
@@ -217,6 +250,9 @@ def render_document_processing(client: ChromaIndexClient):
         - 1000: Maximum context preservation
         """)
     
+    if "ingestion_job_id" in st.session_state:
+        render_ingestion_job(job_client, st.session_state.ingestion_job_id)
+    
     selected_files = render_available_documents()
     
     if selected_files:
@@ -226,27 +262,73 @@ def render_document_processing(client: ChromaIndexClient):
             st.write(f"Selected {num_selected} document{'s' if num_selected > 1 else ''} for processing")
             col1, col2 = st.columns([1, 4])
             with col1:
-                if st.button("Process Files", type="primary"):
+                if st.button("Process Files", type="primary", disabled="ingestion_job_id" in st.session_state):
                     try:
-                        with st.spinner(f"Processing {num_selected} files..."):
-                            logger.info(f"Starting to process {num_selected} files for collection {collection_name}")
-                            response = client.process_pdfs(
-                                collection_name,
-                                selected_files,
-                                chunk_size=chunk_size,
-                                chunk_overlap=chunk_overlap
-                            )
-                            if response.get("message"):
-                                show_operation_status(response["message"])
-                                st.success(f"Chunking config used: Size={chunk_size}, Overlap={chunk_overlap}")
-                            time.sleep(1)
-                            st.rerun()
+                        logger.info(f"Submitting {num_selected} files for collection {collection_name}")
+                        response = job_client.submit_pdfs(
+                            collection_name,
+                            selected_files,
+                            chunk_size=chunk_size,
+                            chunk_overlap=chunk_overlap,
+                            chunker=chunker,
+                            deduplicate=deduplicate
+                        )
+                        st.session_state.ingestion_job_id = response["job_id"]
+                        st.rerun()
                     except Exception as e:
-                        logger.error(f"Error processing files: {str(e)}", exc_info=True)
-                        show_status_message(f"Error processing files: {str(e)}", type="error")
+                        logger.error(f"Error submitting files: {str(e)}", exc_info=True)
+                        show_status_message(f"Error submitting files: {str(e)}", type="error")
     else:
         st.info("Select documents to process from the list above")
 
+def render_ingestion_job(job_client: JobClient, job_id: str):
+    """Render the progress of a background ingestion job, polling until it finishes"""
+    try:
+        job = job_client.get_job(job_id)
+    except Exception as e:
+        show_status_message(f"Error fetching job status: {str(e)}", type="error")
+        del st.session_state.ingestion_job_id
+        return
+    
+    status = job["status"]
+    total = job.get("total_files") or 0
+    processed = job.get("processed_files", 0)
+    
+    st.subheader("Ingestion Job")
+    progress_text = f"{processed}/{total} files" if total else f"{processed} files"
+    if job.get("current_file") and status == "running":
+        progress_text += f" - {job['current_file']}"
+    st.progress(min(processed / total, 1.0) if total else 0.0, text=progress_text)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Status", status)
+    col2.metric("Pages/s", job.get("pages_per_second") or 0)
+    col3.metric("Chunks", job.get("chunks", 0))
+    col4.metric("ETA (s)", job["eta_seconds"] if job.get("eta_seconds") is not None else "-")
+    
+    for file_path, error in job.get("failed_files") or []:
+        st.warning(f"Failed: {os.path.basename(file_path)} - {error}")
+    
+    if status in ("queued", "running"):
+        if st.button("Cancel Job", key=f"cancel_{job_id}"):
+            try:
+                job_client.cancel_job(job_id)
+            except Exception as e:
+                show_status_message(f"Error cancelling job: {str(e)}", type="error")
+        time.sleep(JOB_POLL_INTERVAL)
+        st.rerun()
+    
+    if status == "completed":
+        show_operation_status(f"Processed {processed} files into {job.get('chunks', 0)} chunks")
+    elif status == "failed":
+        show_status_message(f"Ingestion job failed: {job.get('error')}", type="error")
+    elif status == "cancelled":
+        st.info(f"Ingestion job cancelled after {processed} files")
+    
+    if st.button("Dismiss", key=f"dismiss_{job_id}"):
+        del st.session_state.ingestion_job_id
+        st.rerun()
+
 def render_collection_documents(client: ChromaIndexClient, collection_name: str):
     """Render documents in collection with search configuration"""
     try:
@@ -424,14 +506,14 @@ def render_document_results(results: List[Dict[str, Any]], context: str = "overv
                     st.text(chunk.get('page_content', ''))
 
 def main():
-    index_client, gdrive_client = init_page()
+    index_client, gdrive_client, job_client = init_page()
     
     # Main sections
     render_gdrive_section(gdrive_client)
     st.divider()
     render_local_upload()
     st.divider()
-    render_document_processing(index_client)
+    render_document_processing(index_client, job_client)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
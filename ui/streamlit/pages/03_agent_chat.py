@@ -5,6 +5,7 @@ import time
 import logging
 from typing import Dict, Any, Generator, Optional
 import json
+import uuid
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +28,9 @@ class ChatUI:
         """Initialize session state variables"""
         if "messages" not in st.session_state:
             st.session_state.messages = []
+        if "session_id" not in st.session_state:
+            # Follow-up questions of the chat continue the agent session
+            st.session_state.session_id = str(uuid.uuid4())
         if "current_collection" not in st.session_state:
             st.session_state.current_collection = None
         if "agent_config" not in st.session_state:
@@ -187,10 +191,32 @@ class ChatUI:
                         value=50,
                         help="Maximum number of state transitions in the agent"
                     )
+                    grading_concurrency = st.slider(
+                        "Grading Concurrency",
+                        min_value=1,
+                        max_value=16,
+                        value=8,
+                        help="Maximum number of documents graded at the same time"
+                    )
+                    relevant_documents_target = st.slider(
+                        "Relevant Documents Target",
+                        min_value=0,
+                        max_value=10,
+                        value=0,
+                        help="Stop grading once this many documents are relevant (0 grades every document)"
+                    )
+                    pre_router = st.checkbox(
+                        "Local Pre-Router",
+                        value=False,
+                        help="Route confidently classified questions without calling the LLM router"
+                    )
                     agent_parameters.update({
                         "max_retrievals": max_retrievals,
                         "max_generations": max_generations,
-                        "recursion_limit": recursion_limit
+                        "recursion_limit": recursion_limit,
+                        "grading_concurrency": grading_concurrency,
+                        "relevant_documents_target": relevant_documents_target or None,
+                        "pre_router": pre_router
                     })
                 
                 # Update agent configuration
@@ -240,6 +266,40 @@ class ChatUI:
             logger.error(f"Error handling non-streaming response: {str(e)}", exc_info=True)
             st.error(f"Error processing response: {str(e)}")
     
+    def handle_streaming_response(self, response: AgentResponse) -> None:
+        """Render the answer token by token while showing the progress of the agent nodes"""
+        status = st.status("Running agent...")
+        placeholder = st.empty()
+        answer = ""
+        ttft = None
+        for event in response.iterate():
+            kind = event.get("event")
+            if "error" in event:
+                status.update(label="Agent failed", state="error")
+                st.error(f"Error getting response from agent: {event['error']}")
+                return
+            if kind == "node":
+                status.write(f"{event['node']} ({event['elapsed']:.1f}s)")
+            elif kind == "answer_start":
+                # A new attempt replaces the answer rejected by the graders
+                answer = ""
+                placeholder.empty()
+            elif kind == "token":
+                ttft = event.get("ttft", ttft)
+                answer += event["content"]
+                placeholder.markdown(answer + "▌")
+            elif kind == "end":
+                answer = event.get("answer") or answer
+                status.update(
+                    label=f"First token in {ttft or 0:.1f}s, answered in {event['elapsed']:.1f}s",
+                    state="complete"
+                )
+        if answer:
+            placeholder.markdown(answer)
+            st.session_state.messages.append({"role": "assistant", "content": answer})
+        else:
+            st.error("No valid response received from agent")
+
     def handle_user_input(self):
         """Handle user input and agent interaction"""
         if prompt := st.chat_input("Your question"):
@@ -254,14 +314,27 @@ class ChatUI:
             with st.chat_message("assistant"):
                 try:
                     agent_type = "simple" if "Complex RAG" not in st.session_state.get("agent_config", {}).get("agent_parameters", {}) else "complex"
-                    streaming = False  # Temporarily disable streaming
+                    streaming = st.session_state.streaming_enabled
+                    
+                    if streaming:
+                        response = self.agent_client.query_agent(
+                            agent_type=agent_type,
+                            question=prompt,
+                            config=st.session_state.agent_config,
+                            stream=True,
+                            stream_mode="tokens",
+                            session_id=st.session_state.session_id
+                        )
+                        self.handle_streaming_response(response)
+                        return
                     
                     with st.spinner("Generating response..."):
                         response = self.agent_client.query_agent(
                             agent_type=agent_type,
                             question=prompt,
                             config=st.session_state.agent_config,
-                            stream=streaming
+                            stream=streaming,
+                            session_id=st.session_state.session_id
                         )
                         
                         answer = response.get("answer")
@@ -295,7 +368,12 @@ class ChatUI:
         
         # Clear chat button
         if st.button("Clear Chat"):
+            try:
+                self.agent_client.delete_session(st.session_state.session_id)
+            except Exception as e:
+                logger.error(f"Error deleting session: {str(e)}")
             st.session_state.messages = []
+            st.session_state.session_id = str(uuid.uuid4())
             st.rerun()
             
         # Show chat interface
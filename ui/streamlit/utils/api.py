@@ -15,6 +15,7 @@ class APIClient:
         url: str,
         json: Optional[Dict[str, Any]] = None,
         files: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
         raise_for_status: bool = True
     ) -> Dict[str, Any]:
         """Make a request to the API endpoint."""
@@ -28,7 +29,8 @@ class APIClient:
                 method=method,
                 url=url,
                 json=json,
-                files=files
+                files=files,
+                params=params
             )
             
             # Debug print response
@@ -85,7 +87,7 @@ class ChromaIndexClient:
         self, 
         collection_name: str, 
         file_paths: List[str],
-        chunk_size: int = 10000,
+        chunk_size: Optional[int] = None,
         chunk_overlap: int = 200
     ) -> Dict[str, Any]:
         """Process PDF files and add to collection"""
@@ -169,7 +171,7 @@ class ChromaIndexClient:
         self, 
         collection_name: str, 
         folder_path: str,
-        chunk_size: int = 10000,
+        chunk_size: Optional[int] = None,
         chunk_overlap: int = 200
     ) -> Dict[str, Any]:
         """Process folder of PDFs with chunking parameters"""
@@ -205,6 +207,77 @@ class ChromaIndexClient:
         url = f"{self.endpoints['update_document']}/{collection_name}/documents/{document_id}"
         return APIClient.make_request("PUT", url, json=document)
 
+class JobClient:
+    """Client for background ingestion jobs"""
+    
+    def __init__(self, endpoints: Dict[str, str]):
+        self.endpoints = endpoints
+    
+    def submit_pdfs(
+        self,
+        collection_name: str,
+        file_paths: List[str],
+        chunk_size: Optional[int] = None,
+        chunk_overlap: int = 200,
+        chunker: str = "simple",
+        deduplicate: bool = False
+    ) -> Dict[str, Any]:
+        """Submit a job indexing PDF files. Returns the job id without waiting"""
+        url = f"{self.endpoints['jobs']}/{collection_name}/process_pdfs"
+        
+        with ExitStack() as stack:
+            files = []
+            for file_path in file_paths:
+                abs_path = os.path.abspath(file_path)
+                if os.path.exists(abs_path) and abs_path.lower().endswith('.pdf'):
+                    f = stack.enter_context(open(abs_path, 'rb'))
+                    files.append(('files', (os.path.basename(abs_path), f, 'application/pdf')))
+                else:
+                    logger.warning(f"Skipping invalid file: {file_path}")
+            
+            if not files:
+                raise ValueError("No valid PDF files to process")
+            
+            params = {
+                "chunk_size": chunk_size,
+                "chunk_overlap": chunk_overlap,
+                "chunker": chunker,
+                "deduplicate": deduplicate
+            }
+            return APIClient.make_request("POST", url, files=files, params=params)
+    
+    def submit_folder(
+        self,
+        collection_name: str,
+        folder_path: str,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: int = 200,
+        chunker: str = "simple",
+        deduplicate: bool = False
+    ) -> Dict[str, Any]:
+        """Submit a job indexing a folder of PDFs. Returns the job id without waiting"""
+        url = f"{self.endpoints['jobs']}/{collection_name}/process_folder"
+        params = {
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "chunker": chunker,
+            "deduplicate": deduplicate
+        }
+        return APIClient.make_request("POST", url, json={"folder_path": folder_path}, params=params)
+    
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        """Get job status, progress, throughput and ETA"""
+        return APIClient.make_request("GET", f"{self.endpoints['jobs']}/{job_id}")
+    
+    def cancel_job(self, job_id: str) -> Dict[str, str]:
+        """Request the cancellation of a job"""
+        return APIClient.make_request("POST", f"{self.endpoints['jobs']}/{job_id}/cancel")
+    
+    def list_jobs(self, collection_name: Optional[str] = None) -> Dict[str, List]:
+        """List recent jobs"""
+        params = {"collection_name": collection_name} if collection_name else None
+        return APIClient.make_request("GET", self.endpoints["jobs"], params=params)
+
 class GDriveClient:
     """Client for Google Drive operations"""
     
@@ -285,13 +358,18 @@ class AgentClient:
         agent_type: str,
         question: str,
         config: Optional[Dict[str, Any]] = None,
-        stream: bool = False
+        stream: bool = False,
+        stream_mode: str = "updates",
+        session_id: Optional[str] = None
     ) -> AgentResponse:
-        """Query the RAG agent"""
+        """Query the RAG agent. With stream, stream_mode "tokens" streams the answer token by token.
+        Questions of the same session_id continue the conversation."""
         url = f"{self.endpoints['agent']}/{agent_type}"
         body = {
             "question": question,
             "stream": stream,
+            "stream_mode": stream_mode,
+            "session_id": session_id,
             "config": config
         }
         
@@ -312,4 +390,11 @@ class AgentClient:
             else:
                 response = requests.post(url, json=body)
                 response.raise_for_status()
-                return AgentResponse(response.json(), is_streaming=False)
\ No newline at end of file
+                return AgentResponse(response.json(), is_streaming=False)
+
+    def delete_session(self, session_id: str) -> Dict[str, Any]:
+        """Delete the checkpointed state of a session"""
+        with self._handle_request_errors("delete_session"):
+            response = requests.delete(f"{self.endpoints['agent']}/sessions/{session_id}")
+            response.raise_for_status()
+            return response.json()
\ No newline at end of file